@@ -0,0 +1,59 @@
+from asgiref.sync import sync_to_async
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+
+from services.user_cache import auth_user_cache
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    """
+    ``JWTAuthentication`` without the per-request user SELECT.
+
+    Users come from ``services.user_cache.auth_user_cache`` (short TTL,
+    invalidated by any user save/delete); only a miss reads the database.
+    The active and revoked-token checks still run on every request.
+    """
+
+    def get_user(self, validated_token):
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            # Read before the SELECT so a concurrent user change leaves the entry stale
+            token = auth_user_cache.version()
+            user = super().get_user(validated_token)
+            auth_user_cache.set(user, token)
+        return user
+
+    def get_cached_user(self, validated_token):
+        """The token's user from the cache (already checked), or ``None`` on a miss"""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError as e:
+            raise InvalidToken(_('Token contained no recognizable user identification')) from e
+
+        user = auth_user_cache.get(user_id)
+        if user is None:
+            return None
+        if api_settings.CHECK_USER_IS_ACTIVE and not user.is_active:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(
+            api_settings.REVOKE_TOKEN_CLAIM
+        ) != get_md5_hash_password(user.password):
+            raise AuthenticationFailed(_("The user's password has been changed."), code='password_changed')
+        return user
+
+    async def aauthenticate(self, request):
+        """``authenticate`` for async views (plain ``HttpRequest``); only a cache miss leaves the event loop"""
+        header = self.get_header(request)
+        if header is None:
+            return None
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+        validated_token = self.get_validated_token(raw_token)
+        user = self.get_cached_user(validated_token)
+        if user is None:
+            user = await sync_to_async(self.get_user)(validated_token)
+        return user, validated_token
@@ -1,83 +1,513 @@
+import asyncio
 import json
-from channels.generic.websocket import AsyncWebsocketConsumer
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+
 from channels.db import database_sync_to_async
-from django.contrib.auth.models import AnonymousUser
-from core.models import Ticket
+from channels.generic.websocket import AsyncWebsocketConsumer
+from django.conf import settings
+
+from services.notification_dispatcher import dispatcher
+from services.ticket_groups import BROADCAST_GROUP, groups_for_user, ticket_group, visible_ticket_ids
+
+# Inbound counters of every consumer in this process (exposed by the notification metrics endpoint)
+INBOUND_COUNTERS = ('accepted', 'dropped_rate_limited', 'dropped_too_large', 'dropped_invalid', 'batched', 'group_sends')
+inbound_totals = Counter(dict.fromkeys(INBOUND_COUNTERS, 0))
+# Outbound queue counters of every consumer in this process
+OUTBOUND_COUNTERS = ('queued', 'coalesced', 'dropped', 'evicted')
+outbound_totals = Counter(dict.fromkeys(OUTBOUND_COUNTERS, 0))
+
+# Close codes of evicted slow clients and reaped unresponsive ones (4000-4999 are free for applications)
+EVICTED_CLOSE_CODE = 4008
+IDLE_CLOSE_CODE = 4009
+
+
+def _inbound_setting(name, default):
+    return getattr(settings, 'WEBSOCKET_INBOUND', {}).get(name, default)
+
+
+def _outbound_setting(name, default):
+    return getattr(settings, 'WEBSOCKET_OUTBOUND', {}).get(name, default)
+
+
+def _heartbeat_setting(name, default):
+    return getattr(settings, 'WEBSOCKET_HEARTBEAT', {}).get(name, default)
+
+
+class ConnectionRegistry:
+    """Open ``TicketConsumer`` sockets of this process (thread-safe: the metrics view reads it)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._connections = {}
+        self.reaped = 0
+
+    def add(self, consumer):
+        with self._lock:
+            self._connections[consumer.channel_name] = consumer
+
+    def discard(self, consumer):
+        with self._lock:
+            self._connections.pop(consumer.channel_name, None)
+
+    def reap(self, consumer):
+        with self._lock:
+            if self._connections.pop(consumer.channel_name, None) is not None:
+                self.reaped += 1
+
+    def snapshot(self):
+        """Live sockets, how many sent nothing for a whole heartbeat interval, and reaped sockets"""
+        interval = _heartbeat_setting('INTERVAL', 25.0)
+        now = time.monotonic()
+        with self._lock:
+            last_seen = [consumer.last_seen for consumer in self._connections.values()]
+            reaped = self.reaped
+        return {
+            'live': len(last_seen),
+            'idle': sum(1 for seen in last_seen if now - seen > interval) if interval > 0 else 0,
+            'reaped': reaped,
+            'heartbeat_interval_seconds': interval,
+        }
+
+
+# Global instance (one per process)
+connection_registry = ConnectionRegistry()
+
+
+class TokenBucket:
+    """Allows ``rate`` events per second on average, with bursts of up to ``capacity``"""
+
+    __slots__ = ('rate', 'capacity', 'tokens', 'updated')
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def consume(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens < 1:
+            return False
+        self.tokens -= 1
+        return True
 
 
 class TicketConsumer(AsyncWebsocketConsumer):
+    """
+    Ticket notifications over ``ws/tickets/``.
+
+    On connect the socket joins the groups derived from the authenticated
+    user (role, department, own tickets). Clients may also subscribe to
+    specific tickets::
+
+        {"action": "subscribe", "ticket_ids": [1, 2]}
+        {"action": "unsubscribe", "ticket_ids": [2]}
+
+    An event published to several of the socket's groups is delivered once
+    (deduplicated by ``event_id``).
+
+    Any other frame (``{"message": ...}``) is relayed to every socket of the
+    broadcast group. Inbound frames are limited per connection
+    (``WEBSOCKET_INBOUND``): a token bucket drops frames over the rate,
+    oversized and malformed frames are dropped before reaching the channel
+    layer, and messages arriving within ``BATCH_WINDOW`` are merged into one
+    group message, so a chatty client cannot turn every frame into N sends.
+    ``inbound_counts`` (and the process-wide ``inbound_totals``) count
+    accepted, dropped and batched frames.
+
+    Outgoing frames go through a bounded per-connection queue
+    (``WEBSOCKET_OUTBOUND``) drained by a writer task, so handlers never wait
+    for the client and the channel layer keeps draining this channel. Queued
+    events of the same ticket are merged (the newest state wins) and past
+    ``MAX_QUEUE`` the oldest frame is dropped. A client more than
+    ``MAX_BEHIND`` frames or ``MAX_LAG`` seconds behind is evicted: it leaves
+    its groups, gets ``{"type": "resync_required"}`` and is closed with code
+    4008; the client reconnects and catches up through the changes feed.
+    Servers that buffer writes without back-pressure (Daphne) never make the
+    queue grow, so there the lag is measured by the heartbeat instead: a pong
+    answering a ping more than ``MAX_LAG`` seconds old evicts the client too.
+
+    Every ``WEBSOCKET_HEARTBEAT['INTERVAL']`` seconds the socket gets
+    ``{"type": "ping"}``; clients answer ``{"action": "pong"}`` (any frame
+    counts). A socket silent for ``TIMEOUT`` seconds (e.g. a half-open
+    connection of a sleeping laptop) leaves its groups and is closed with
+    code 4009. Open sockets are tracked in ``connection_registry``.
+    """
+
+    # How many recent event ids are remembered for deduplication
+    recent_events_size = 256
+
     async def connect(self):
-        self.room_group_name = 'ticket_notifications'
-        
-        # Join room group
-        await self.channel_layer.group_add(
-            self.room_group_name,
-            self.channel_name
-        )
-        
+        self.user = self.scope.get('user')
+        self.room_group_name = BROADCAST_GROUP
+        self.subscribed_groups = set(groups_for_user(self.user))
+        self.ticket_subscriptions = set()
+        self.recent_event_ids = deque(maxlen=self.recent_events_size)
+        self.inbound_bucket = TokenBucket(_inbound_setting('RATE', 5), _inbound_setting('BURST', 20))
+        self.inbound_counts = Counter()
+        self.throttled = False
+        self.pending_messages = []
+        self.flush_task = None
+        self.outbox = OrderedDict()  # key -> (frame, queued_at)
+        self.outbox_latest = {}  # subject -> key of its newest queued frame
+        self.outbox_serial = 0
+        self.behind = 0  # frames queued or dropped since the outbox was last empty
+        self.outbound_counts = Counter()
+        self.writer_task = None
+        self.evicted = False
+        self.last_seen = time.monotonic()
+        self.heartbeat_task = None
+        self.pings_sent = deque(maxlen=32)  # send times of unanswered pings
+
+        # Background notifications are published on this loop (see NotificationDispatcher)
+        dispatcher.bind_loop(asyncio.get_running_loop())
+
+        # Join the user's groups
+        for group in self.subscribed_groups:
+            await self.channel_layer.group_add(group, self.channel_name)
+
         await self.accept()
+        connection_registry.add(self)
+        if _heartbeat_setting('INTERVAL', 25.0) > 0:
+            self.heartbeat_task = asyncio.ensure_future(self.heartbeat())
 
     async def disconnect(self, close_code):
-        # Leave room group
-        await self.channel_layer.group_discard(
-            self.room_group_name,
-            self.channel_name
-        )
+        connection_registry.discard(self)
+        for task in (getattr(self, 'writer_task', None), getattr(self, 'heartbeat_task', None)):
+            if task is not None:
+                task.cancel()
+        # Relay what was accepted before the socket closed
+        if getattr(self, 'pending_messages', None):
+            await self.flush_messages()
+        await self.leave_groups()
+
+    async def leave_groups(self):
+        """Leaves every joined group (the channel layer stops delivering to this socket)"""
+        for group in getattr(self, 'subscribed_groups', ()):
+            await self.channel_layer.group_discard(group, self.channel_name)
+        self.subscribed_groups = set()
+
+    # ----- Heartbeat -----
+    async def heartbeat(self):
+        """Pings the client every interval; closes the socket when it stayed silent past the timeout"""
+        interval = _heartbeat_setting('INTERVAL', 25.0)
+        timeout = _heartbeat_setting('TIMEOUT', 60.0)
+        while True:
+            await asyncio.sleep(interval)
+            if self.evicted:
+                return
+            if time.monotonic() - self.last_seen > timeout:
+                await self.reap()
+                return
+            self.pings_sent.append(time.monotonic())
+            await self.deliver(json.dumps({'type': 'ping'}))
+
+    async def reap(self):
+        """Drops an unresponsive socket right away; a half-open connection may never report its disconnect"""
+        connection_registry.reap(self)
+        self.heartbeat_task = None
+        self.evicted = True
+        self.clear_outbox()
+        if self.writer_task is not None:
+            # Probably stuck writing to the dead socket
+            self.writer_task.cancel()
+        await self.leave_groups()
+        await self.close(code=IDLE_CLOSE_CODE)
+
+    async def check_round_trip(self):
+        """
+        A pong answers the oldest unanswered ping; its round trip is how far behind the client reads
+
+        Daphne accepts every write into an unbounded buffer, so the outbox
+        never fills there; a ping queued behind that buffer is only answered
+        once the client has read everything sent before it.
+        """
+        if not self.pings_sent:
+            return
+        lag = time.monotonic() - self.pings_sent.popleft()
+        max_lag = _outbound_setting('MAX_LAG', 30.0)
+        if lag > max_lag and not self.evicted:
+            await self.evict(f'More than {max_lag:g} seconds behind.')
+
+    def count(self, counter, amount=1):
+        self.inbound_counts[counter] += amount
+        inbound_totals[counter] += amount
+
+    def count_outbound(self, counter):
+        self.outbound_counts[counter] += 1
+        outbound_totals[counter] += 1
+
+    # ----- Outbound queue -----
+    async def deliver(self, text, key=None):
+        """
+        Queues a frame for the client
+
+        ``key`` is ``(subject, kind)``, e.g. ``(('ticket', id), 'ticket_updated')``:
+        the frame replaces the subject's newest queued frame when that one has
+        the same kind. Frames of another kind (a queued ``ticket_created``
+        followed by a ``ticket_updated``) are both kept, in order.
+        """
+        if self.evicted:
+            return
+        now = time.monotonic()
+        if key is not None and key in self.outbox and self.outbox_latest.get(key[0]) == key:
+            # Keeps the queued frame's place and age: only the newest state is worth sending
+            self.outbox[key] = (text, self.outbox[key][1])
+            self.count_outbound('coalesced')
+            return
+        subject = key[0] if key is not None else None
+        if key is None or key in self.outbox:
+            self.outbox_serial += 1
+            key = self.outbox_serial
+        if subject is not None:
+            self.outbox_latest[subject] = key
+        self.outbox[key] = (text, now)
+        self.behind += 1
+        self.count_outbound('queued')
+        if len(self.outbox) > _outbound_setting('MAX_QUEUE', 100):
+            self.outbox.popitem(last=False)
+            self.count_outbound('dropped')
+
+        max_behind = _outbound_setting('MAX_BEHIND', 500)
+        max_lag = _outbound_setting('MAX_LAG', 30.0)
+        if self.behind > max_behind:
+            await self.evict(f'More than {max_behind} messages behind.')
+        elif now - next(iter(self.outbox.values()))[1] > max_lag:
+            await self.evict(f'More than {max_lag:g} seconds behind.')
+        elif self.writer_task is None:
+            self.writer_task = asyncio.ensure_future(self.write_outbox())
+
+    async def write_outbox(self):
+        """Sends queued frames in order until the outbox is empty (closes the socket after an eviction)"""
+        try:
+            while self.outbox:
+                _key, (text, _queued_at) = self.outbox.popitem(last=False)
+                await self.send(text_data=text)
+            self.behind = 0
+            self.outbox_latest.clear()
+            if self.evicted:
+                await self.close(code=EVICTED_CLOSE_CODE)
+        finally:
+            self.writer_task = None
+
+    def clear_outbox(self):
+        self.outbox.clear()
+        self.outbox_latest.clear()
+
+    async def evict(self, reason):
+        """Drops a client that fell too far behind; it has to resync through the changes feed"""
+        self.evicted = True
+        self.count_outbound('evicted')
+        # Leave the groups first so the channel layer stops queueing events for this channel
+        await self.leave_groups()
+        # Goes out after the frame being sent now, if any
+        self.clear_outbox()
+        self.outbox['resync'] = (json.dumps({'type': 'resync_required', 'reason': reason}), time.monotonic())
+        if self.writer_task is None:
+            self.writer_task = asyncio.ensure_future(self.write_outbox())
 
     # Receive message from WebSocket
-    async def receive(self, text_data):
-        text_data_json = json.loads(text_data)
-        message = text_data_json['message']
-        # Send message to room group
+    async def receive(self, text_data=None, bytes_data=None):
+        # Any frame proves the client is alive, even one dropped below
+        self.last_seen = time.monotonic()
+        # Rate limit first: even frames that are dropped later cost a token
+        if not self.inbound_bucket.consume():
+            self.count('dropped_rate_limited')
+            if not self.throttled:
+                # One error per throttled burst, not one per dropped frame
+                self.throttled = True
+                await self.send_error('Too many messages; slow down.')
+            return
+        self.throttled = False
+
+        if text_data is None:
+            self.count('dropped_invalid')
+            await self.send_error('Only text frames are accepted.')
+            return
+        limit = _inbound_setting('MAX_MESSAGE_LENGTH', 4096)
+        if len(text_data) > limit:
+            self.count('dropped_too_large')
+            await self.send_error(f'Messages are limited to {limit} characters.')
+            return
+        try:
+            text_data_json = json.loads(text_data)
+        except ValueError:
+            text_data_json = None
+        if not isinstance(text_data_json, dict):
+            self.count('dropped_invalid')
+            await self.send_error('Messages must be JSON objects.')
+            return
+
+        action = text_data_json.get('action')
+        if action == 'pong':
+            self.count('accepted')
+            await self.check_round_trip()
+            return
+        if action in ('subscribe', 'unsubscribe'):
+            self.count('accepted')
+            await self.handle_subscription(action, text_data_json.get('ticket_ids'))
+            return
+        if 'message' not in text_data_json:
+            self.count('dropped_invalid')
+            await self.send_error('"message" is required.')
+            return
+
+        self.count('accepted')
+        await self.queue_message(text_data_json['message'])
+
+    async def queue_message(self, message):
+        """Adds a message to the current batch; the batch is sent when full or when its window ends"""
+        self.pending_messages.append(message)
+        window = _inbound_setting('BATCH_WINDOW', 0.05)
+        if window <= 0 or len(self.pending_messages) >= _inbound_setting('MAX_BATCH', 20):
+            await self.flush_messages()
+        elif self.flush_task is None:
+            self.flush_task = asyncio.ensure_future(self.flush_later(window))
+
+    async def flush_later(self, window):
+        await asyncio.sleep(window)
+        self.flush_task = None
+        await self.flush_messages()
+
+    async def flush_messages(self):
+        """Sends the pending messages to the room group as one event"""
+        if self.flush_task is not None:
+            self.flush_task.cancel()
+            self.flush_task = None
+        messages, self.pending_messages = self.pending_messages, []
+        if not messages:
+            return
+        if len(messages) > 1:
+            self.count('batched', len(messages))
+        self.count('group_sends')
+        if len(messages) == 1:
+            frame = {'type': 'notification', 'message': messages[0]}
+        else:
+            frame = {'type': 'notification', 'messages': messages}
+        # Rendered once here instead of once per receiving socket
         await self.channel_layer.group_send(
             self.room_group_name,
             {
                 'type': 'ticket_notification',
-                'message': message
+                'text': json.dumps(frame),
             }
         )
 
+    async def handle_subscription(self, action, ticket_ids):
+        """Adds/removes per-ticket groups for authenticated users (only tickets they may see)"""
+        if not self.user or not self.user.is_authenticated:
+            await self.send_error('Authentication required to subscribe to tickets.')
+            return
+        if not isinstance(ticket_ids, list) or not all(isinstance(i, int) for i in ticket_ids):
+            await self.send_error('"ticket_ids" must be a list of integers.')
+            return
+
+        ticket_ids = set(ticket_ids)
+        if action == 'subscribe':
+            limit = getattr(settings, 'WEBSOCKET_MAX_TICKET_SUBSCRIPTIONS', 100)
+            new_ids = ticket_ids - self.ticket_subscriptions
+            if len(self.ticket_subscriptions) + len(new_ids) > limit:
+                await self.send_error(f'At most {limit} ticket subscriptions per connection.')
+                return
+            allowed = await database_sync_to_async(visible_ticket_ids)(self.user, new_ids)
+            if new_ids - allowed:
+                await self.send_error(f'Not allowed to follow tickets {sorted(new_ids - allowed)}.')
+            new_ids = allowed
+            for ticket_id in new_ids:
+                await self.channel_layer.group_add(ticket_group(ticket_id), self.channel_name)
+                self.subscribed_groups.add(ticket_group(ticket_id))
+            self.ticket_subscriptions |= new_ids
+        else:
+            for ticket_id in ticket_ids & self.ticket_subscriptions:
+                await self.channel_layer.group_discard(ticket_group(ticket_id), self.channel_name)
+                self.subscribed_groups.discard(ticket_group(ticket_id))
+            self.ticket_subscriptions -= ticket_ids
+
+        await self.deliver(json.dumps({
+            'type': 'subscriptions',
+            'ticket_ids': sorted(self.ticket_subscriptions)
+        }))
+
+    async def send_error(self, message):
+        await self.deliver(json.dumps({'type': 'error', 'message': message}))
+
+    def is_duplicate(self, event):
+        """True if this event already reached the socket through another group"""
+        event_id = event.get('event_id')
+        if event_id is None:
+            return False
+        if event_id in self.recent_event_ids:
+            return True
+        self.recent_event_ids.append(event_id)
+        return False
+
+    @staticmethod
+    def ticket_key(event):
+        """Outbound queue key of a single-ticket event (queued events of one ticket and type are merged)"""
+        ticket_id = event['ticket_id'] if 'ticket_id' in event else event.get('ticket', {}).get('id')
+        return (('ticket', ticket_id), event['type']) if ticket_id is not None else None
+
+    @staticmethod
+    def ticket_frame(event):
+        """Pre-rendered frame from WebSocketNotificationService, or encode the ticket dict"""
+        if 'text' in event:
+            return event['text']
+        return json.dumps({'type': event['type'], 'ticket': event['ticket']})
+
     # Receive message from room group
     async def ticket_notification(self, event):
+        if 'text' in event:
+            await self.deliver(event['text'])
+            return
         message = event['message']
         # Send message to WebSocket
-        await self.send(text_data=json.dumps({
+        await self.deliver(json.dumps({
             'type': 'notification',
             'message': message
         }))
 
     # Receive ticket created notification
     async def ticket_created(self, event):
-        ticket_data = event['ticket']
-        
-        await self.send(text_data=json.dumps({
-            'type': 'ticket_created',
-            'ticket': ticket_data
-        }))
+        if self.is_duplicate(event):
+            return
+        await self.deliver(self.ticket_frame(event), self.ticket_key(event))
 
     # Receive ticket updated notification
     async def ticket_updated(self, event):
-        ticket_data = event['ticket']
-        
-        await self.send(text_data=json.dumps({
-            'type': 'ticket_updated',
-            'ticket': ticket_data
-        }))
+        if self.is_duplicate(event):
+            return
+        await self.deliver(self.ticket_frame(event), self.ticket_key(event))
 
     # Receive ticket resolved notification
     async def ticket_resolved(self, event):
-        ticket_data = event['ticket']
-        
-        await self.send(text_data=json.dumps({
-            'type': 'ticket_resolved',
-            'ticket': ticket_data
-        }))
+        if self.is_duplicate(event):
+            return
+        await self.deliver(self.ticket_frame(event), self.ticket_key(event))
+
+    # Receive bulk update/resolve notifications (one event for many tickets)
+    async def tickets_bulk_updated(self, event):
+        if self.is_duplicate(event):
+            return
+        await self.deliver(event['text'])
+
+    async def tickets_bulk_resolved(self, event):
+        if self.is_duplicate(event):
+            return
+        await self.deliver(event['text'])
+
+    # Receive bulk import summary
+    async def tickets_imported(self, event):
+        await self.deliver(event['text'])
 
     # Receive custom notification
     async def custom_notification(self, event):
         message = event['message']
         notification_type = event.get('notification_type', 'info')
-        await self.send(text_data=json.dumps({
+        await self.deliver(json.dumps({
             'type': 'custom_notification',
             'message': message,
             'notification_type': notification_type
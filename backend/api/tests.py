@@ -1,3 +1,1160 @@
-from django.test import TestCase
+import asyncio
+import json
+import os
+import tempfile
+import threading
+from datetime import timedelta
+from functools import partial
+from io import StringIO
+from unittest import mock
+from urllib.parse import parse_qs, urlparse
 
-# Create your tests here.
+from channels.db import database_sync_to_async
+from channels.layers import get_channel_layer
+from channels.testing import WebsocketCommunicator
+from django.contrib.auth.models import AnonymousUser
+from django.core.cache import cache
+from django.core.cache.backends.locmem import LocMemCache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.tokens import AccessToken
+
+from api.consumers import (
+    INBOUND_COUNTERS, OUTBOUND_COUNTERS, TicketConsumer, connection_registry, inbound_totals, outbound_totals,
+)
+from api.v1.serializers import TicketSerializer
+from config.middleware import request_metrics
+from core.models import CustomUser, Ticket, TicketStatus
+from services.conditional_service import TicketVersionService
+from services.notification_dispatcher import NotificationDispatcher, dispatcher as notification_dispatcher
+from services.payload_cache import payload_cache
+from services.permissions import has_roles
+from services.roles import SUPPORT_READ_ROLES, UserRole
+from services.stats_service import TicketStatsService
+from services.ticket_groups import BROADCAST_GROUP
+from services.websocket_service import WebSocketNotificationService
+
+
+class RecordingChannelLayer:
+    """Channel layer double that records group_send calls"""
+
+    def __init__(self):
+        self.messages = []
+
+    async def group_send(self, group, message):
+        self.messages.append((group, message))
+
+
+class TicketApiTestCase(APITestCase):
+    """Base fixture: one technician (API user) and a handful of tickets"""
+
+    def setUp(self):
+        cache.clear()
+        self.technician = CustomUser.objects.create_user(
+            username='technician', email='technician@example.com', password='123', role='technician'
+        )
+        self.agent = CustomUser.objects.create_user(
+            username='agent', email='agent@example.com', password='123', role='agent', department='TI'
+        )
+        self.client.force_authenticate(self.technician)
+
+    def create_tickets(self, count, **kwargs):
+        base = timezone.now()
+        tickets = []
+        for i in range(count):
+            defaults = {
+                'title': f'Ticket {i}',
+                'description': f'Description {i}',
+                'priority': ['low', 'medium', 'high', 'urgent'][i % 4],
+                'department': 'TI',
+                'status': TicketStatus.OPEN.value,
+                'created_by': self.agent,
+            }
+            defaults.update(kwargs)
+            ticket = Ticket.objects.create(**defaults)
+            # Force a few equal timestamps so the id tie breaker is exercised
+            Ticket.objects.filter(pk=ticket.pk).update(created_at=base - timedelta(minutes=i // 2))
+            tickets.append(ticket)
+        return tickets
+
+
+class TicketPaginationTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-list')
+
+    def walk(self, params):
+        ids, url = [], self.url
+        while url:
+            response = self.client.get(url, params if url == self.url else None)
+            self.assertEqual(response.status_code, 200)
+            ids.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_keyset_pages_cover_every_ticket_once(self):
+        tickets = self.create_tickets(7)
+        ids = self.walk({'page_size': 2})
+        expected = list(Ticket.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+        self.assertEqual(len(set(ids)), len(tickets))
+
+    def test_keyset_follows_ordering_param(self):
+        self.create_tickets(6)
+        ids = self.walk({'page_size': 4, 'ordering': 'priority'})
+        expected = list(Ticket.objects.order_by('priority', 'id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_previous_link_returns_prior_page(self):
+        self.create_tickets(5)
+        first = self.client.get(self.url, {'page_size': 2})
+        second = self.client.get(first.data['next'])
+        back = self.client.get(second.data['previous'])
+        self.assertEqual([t['id'] for t in back.data['results']], [t['id'] for t in first.data['results']])
+
+    def test_page_size_is_capped(self):
+        self.create_tickets(3)
+        with self.settings(TICKET_PAGINATION={'PAGE_SIZE': 1, 'MAX_PAGE_SIZE': 2}):
+            response = self.client.get(self.url, {'page_size': 50})
+        self.assertEqual(len(response.data['results']), 2)
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, 404)
+
+    def test_offset_pagination_opt_in(self):
+        self.create_tickets(3)
+        response = self.client.get(self.url, {'page': 2, 'page_size': 2})
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual(len(response.data['results']), 1)
+
+
+class TicketStatsTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-stats')
+
+    def test_stats_use_one_query_then_cache(self):
+        self.create_tickets(4)
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['total'], 4)
+        self.assertEqual(response.data['open'], 4)
+        self.assertEqual(response.data['by_priority'], {'low': 1, 'medium': 1, 'high': 1, 'urgent': 1})
+        self.assertEqual(response.data['by_department'], {'TI': 4})
+        self.assertEqual(response.data['meta']['source'], 'database')
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url)
+        self.assertEqual(response.data['meta']['source'], 'cache')
+
+    def test_writes_update_cached_stats_incrementally(self):
+        ticket = self.create_tickets(2)[0]
+        self.client.get(self.url)
+        self.client.post(reverse('api:api_v1:ticket-resolve', args=[ticket.pk]))
+        self.client.patch(
+            reverse('api:api_v1:ticket-detail', args=[ticket.pk + 1]), {'department': 'RH'}, format='json'
+        )
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['meta']['source'], 'cache')
+        self.assertEqual((response.data['open'], response.data['resolved']), (1, 1))
+        self.assertEqual(response.data['by_department'], {'TI': 1, 'RH': 1})
+
+    def test_concurrent_writes_are_not_lost(self):
+        ticket = self.create_tickets(1)[0]
+        self.client.get(self.url)
+        # Both writers read the cached stats before either one writes
+        barrier = threading.Barrier(2)
+        get = LocMemCache.get
+
+        def get_together(cache_backend, key, *args, **kwargs):
+            value = get(cache_backend, key, *args, **kwargs)
+            if key == TicketStatsService.CACHE_KEY:
+                barrier.wait(timeout=5)
+            return value
+
+        with mock.patch.object(LocMemCache, 'get', get_together):
+            threads = [threading.Thread(target=TicketStatsService.record_created, args=[ticket]) for _ in range(2)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['meta']['source'], 'cache')
+        self.assertEqual((response.data['total'], response.data['by_department']), (3, {'TI': 3}))
+
+
+class TicketSearchTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-list')
+
+    def search(self, query, **params):
+        response = self.client.get(self.url, {'search': query, **params})
+        self.assertEqual(response.status_code, 200)
+        return [t['id'] for t in response.data['results']]
+
+    def test_full_text_search_is_ranked_and_kept_in_sync(self):
+        printer, network = self.create_tickets(2)
+        Ticket.objects.filter(pk=printer.pk).update(title='Impressora', description='Impressora sem papel impressora')
+        network.title, network.description = 'Rede lenta', 'A impressora da rede caiu'
+        network.save()
+        self.assertEqual(self.search('impressora'), [printer.pk, network.pk])
+        self.assertEqual(self.search('rede'), [network.pk])
+        self.assertEqual(self.search('impress'), [printer.pk, network.pk])
+
+    def test_search_ignores_accents_and_syntax(self):
+        ticket = self.create_tickets(1, title='Configuração de VPN')[0]
+        self.assertEqual(self.search('configuracao'), [ticket.pk])
+        self.assertEqual(self.search('"vpn" OR *'), [])
+        self.assertEqual(self.search('vpn -'), [ticket.pk])
+
+    def test_numeric_query_is_an_exact_id_lookup(self):
+        tickets = self.create_tickets(12)
+        self.assertEqual(self.search(str(tickets[1].pk)), [tickets[1].pk])
+        self.assertEqual(self.search('²'), [])
+        self.assertEqual(self.search('99999999999999999999'), [])
+
+    def test_search_paginates_by_rank(self):
+        self.create_tickets(5, title='Servidor fora do ar')
+        first = self.client.get(self.url, {'search': 'servidor', 'page_size': 2})
+        ids = [t['id'] for t in first.data['results']]
+        url = first.data['next']
+        while url:
+            response = self.client.get(url)
+            ids.extend(t['id'] for t in response.data['results'])
+            url = response.data['next']
+        self.assertEqual(len(set(ids)), 5)
+
+
+@override_settings(TICKET_NOTIFICATIONS={'ASYNC': True, 'COALESCE_WINDOW': 0.05})
+class NotificationDispatcherTests(SimpleTestCase):
+    def test_updates_to_the_same_ticket_are_coalesced(self):
+        dispatcher = NotificationDispatcher()
+        sent = []
+        dispatcher.submit('ticket_updated', lambda: sent.append(('ticket_updated', 1)), key=('ticket', 1))
+        dispatcher.submit('ticket_resolved', lambda: sent.append(('ticket_resolved', 1)), key=('ticket', 1))
+        dispatcher.submit('ticket_updated', lambda: sent.append(('ticket_updated', 1)), key=('ticket', 1))
+        dispatcher.submit('ticket_updated', lambda: sent.append(('ticket_updated', 2)), key=('ticket', 2))
+        dispatcher.submit('custom_notification', lambda: sent.append(('custom_notification', None)))
+        self.assertTrue(dispatcher.flush())
+        self.assertEqual(
+            sent, [('ticket_resolved', 1), ('ticket_updated', 2), ('custom_notification', None)]
+        )
+        metrics = dispatcher.metrics()
+        self.assertEqual((metrics['submitted'], metrics['coalesced'], metrics['delivered']), (5, 2, 3))
+        self.assertEqual(metrics['queue_depth'], 0)
+
+    def test_failures_are_counted_and_do_not_stop_the_worker(self):
+        dispatcher = NotificationDispatcher()
+        sent = []
+        dispatcher.submit('custom_notification', lambda: 1 / 0)
+        dispatcher.submit('custom_notification', lambda: sent.append('ok'))
+        with self.assertLogs('services.notification_dispatcher', 'ERROR'):
+            self.assertTrue(dispatcher.flush())
+        self.assertEqual(sent, ['ok'])
+        self.assertEqual(dispatcher.metrics()['failed'], 1)
+
+
+class TicketConsumerGroupTests(TicketApiTestCase):
+    async def connect(self, user):
+        communicator = WebsocketCommunicator(TicketConsumer.as_asgi(), '/ws/tickets/')
+        communicator.scope['user'] = user
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def publish(self, ticket):
+        deliver = WebSocketNotificationService._deliver_ticket_notification
+        await database_sync_to_async(deliver)('ticket_updated', ticket.pk)
+
+    async def test_events_only_reach_interested_sockets_once(self):
+        other = await database_sync_to_async(CustomUser.objects.create_user)(
+            username='other', email='other@example.com', password='123', role='agent', department='RH'
+        )
+        ticket = await database_sync_to_async(Ticket.objects.create)(
+            title='Rede', description='Sem rede', department='RH', created_by=other
+        )
+        technician = await self.connect(self.technician)
+        agent = await self.connect(self.agent)
+        creator = await self.connect(other)
+
+        await self.publish(ticket)
+        self.assertEqual((await technician.receive_json_from())['ticket']['id'], ticket.pk)
+        # Creator is in both its user group and the RH department group, but gets one copy
+        self.assertEqual((await creator.receive_json_from())['type'], 'ticket_updated')
+        self.assertTrue(await creator.receive_nothing())
+        self.assertTrue(await agent.receive_nothing())
+
+        # Tickets of another department cannot be followed
+        await agent.send_json_to({'action': 'subscribe', 'ticket_ids': [ticket.pk]})
+        self.assertEqual((await agent.receive_json_from())['type'], 'error')
+        self.assertEqual(await agent.receive_json_from(), {'type': 'subscriptions', 'ticket_ids': []})
+        await self.publish(ticket)
+        self.assertTrue(await agent.receive_nothing())
+
+        await technician.receive_json_from()
+        await creator.receive_json_from()
+        await technician.send_json_to({'action': 'subscribe', 'ticket_ids': [ticket.pk]})
+        self.assertEqual(await technician.receive_json_from(), {'type': 'subscriptions', 'ticket_ids': [ticket.pk]})
+        await self.publish(ticket)
+        self.assertEqual((await technician.receive_json_from())['ticket']['id'], ticket.pk)
+        self.assertTrue(await technician.receive_nothing())
+
+        for communicator in (technician, agent, creator):
+            await communicator.disconnect()
+
+    @override_settings(TICKET_NOTIFICATIONS={'ASYNC': False})
+    async def test_department_move_reaches_the_previous_department(self):
+        other = await database_sync_to_async(CustomUser.objects.create_user)(
+            username='other', email='other@example.com', password='123', role='agent', department='RH'
+        )
+        ticket = await database_sync_to_async(Ticket.objects.create)(
+            title='Rede', description='Sem rede', department='TI', created_by=self.technician
+        )
+        agent = await self.connect(self.agent)
+        newcomer = await self.connect(other)
+
+        def move():
+            moved = Ticket.objects.get(pk=ticket.pk)
+            moved.department = 'RH'
+            with self.captureOnCommitCallbacks(execute=True):
+                moved.save()
+                WebSocketNotificationService.send_ticket_updated(moved)
+
+        await database_sync_to_async(move)()
+        # The TI agent learns the ticket left its department; RH sees it arrive
+        for communicator in (agent, newcomer):
+            frame = await communicator.receive_json_from()
+            self.assertEqual((frame['ticket']['id'], frame['ticket']['department']), (ticket.pk, 'RH'))
+            self.assertTrue(await communicator.receive_nothing())
+            await communicator.disconnect()
+
+    @override_settings(TICKET_NOTIFICATIONS={'ASYNC': True, 'COALESCE_WINDOW': 0.05})
+    async def test_dispatcher_thread_wakes_in_memory_consumers(self):
+        technician = await self.connect(self.technician)
+        # Real InMemoryChannelLayer and background dispatcher thread, no mocks
+        notification_dispatcher.submit(
+            'custom_notification',
+            partial(WebSocketNotificationService._deliver_custom_notification, 'Manutenção', 'warning'),
+        )
+        frame = await technician.receive_json_from(timeout=1)
+        self.assertEqual((frame['type'], frame['message']), ('custom_notification', 'Manutenção'))
+        await technician.disconnect()
+
+    async def test_anonymous_cannot_subscribe(self):
+        communicator = await self.connect(AnonymousUser())
+        await communicator.send_json_to({'action': 'subscribe', 'ticket_ids': [1]})
+        self.assertEqual((await communicator.receive_json_from())['type'], 'error')
+        await communicator.disconnect()
+
+
+@override_settings(WEBSOCKET_INBOUND={'RATE': 0, 'BURST': 3, 'MAX_MESSAGE_LENGTH': 100, 'BATCH_WINDOW': 0.05})
+class TicketConsumerInboundTests(TicketApiTestCase):
+    async def connect(self):
+        communicator = WebsocketCommunicator(TicketConsumer.as_asgi(), '/ws/tickets/')
+        communicator.scope['user'] = self.technician
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_burst_is_rate_limited_and_relayed_as_one_batch(self):
+        sender = await self.connect()
+        listener = await self.connect()
+        totals = dict(inbound_totals)
+        for number in range(5):
+            await sender.send_json_to({'message': f'hello {number}'})
+
+        # Two frames over the burst: a single error, then the three accepted messages in one frame
+        self.assertEqual(await sender.receive_json_from(), {'type': 'error', 'message': 'Too many messages; slow down.'})
+        expected = {'type': 'notification', 'messages': ['hello 0', 'hello 1', 'hello 2']}
+        self.assertEqual(await listener.receive_json_from(), expected)
+        self.assertEqual(await sender.receive_json_from(), expected)
+        self.assertTrue(await listener.receive_nothing())
+        self.assertEqual(inbound_totals['accepted'] - totals['accepted'], 3)
+        self.assertEqual(inbound_totals['dropped_rate_limited'] - totals['dropped_rate_limited'], 2)
+        self.assertEqual(inbound_totals['batched'] - totals['batched'], 3)
+        self.assertEqual(inbound_totals['group_sends'] - totals['group_sends'], 1)
+        for communicator in (sender, listener):
+            await communicator.disconnect()
+
+    async def test_invalid_frames_are_dropped_without_closing(self):
+        communicator = await self.connect()
+        await communicator.send_to(text_data='x' * 101)
+        self.assertEqual((await communicator.receive_json_from())['message'], 'Messages are limited to 100 characters.')
+        await communicator.send_to(text_data='not json')
+        self.assertEqual((await communicator.receive_json_from())['message'], 'Messages must be JSON objects.')
+        await communicator.send_json_to({'text': 'no message key'})
+        self.assertEqual((await communicator.receive_json_from())['message'], '"message" is required.')
+        await communicator.disconnect()
+
+    async def test_single_message_keeps_the_original_frame(self):
+        with self.settings(WEBSOCKET_INBOUND={'BATCH_WINDOW': 0}):
+            communicator = await self.connect()
+            await communicator.send_json_to({'message': 'hi'})
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'notification', 'message': 'hi'})
+            await communicator.disconnect()
+
+    def test_totals_are_exposed_with_the_notification_metrics(self):
+        response = self.client.get(reverse('api:api_v1:notification_metrics'))
+        self.assertEqual(set(response.json()['inbound']), set(INBOUND_COUNTERS))
+        self.assertEqual(set(response.json()['outbound']), set(OUTBOUND_COUNTERS))
+        self.assertEqual(response.json()['connections']['live'], connection_registry.snapshot()['live'])
+
+
+class StalledTicketConsumer(TicketConsumer):
+    """Consumer whose client stops reading until ``release`` is set"""
+
+    release = None
+
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        await self.release.wait()
+        await super().send(text_data, bytes_data, close)
+
+
+@override_settings(WEBSOCKET_OUTBOUND={'MAX_QUEUE': 3, 'MAX_BEHIND': 100, 'MAX_LAG': 60})
+class TicketConsumerOutboundTests(TicketApiTestCase):
+    async def connect(self):
+        StalledTicketConsumer.release = asyncio.Event()
+        communicator = WebsocketCommunicator(StalledTicketConsumer.as_asgi(), '/ws/tickets/')
+        communicator.scope['user'] = self.technician
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def publish(self, *events):
+        for event in events:
+            if isinstance(event, str):
+                event = {'type': 'custom_notification', 'message': event}
+            await get_channel_layer().group_send(BROADCAST_GROUP, event)
+            # Let the consumer handle it before the next one
+            await asyncio.sleep(0.02)
+
+    @staticmethod
+    def ticket_event(ticket_id, title, event_type='ticket_updated'):
+        text = json.dumps({'type': event_type, 'ticket': {'id': ticket_id, 'title': title}})
+        return {'type': event_type, 'event_id': title, 'ticket_id': ticket_id, 'text': text}
+
+    async def received(self, communicator):
+        """Custom notification messages and ticket titles, in arrival order"""
+        frames = []
+        while not await communicator.receive_nothing(timeout=0.1):
+            frame = await communicator.receive_json_from()
+            frames.append(frame['ticket']['title'] if 'ticket' in frame else frame['message'])
+        return frames
+
+    async def test_queue_merges_ticket_events_and_drops_the_oldest(self):
+        communicator = await self.connect()
+        totals = dict(outbound_totals)
+        # m0 is stuck in the send; then m1, A and m2 fill the queue and m3 pushes m1 out
+        await self.publish('m0', 'm1', self.ticket_event(1, 'A1'), self.ticket_event(1, 'A2'), 'm2', 'm3')
+        StalledTicketConsumer.release.set()
+        frames = await self.received(communicator)
+        self.assertEqual(frames, ['m0', 'A2', 'm2', 'm3'])
+        self.assertEqual(outbound_totals['coalesced'] - totals['coalesced'], 1)
+        self.assertEqual(outbound_totals['dropped'] - totals['dropped'], 1)
+        await communicator.disconnect()
+
+    async def test_only_frames_of_the_same_type_are_merged(self):
+        with self.settings(WEBSOCKET_OUTBOUND={'MAX_QUEUE': 10}):
+            communicator = await self.connect()
+            await self.publish(
+                'm0',
+                self.ticket_event(1, 'C', 'ticket_created'),
+                self.ticket_event(1, 'U1'),
+                self.ticket_event(1, 'U2'),
+                self.ticket_event(1, 'R', 'ticket_resolved'),
+                self.ticket_event(1, 'U3'),
+            )
+            StalledTicketConsumer.release.set()
+            self.assertEqual(await self.received(communicator), ['m0', 'C', 'U2', 'R', 'U3'])
+            await communicator.disconnect()
+
+    async def test_client_too_many_messages_behind_is_evicted(self):
+        with self.settings(WEBSOCKET_OUTBOUND={'MAX_QUEUE': 2, 'MAX_BEHIND': 3}):
+            communicator = await self.connect()
+            totals = dict(outbound_totals)
+            await self.publish('m0', 'm1', 'm2', 'm3')
+            await self.publish('after eviction')
+            StalledTicketConsumer.release.set()
+            self.assertEqual((await communicator.receive_json_from())['message'], 'm0')
+            self.assertEqual(
+                await communicator.receive_json_from(),
+                {'type': 'resync_required', 'reason': 'More than 3 messages behind.'},
+            )
+            self.assertEqual(await communicator.receive_output(), {'type': 'websocket.close', 'code': 4008})
+            self.assertEqual(outbound_totals['evicted'] - totals['evicted'], 1)
+            await communicator.disconnect()
+
+    async def test_client_lagging_too_long_is_evicted(self):
+        with self.settings(WEBSOCKET_OUTBOUND={'MAX_LAG': 0.1}):
+            communicator = await self.connect()
+            await self.publish('m0', 'm1')
+            await asyncio.sleep(0.15)
+            await self.publish('m2')
+            StalledTicketConsumer.release.set()
+            self.assertEqual((await communicator.receive_json_from())['message'], 'm0')
+            self.assertEqual((await communicator.receive_json_from())['type'], 'resync_required')
+            self.assertEqual((await communicator.receive_output())['code'], 4008)
+            await communicator.disconnect()
+
+
+@override_settings(WEBSOCKET_HEARTBEAT={'INTERVAL': 0.05, 'TIMEOUT': 0.3})
+class TicketConsumerHeartbeatTests(TicketApiTestCase):
+    async def connect(self):
+        communicator = WebsocketCommunicator(TicketConsumer.as_asgi(), '/ws/tickets/')
+        communicator.scope['user'] = self.technician
+        connected, _ = await communicator.connect()
+        self.assertTrue(connected)
+        return communicator
+
+    async def test_responsive_client_stays_connected(self):
+        communicator = await self.connect()
+        live = connection_registry.snapshot()['live']
+        for _ in range(10):
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'ping'})
+            await communicator.send_json_to({'action': 'pong'})
+        self.assertEqual(connection_registry.snapshot()['live'], live)
+        await communicator.disconnect()
+        self.assertEqual(connection_registry.snapshot()['live'], live - 1)
+
+    async def test_late_pong_evicts_a_lagging_client(self):
+        # Daphne never blocks the writer, so a slow reader only shows up as a late pong
+        with self.settings(WEBSOCKET_OUTBOUND={'MAX_LAG': 0.1}):
+            communicator = await self.connect()
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'ping'})
+            await communicator.send_json_to({'action': 'pong'})
+            self.assertEqual(await communicator.receive_json_from(), {'type': 'ping'})
+            await asyncio.sleep(0.15)
+            await communicator.send_json_to({'action': 'pong'})
+            while (output := await communicator.receive_output(timeout=1))['type'] == 'websocket.send':
+                frame = json.loads(output['text'])
+            self.assertEqual(frame, {'type': 'resync_required', 'reason': 'More than 0.1 seconds behind.'})
+            self.assertEqual(output, {'type': 'websocket.close', 'code': 4008})
+            await communicator.disconnect()
+
+    async def test_silent_client_is_reaped(self):
+        communicator = await self.connect()
+        before = connection_registry.snapshot()
+        await asyncio.sleep(0.1)
+        self.assertEqual(connection_registry.snapshot()['idle'], before['idle'] + 1)
+
+        while (output := await communicator.receive_output(timeout=1))['type'] == 'websocket.send':
+            self.assertEqual(json.loads(output['text']), {'type': 'ping'})
+        self.assertEqual(output, {'type': 'websocket.close', 'code': 4009})
+        after = connection_registry.snapshot()
+        self.assertEqual((after['live'], after['reaped']), (before['live'] - 1, before['reaped'] + 1))
+        # Out of the broadcast group right away, without waiting for the disconnect
+        await get_channel_layer().group_send(BROADCAST_GROUP, {'type': 'custom_notification', 'message': 'hi'})
+        self.assertTrue(await communicator.receive_nothing())
+
+
+class TicketPayloadCacheTests(TicketApiTestCase):
+    def setUp(self):
+        super().setUp()
+        payload_cache.clear()
+
+    def test_rest_and_websocket_share_the_rendered_payload(self):
+        ticket = self.create_tickets(1)[0]
+        url = reverse('api:api_v1:ticket-detail', args=[ticket.pk])
+        response = self.client.patch(url, {'priority': 'urgent'}, format='json')
+        self.assertEqual(response.json()['priority'], 'urgent')
+        self.assertEqual(response.json()['created_by']['email'], self.agent.email)
+
+        hits = payload_cache.hits
+        layer = RecordingChannelLayer()
+        ticket.refresh_from_db()
+        with mock.patch('services.websocket_service.get_channel_layer', return_value=layer):
+            WebSocketNotificationService._deliver_ticket_notification('ticket_updated', ticket.pk)
+        message = layer.messages[0][1]
+        self.assertEqual(payload_cache.hits, hits + 1)
+        self.assertEqual(json.loads(message['text']), {'type': 'ticket_updated', 'ticket': response.json()})
+
+    def test_save_invalidates_the_cached_payload(self):
+        ticket = self.create_tickets(1)[0]
+        url = reverse('api:api_v1:ticket-detail', args=[ticket.pk])
+        self.assertEqual(self.client.get(url).json()['title'], 'Ticket 0')
+        ticket.title = 'Renamed'
+        ticket.save()
+        self.assertEqual(self.client.get(url).json()['title'], 'Renamed')
+
+
+    def test_login_keeps_the_cached_payloads(self):
+        ticket = self.create_tickets(1)[0]
+        url = reverse('api:api_v1:ticket-detail', args=[ticket.pk])
+        self.client.get(url)
+        response = self.client.post(
+            reverse('api:token_obtain_pair'), {'email': self.agent.email, 'password': '123'}, format='json'
+        )
+        self.assertEqual(response.status_code, 200)
+        hits = payload_cache.hits
+        self.client.get(url)
+        self.assertEqual(payload_cache.hits, hits + 1)
+
+
+class TicketListFastPathTests(TicketApiTestCase):
+    def test_list_matches_ticket_serializer_in_one_query(self):
+        tickets = self.create_tickets(3)
+        Ticket.objects.filter(pk=tickets[0].pk).update(assigned_to=self.technician)
+        self.agent.first_name = 'Ana'
+        self.agent.save()
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('api:api_v1:ticket-list'))
+        expected = TicketSerializer(Ticket.objects.order_by('-created_at', '-id'), many=True).data
+        self.assertEqual(response.json()['results'], json.loads(JSONRenderer().render(expected)))
+
+
+class TicketBulkTests(TicketApiTestCase):
+    update_url = reverse('api:api_v1:ticket-bulk-update')
+    resolve_url = reverse('api:api_v1:ticket-bulk-resolve')
+
+    def test_bulk_update_is_one_read_and_one_write(self):
+        tickets = self.create_tickets(3)
+        ids = [ticket.pk for ticket in tickets]
+        self.client.get(reverse('api:api_v1:ticket-stats'))
+        layer = RecordingChannelLayer()
+        with mock.patch('services.websocket_service.get_channel_layer', return_value=layer):
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(6):  # SELECT, sequence UPDATE+SELECT, UPDATE + savepoint pair
+                    response = self.client.post(
+                        self.update_url, {'ids': ids, 'changes': {'priority': 'urgent', 'department': 'RH'}},
+                        format='json',
+                    )
+            notification_dispatcher.flush()
+        self.assertEqual(response.json(), {'updated': 3, 'ids': ids})
+        self.assertEqual(
+            set(Ticket.objects.values_list('priority', 'department', 'updated_by')),
+            {('urgent', 'RH', self.technician.pk)},
+        )
+        stats = self.client.get(reverse('api:api_v1:ticket-stats')).json()
+        self.assertEqual(stats['meta']['source'], 'cache')
+        self.assertEqual(stats['by_priority']['urgent'], 3)
+        self.assertEqual(stats['by_department'], {'RH': 3})
+        # Each group gets only its own tickets; groups with the same tickets share one event
+        frames = {group: json.loads(message['text']) for group, message in layer.messages}
+        self.assertEqual({frame['type'] for frame in frames.values()}, {'tickets_bulk_updated'})
+        self.assertEqual(frames['tickets.all']['ticket_ids'], ids)
+        self.assertEqual(frames['tickets.department.ti']['ticket_ids'], ids)
+        for ticket_id in ids:
+            self.assertEqual(frames[f'tickets.ticket.{ticket_id}']['ticket_ids'], [ticket_id])
+        event_ids = {}
+        for group, message in layer.messages:
+            event_ids.setdefault(tuple(frames[group]['ticket_ids']), set()).add(message['event_id'])
+        self.assertEqual([len(events) for events in event_ids.values()], [1] * (len(ids) + 1))
+        self.assertEqual(len(set().union(*event_ids.values())), len(ids) + 1)
+
+    def test_bulk_update_refreshes_cached_payloads(self):
+        ticket = self.create_tickets(1)[0]
+        url = reverse('api:api_v1:ticket-detail', args=[ticket.pk])
+        self.assertEqual(self.client.get(url).json()['priority'], 'low')
+        self.client.post(self.update_url, {'ids': [ticket.pk], 'changes': {'priority': 'high'}}, format='json')
+        self.assertEqual(self.client.get(url).json()['priority'], 'high')
+
+    def test_bulk_resolve_rejects_closed_tickets_without_changes(self):
+        open_ticket = self.create_tickets(1)[0]
+        closed = self.create_tickets(1, status=TicketStatus.CANCELLED.value)[0]
+        response = self.client.post(self.resolve_url, {'ids': [open_ticket.pk, closed.pk]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['ids'], [closed.pk])
+        open_ticket.refresh_from_db()
+        self.assertEqual(open_ticket.status, TicketStatus.OPEN.value)
+
+        response = self.client.post(self.resolve_url, {'ids': [open_ticket.pk]}, format='json')
+        self.assertEqual(response.json()['updated'], 1)
+        open_ticket.refresh_from_db()
+        self.assertEqual(open_ticket.status, TicketStatus.RESOLVED.value)
+
+    def test_bulk_requests_are_validated(self):
+        self.assertEqual(self.client.post(self.resolve_url, {'ids': [999]}, format='json').status_code, 404)
+        ticket = self.create_tickets(1)[0]
+        response = self.client.post(self.update_url, {'ids': [ticket.pk], 'changes': {}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        with override_settings(TICKET_BULK_MAX_IDS=1):
+            response = self.client.post(self.resolve_url, {'ids': [1, 2]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.client.force_authenticate(self.agent)
+        response = self.client.post(self.resolve_url, {'ids': [ticket.pk]}, format='json')
+        self.assertEqual(response.status_code, 403)
+
+
+@override_settings(TICKET_NOTIFICATIONS={'ASYNC': False})
+class TicketConditionalGetTests(TicketApiTestCase):
+    def get(self, url, etag=None):
+        headers = {'HTTP_IF_NONE_MATCH': etag} if etag else {}
+        return self.client.get(url, **headers)
+
+    def test_list_and_stats_revalidate_without_queries(self):
+        tickets = self.create_tickets(2)
+        for url in (reverse('api:api_v1:ticket-list'), reverse('api:api_v1:ticket-stats')):
+            response = self.get(url)
+            self.assertEqual(response.status_code, 200)
+            self.assertIn('no-cache', response['Cache-Control'])
+            with self.assertNumQueries(0):
+                cached = self.get(url, response['ETag'])
+            self.assertEqual(cached.status_code, 304)
+            self.assertEqual(cached['ETag'], response['ETag'])
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.client.patch(
+                    reverse('api:api_v1:ticket-detail', args=[tickets[0].pk]), {'priority': 'urgent'}, format='json'
+                )
+            self.assertEqual(self.get(url, response['ETag']).status_code, 200)
+
+    def test_login_keeps_the_etags_valid(self):
+        ticket = self.create_tickets(1)[0]
+        urls = (reverse('api:api_v1:ticket-list'), reverse('api:api_v1:ticket-detail', args=[ticket.pk]))
+        etags = [self.get(url)['ETag'] for url in urls]
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('api:token_obtain_pair'), {'email': self.agent.email, 'password': '123'}, format='json'
+            )
+        self.assertEqual(response.status_code, 200)
+        for url, etag in zip(urls, etags):
+            self.assertEqual(self.get(url, etag).status_code, 304)
+
+    def test_list_etag_depends_on_query(self):
+        self.create_tickets(2)
+        url = reverse('api:api_v1:ticket-list')
+        etag = self.get(url)['ETag']
+        self.assertEqual(self.get(url + '?status=open', etag).status_code, 200)
+
+    def test_retrieve_uses_updated_at_and_user_changes(self):
+        ticket = self.create_tickets(2)[0]
+        url = reverse('api:api_v1:ticket-detail', args=[ticket.pk])
+        response = self.get(url)
+        self.assertIn('Last-Modified', response)
+        hits, misses = payload_cache.hits, payload_cache.misses
+        self.assertEqual(self.get(url, response['ETag']).status_code, 304)
+        self.assertEqual((payload_cache.hits, payload_cache.misses), (hits, misses))
+        self.assertEqual(self.client.get(url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code, 304)
+
+        # Another ticket changing does not invalidate this one
+        Ticket.objects.get(pk=ticket.pk + 1).save()
+        self.assertEqual(self.get(url, response['ETag']).status_code, 304)
+
+        self.agent.first_name = 'Ana'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.agent.save()
+        response = self.get(url, response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['created_by']['first_name'], 'Ana')
+
+    def test_ticket_detail_page(self):
+        ticket = self.create_tickets(1)[0]
+        self.client.force_login(self.agent)
+        url = reverse('front:ticket_detail', args=[ticket.pk])
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.get(url, response['ETag']).status_code, 304)
+        ticket.title = 'Renamed'
+        ticket.save()
+        self.assertEqual(self.get(url, response['ETag']).status_code, 200)
+
+
+class TicketChangesFeedTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-changes')
+
+    def feed(self, since=None, **params):
+        if since is not None:
+            params['since'] = since
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_feed_returns_only_changes_after_the_cursor(self):
+        first, second, third = self.create_tickets(3)
+        cursor = self.feed(since='latest')['cursor']
+        self.assertEqual(self.feed(cursor)['results'], [])
+
+        self.client.patch(reverse('api:api_v1:ticket-detail', args=[second.pk]), {'priority': 'urgent'}, format='json')
+        self.client.post(reverse('api:api_v1:ticket-resolve', args=[first.pk]))
+        third.deleted_at = timezone.now()
+        third.save()
+
+        with self.assertNumQueries(1):
+            data = self.feed(cursor)
+        self.assertEqual([item['id'] for item in data['results']], [second.pk, first.pk, third.pk])
+        self.assertEqual(data['results'][0]['priority'], 'urgent')
+        self.assertEqual(data['results'][1]['status'], TicketStatus.RESOLVED.value)
+        self.assertTrue(data['results'][2]['deleted'])
+        self.assertNotIn('title', data['results'][2])
+        self.assertEqual(self.feed(data['cursor'])['results'], [])
+
+    def test_feed_pages_through_bulk_changes_sharing_a_sequence(self):
+        tickets = self.create_tickets(5)
+        cursor = self.feed(since='latest')['cursor']
+        ids = [ticket.pk for ticket in tickets]
+        self.client.post(reverse('api:api_v1:ticket-bulk-resolve'), {'ids': ids}, format='json')
+
+        seen = []
+        while True:
+            data = self.feed(cursor, page_size=2)
+            seen.extend(item['id'] for item in data['results'])
+            cursor = data['cursor']
+            if not data['has_more']:
+                break
+        self.assertEqual(seen, ids)
+
+    def test_feed_without_cursor_starts_from_the_beginning(self):
+        tickets = self.create_tickets(2)
+        self.assertEqual([item['id'] for item in self.feed()['results']], [ticket.pk for ticket in tickets])
+        self.assertEqual(self.client.get(self.url, {'since': 'bogus'}).status_code, 400)
+
+
+class TicketArchiveTierTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-list')
+
+    def setUp(self):
+        super().setUp()
+        self.tickets = self.create_tickets(6, status=TicketStatus.RESOLVED.value)
+        self.create_tickets(2)
+        Ticket.objects.filter(pk__in=[t.pk for t in self.tickets[::2]]).update(
+            updated_at=timezone.now() - timedelta(days=400)
+        )
+        self.created_at = dict(Ticket.objects.values_list('id', 'created_at'))
+        call_command('archive_closed_tickets', '--days', '180', stdout=StringIO())
+
+    def ids(self, response):
+        return [row['id'] for row in response.json()['results']]
+
+    def test_closed_filter_reads_both_tiers_in_order(self):
+        self.assertEqual(Ticket.objects.filter(status=TicketStatus.RESOLVED.value).count(), 3)
+        expected = sorted(self.tickets, key=lambda t: (self.created_at[t.pk], t.pk), reverse=True)
+        seen, url = [], f'{self.url}?status=resolved&page_size=4'
+        while url:
+            response = self.client.get(url)
+            seen.extend(self.ids(response))
+            url = response.json()['next']
+        self.assertEqual(seen, [t.pk for t in expected])
+        archived = self.client.get(f'{self.url}?status=resolved').json()['results']
+        row = next(row for row in archived if row['id'] == self.tickets[0].pk)
+        self.assertEqual(row['created_by']['email'], self.agent.email)
+
+    def test_default_list_and_stats(self):
+        self.assertEqual(len(self.ids(self.client.get(self.url))), 5)
+        self.assertEqual(len(self.ids(self.client.get(f'{self.url}?status=resolved&page=1'))), 6)
+        self.assertEqual(len(self.ids(self.client.get(f'{self.url}?status=resolved&search=ticket'))), 6)
+        with self.assertNumQueries(1):
+            stats = self.client.get(reverse('api:api_v1:ticket-stats')).json()
+        self.assertEqual((stats['total'], stats['resolved']), (8, 6))
+
+    def test_archived_ticket_detail(self):
+        archived = self.tickets[0]
+        self.assertFalse(Ticket.all_objects.filter(pk=archived.pk).exists())
+        data = self.client.get(reverse('api:api_v1:ticket-detail', args=[archived.pk])).json()
+        self.assertEqual((data['id'], data['status'], data['created_by']['email']), (archived.pk, 'resolved', self.agent.email))
+        self.assertEqual(self.client.get(reverse('api:api_v1:ticket-detail', args=[10 ** 6])).status_code, 404)
+        token = AccessToken.for_user(self.technician)
+        response = self.client.get(
+            reverse('api:api_v1:async_ticket_detail', args=[archived.pk]), HTTP_AUTHORIZATION=f'Bearer {token}'
+        )
+        self.assertEqual(response.json(), data)
+
+        self.client.force_login(self.agent)
+        response = self.client.get(reverse('front:ticket_detail', args=[archived.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, archived.title)
+
+
+class TicketExportTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-export')
+
+    def content(self, response):
+        self.assertTrue(response.streaming)
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export_streams_filtered_rows(self):
+        self.create_tickets(4)
+        self.create_tickets(2, department='RH')
+        response = self.client.get(self.url, {'department': 'RH'})
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        self.assertIn('attachment;', response['Content-Disposition'])
+        lines = self.content(response).splitlines()
+        self.assertEqual(lines[0].split(',')[:3], ['id', 'title', 'description'])
+        self.assertEqual(len(lines), 3)
+        self.assertIn(self.agent.email, lines[1])
+
+    def test_ndjson_export_with_search(self):
+        self.create_tickets(3)
+        Ticket.objects.filter(pk=Ticket.objects.first().pk).update(title='Impressora quebrada')
+        response = self.client.get(self.url, {'output': 'ndjson', 'search': 'impressora'})
+        rows = [json.loads(line) for line in self.content(response).splitlines()]
+        self.assertEqual([row['title'] for row in rows], ['Impressora quebrada'])
+        self.assertEqual(rows[0]['created_by_email'], self.agent.email)
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, 400)
+
+    def test_csv_cells_cannot_become_formulas(self):
+        ticket = self.create_tickets(1)[0]
+        Ticket.objects.filter(pk=ticket.pk).update(title='=HYPERLINK("http://x")', description='@SUM(A1)')
+        lines = self.content(self.client.get(self.url)).splitlines()
+        self.assertIn('"\'=HYPERLINK(""http://x"")",\'@SUM(A1)', lines[1])
+        rows = self.content(self.client.get(self.url, {'output': 'ndjson'})).splitlines()
+        self.assertEqual(json.loads(rows[0])['title'], '=HYPERLINK("http://x")')
+
+    async def test_asgi_export_streams_an_async_iterator(self):
+        await database_sync_to_async(self.create_tickets)(3)
+        token = AccessToken.for_user(self.technician)
+        response = await self.async_client.get(self.url, headers={'Authorization': f'Bearer {token}'})
+        self.assertTrue(response.is_async)
+        content = b''.join([chunk async for chunk in response.streaming_content]).decode('utf-8')
+        self.assertEqual(len(content.splitlines()), 4)
+
+
+class TicketImportTests(TicketApiTestCase):
+    url = reverse('api:api_v1:ticket-import')
+
+    def upload(self, name, content, **data):
+        upload = SimpleUploadedFile(name, content.encode('utf-8'))
+        return self.client.post(self.url, {'file': upload, **data}, format='multipart')
+
+    def test_csv_import_validates_and_inserts_in_batches(self):
+        content = (
+            'title,description,priority,department,created_by_email,assigned_to_email,status\n'
+            'Rede,Sem rede,high,TI,agent@example.com,technician@example.com,in_progress\n'
+            'Sem criador,Descrição,low,TI,ghost@example.com,,\n'
+            ',Sem título,low,TI,,,\n'
+            '"Impressora","Linha 1\nLinha 2",urgent,RH,,,\n'
+        )
+        layer = RecordingChannelLayer()
+        with override_settings(TICKET_IMPORT_BATCH_SIZE=1):
+            with mock.patch('services.websocket_service.get_channel_layer', return_value=layer):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.upload('tickets.csv', content)
+                notification_dispatcher.flush()
+
+        self.assertEqual(response.status_code, 201)
+        data = response.json()
+        self.assertEqual((data['imported'], data['skipped']), (2, 2))
+        self.assertEqual([error['line'] for error in data['errors']], [3, 4])
+        self.assertIn('created_by_email', data['errors'][0]['errors'])
+        self.assertIn('title', data['errors'][1]['errors'])
+
+        first, second = Ticket.objects.order_by('id')
+        self.assertEqual((first.created_by, first.assigned_to, first.status), (self.agent, self.technician, 'in_progress'))
+        self.assertEqual((second.created_by, second.description), (self.technician, 'Linha 1\nLinha 2'))
+        found = self.client.get(reverse('api:api_v1:ticket-list'), {'search': 'impressora'}).json()['results']
+        self.assertEqual([row['id'] for row in found], [second.pk])
+        # One summary event instead of one per ticket
+        self.assertEqual(
+            [json.loads(message['text']) for _group, message in layer.messages],
+            [{'type': 'tickets_imported', 'count': 2}],
+        )
+
+    def test_ndjson_import_and_permissions(self):
+        content = '{"title": "A", "description": "B", "department": "TI"}\nnot json\n'
+        response = self.upload('tickets.ndjson', content)
+        self.assertEqual((response.json()['imported'], response.json()['skipped']), (1, 1))
+        self.assertEqual(Ticket.objects.get().priority, 'medium')
+        self.client.force_authenticate(self.agent)
+        self.assertEqual(self.upload('tickets.ndjson', content).status_code, 403)
+
+    def test_invalid_encoding_is_a_bad_request_and_keeps_the_imported_batches(self):
+        self.client.get(reverse('api:api_v1:ticket-stats'))
+        content = 'title,description,department\nRede,Sem rede,TI\nImpressão,Sem papel,TI\n'.encode('latin-1')
+        layer = RecordingChannelLayer()
+        with override_settings(TICKET_IMPORT_BATCH_SIZE=1):
+            with mock.patch('services.websocket_service.get_channel_layer', return_value=layer):
+                with self.captureOnCommitCallbacks(execute=True):
+                    response = self.client.post(
+                        self.url, {'file': SimpleUploadedFile('tickets.csv', content)}, format='multipart'
+                    )
+                notification_dispatcher.flush()
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()['imported'], 1)
+        self.assertIn('UTF-8', response.json()['error'])
+        self.assertEqual(list(Ticket.objects.values_list('title', flat=True)), ['Rede'])
+        self.assertEqual(self.client.get(reverse('api:api_v1:ticket-stats')).json()['total'], 1)
+        self.assertEqual(len(layer.messages), 1)
+
+    def test_import_command(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False, encoding='utf-8') as handle:
+            handle.write('title,description,department,created_by_email\nA,B,TI,agent@example.com\n')
+        out = StringIO()
+        call_command('import_tickets', handle.name, '--batch-size', '10', stdout=out)
+        os.unlink(handle.name)
+        self.assertIn('1 ticket(s) imported, 0 skipped', out.getvalue())
+        self.assertEqual(Ticket.objects.get().created_by, self.agent)
+
+
+@override_settings(REQUEST_INSTRUMENTATION={'ENABLED': True, 'SLOW_REQUEST_MS': 0, 'MAX_LOGGED_QUERIES': 5})
+class RequestInstrumentationTests(TicketApiTestCase):
+    def setUp(self):
+        super().setUp()
+        request_metrics.reset()
+
+    def test_server_timing_metrics_and_slow_log(self):
+        self.create_tickets(3)
+        with self.assertLogs('config.middleware', level='WARNING') as logs:
+            response = self.client.get(reverse('api:api_v1:ticket-list'))
+            views = self.client.get(reverse('api:api_v1:request_metrics')).json()
+        self.assertEqual(response.status_code, 200)
+        timing = response['Server-Timing']
+        self.assertRegex(timing, r'db;dur=[\d.]+;desc="\d+ queries"')
+        for metric in ('render;dur=', 'app;dur=', 'total;dur='):
+            self.assertIn(metric, timing)
+        self.assertIn('Slow request GET /api/v1/tickets/ (api:api_v1:ticket-list)', logs.output[0])
+        self.assertIn('SELECT', logs.output[0])
+
+        self.assertTrue(views['enabled'])
+        row = views['views']['api:api_v1:ticket-list']
+        self.assertEqual(row['requests'], 1)
+        self.assertGreater(row['mean_queries'], 0)
+        self.assertGreater(row['mean_bytes'], 0)
+
+    def test_profiles_only_the_slowest_requests_are_kept(self):
+        with tempfile.TemporaryDirectory() as directory:
+            settings = {'ENABLED': True, 'SLOW_REQUEST_MS': 0, 'PROFILE_DIR': directory,
+                        'PROFILE_SAMPLE_RATE': 1.0, 'PROFILE_KEEP': 2}
+            with override_settings(REQUEST_INSTRUMENTATION=settings), self.assertLogs('config.middleware'):
+                client = self.client_class()
+                client.force_authenticate(self.technician)
+                for _ in range(4):
+                    client.get(reverse('api:api_v1:ticket-stats'))
+            self.assertEqual(len([name for name in os.listdir(directory) if name.endswith('.prof')]), 2)
+
+    def test_disabled_by_default(self):
+        with override_settings(REQUEST_INSTRUMENTATION={'ENABLED': False}):
+            client = self.client_class()
+            client.force_authenticate(self.technician)
+            response = client.get(reverse('api:api_v1:ticket-list'))
+            self.assertNotIn('Server-Timing', response)
+            self.assertFalse(client.get(reverse('api:api_v1:request_metrics')).json()['enabled'])
+
+
+class CachedJWTAuthenticationTests(TicketApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        token = self.client.post(
+            reverse('api:token_obtain_pair'), {'email': 'technician@example.com', 'password': '123'}
+        ).json()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        self.create_tickets(2)
+
+    def user_queries(self, url):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url)
+        return response, [query['sql'] for query in captured if 'core_customuser' in query['sql']]
+
+    def test_read_endpoints_skip_the_user_query(self):
+        url = reverse('api:api_v1:ticket-stats')
+        response, queries = self.user_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.user_queries(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(queries, [])
+
+    def test_user_changes_invalidate_the_cache(self):
+        url = reverse('api:api_v1:ticket-stats')
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.technician.role = 'agent'
+        with self.captureOnCommitCallbacks(execute=True):
+            self.technician.save()
+        self.assertEqual(self.client.get(url).status_code, 403)
+        self.technician.is_active = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.technician.save()
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+    def test_user_changed_during_the_load_is_not_cached_as_current(self):
+        url = reverse('api:api_v1:ticket-stats')
+        load = JWTAuthentication.get_user
+
+        def load_then_change(authentication, validated_token):
+            user = load(authentication, validated_token)
+            TicketVersionService._bump(TicketVersionService.USERS)
+            return user
+
+        with mock.patch.object(JWTAuthentication, 'get_user', load_then_change):
+            self.client.get(url)
+        _response, queries = self.user_queries(url)
+        self.assertEqual(len(queries), 1)
+
+    def test_cached_user_is_a_fresh_instance(self):
+        # Writes through the cached user keep working as foreign keys
+        response = self.client.post(
+            reverse('api:api_v1:ticket-resolve', args=[Ticket.objects.first().pk])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Ticket.objects.filter(updated_by=self.technician).count(), 1)
+
+    def test_has_roles_accepts_any_iterable(self):
+        self.assertTrue(has_roles(self.technician, SUPPORT_READ_ROLES))
+        self.assertTrue(has_roles(self.technician, [UserRole.TECHNICIAN]))
+        self.assertTrue(has_roles(self.technician, ['admin', 'technician']))
+        self.assertFalse(has_roles(self.agent, SUPPORT_READ_ROLES))
+        self.assertFalse(has_roles(AnonymousUser(), SUPPORT_READ_ROLES))
+
+
+@override_settings(TICKET_NOTIFICATIONS={'ASYNC': False})
+class AsyncReadEndpointTests(TicketApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_authenticate(None)
+        self.tickets = self.create_tickets(5)
+
+    def login(self, email):
+        token = self.client.post(reverse('api:token_obtain_pair'), {'email': email, 'password': '123'}).json()['access']
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def assertSameResponse(self, sync_name, async_name, args=(), **params):
+        expected = self.client.get(reverse(f'api:api_v1:{sync_name}', args=args), params)
+        response = self.client.get(reverse(f'api:api_v1:{async_name}', args=args), params)
+        self.assertEqual(response.status_code, 200)
+        # Only the next/previous links differ (they point back at the async URL)
+        self.assertEqual(json.loads(response.content.replace(b'/async/', b'/')), expected.json())
+        self.assertEqual('ETag' in response, 'ETag' in expected)
+        return response
+
+    def test_responses_match_the_sync_endpoints(self):
+        self.login('technician@example.com')
+        self.assertSameResponse('ticket-list', 'async_ticket_list')
+        self.assertSameResponse('ticket-list', 'async_ticket_list', priority='urgent', ordering='priority')
+        first = self.assertSameResponse('ticket-list', 'async_ticket_list', page_size=2).json()
+        self.assertSameResponse('ticket-list', 'async_ticket_list', page_size=2, cursor=parse_qs(urlparse(first['next']).query)['cursor'][0])
+        self.assertSameResponse('ticket-list', 'async_ticket_list', page=2, page_size=2)
+        self.assertSameResponse('ticket-detail', 'async_ticket_detail', args=[self.tickets[0].pk])
+        expected = self.client.get(reverse('api:api_v1:ticket-stats')).json()
+        stats = self.client.get(reverse('api:api_v1:async_ticket_stats')).json()
+        self.assertEqual(stats.pop('meta')['source'], 'cache')
+        expected.pop('meta')
+        self.assertEqual(stats, expected)
+        self.assertSameResponse('ticket-changes', 'async_ticket_changes', page_size=2)
+        self.assertSameResponse('ticket-changes', 'async_ticket_changes', since='latest')
+
+    def test_closed_filters_fall_back_to_the_sync_list(self):
+        self.login('technician@example.com')
+        Ticket.objects.filter(pk=self.tickets[0].pk).update(status=TicketStatus.RESOLVED.value)
+        data = self.assertSameResponse('ticket-list', 'async_ticket_list', status='resolved').json()
+        self.assertEqual([row['id'] for row in data['results']], [self.tickets[0].pk])
+
+    def test_conditional_get(self):
+        self.login('technician@example.com')
+        url = reverse('api:api_v1:async_ticket_stats')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('api:api_v1:ticket-resolve', args=[self.tickets[0].pk]))
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_errors(self):
+        url = reverse('api:api_v1:async_ticket_list')
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 401)
+        self.assertIn('WWW-Authenticate', response)
+        self.client.credentials(HTTP_AUTHORIZATION='Bearer bogus')
+        self.assertEqual(self.client.get(url).status_code, 401)
+
+        self.login('agent@example.com')
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+        self.login('technician@example.com')
+        self.assertEqual(self.client.post(url).status_code, 405)
+        self.assertEqual(self.client.get(url, {'cursor': 'bogus'}).status_code, 404)
+        self.assertEqual(self.client.get(reverse('api:api_v1:async_ticket_detail', args=[0])).status_code, 404)
+        response = self.client.get(reverse('api:api_v1:async_ticket_changes'), {'since': 'bogus'})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json(), {'error': 'Invalid cursor.'})
@@ -0,0 +1,144 @@
+"""
+ASGI-native versions of the hot ticket read endpoints.
+
+``TicketViewSet`` is synchronous (DRF has no async views), so under Daphne
+every request hops to the single thread that runs sync views. These plain
+Django ``async def`` views return the same JSON as the ``list``, ``retrieve``,
+``stats`` and ``changes`` actions, with the same filters, keyset cursors and
+ETags, but stay on the event loop: the JWT user and the stats come from
+caches and rows are read with the async ORM. Offset pages (``?page=``) and
+closed-status filters (which merge the archive tier) fall back to the sync
+view. Served under ``/api/v1/async/tickets/``.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from django.utils import translation
+from django.views.decorators.http import require_GET
+from rest_framework.exceptions import APIException, NotAuthenticated, NotFound
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+
+from api.authentication import CachedJWTAuthentication
+from core.models import Ticket
+from services import InvalidChangeCursor, archive_service, changes_service, payload_cache, stats_service
+from services.conditional_service import TicketVersionService, make_etag, not_modified, set_validators
+from services.permissions import require_roles
+from services.roles import SUPPORT_READ_ROLES
+from .pagination import TicketKeysetPagination
+from .serializers import TicketRowSerializer
+from .views import TicketViewSet, changes_page, changes_rows
+
+authentication = CachedJWTAuthentication()
+sync_ticket_list = sync_to_async(TicketViewSet.as_view({'get': 'list'}))
+
+
+def json_response(data, status=200):
+    # Same bytes as DRF's JSONRenderer in the sync views
+    return HttpResponse(JSONRenderer().render(data), status=status, content_type='application/json')
+
+
+def error_response(error):
+    response = json_response({'detail': error.detail}, status=error.status_code)
+    if isinstance(error, NotAuthenticated) or error.status_code == 401:
+        response['WWW-Authenticate'] = authentication.authenticate_header(None)
+    return response
+
+
+def read_endpoint(view):
+    """JWT authentication and read-role check for an async view; API errors become JSON responses"""
+
+    @wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        try:
+            authenticated = await authentication.aauthenticate(request)
+            if authenticated is None:
+                raise NotAuthenticated()
+            request.user, request.auth = authenticated
+            require_roles(request.user, SUPPORT_READ_ROLES)
+            return await view(request, *args, **kwargs)
+        except APIException as error:
+            return error_response(error)
+
+    return require_GET(wrapper)
+
+
+def validators(scopes, *parts):
+    """Like ``TicketViewSet._validators`` for JSON responses"""
+    tokens, last_modified = TicketVersionService.combined(*scopes)
+    return make_etag(*tokens, *parts, translation.get_language(), 'json'), last_modified
+
+
+def filtered_queryset(request):
+    """The viewset's filter backends (status/priority/department, ordering, search) applied to the tickets"""
+    view = TicketViewSet(action='list', args=(), kwargs={}, format_kwarg=None)
+    view.request = Request(request)
+    view.request.user = request.user
+    return view.filter_queryset(view.get_queryset()), view.request
+
+
+@read_endpoint
+async def ticket_list(request):
+    """Async ``GET /tickets/`` (keyset pages)"""
+    if 'page' in request.GET or archive_service.wants_closed(request.GET.get('status')):
+        # Offset pages and the archive tier keep the sync implementation
+        return await sync_ticket_list(request)
+
+    etag, last_modified = validators(
+        [TicketVersionService.TICKETS, TicketVersionService.USERS], 'list', request.get_full_path()
+    )
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    queryset, drf_request = filtered_queryset(request)
+    paginator = TicketKeysetPagination()
+    page = await paginator.apaginate_queryset(TicketRowSerializer.values(queryset), drf_request)
+    data = paginator.get_paginated_response(TicketRowSerializer().serialize(page)).data
+    return set_validators(json_response(data), etag, last_modified)
+
+
+@read_endpoint
+async def ticket_detail(request, pk):
+    """Async ``GET /tickets/<id>/``"""
+    try:
+        ticket = await Ticket.objects.select_related('created_by', 'assigned_to').aget(pk=pk)
+    except Ticket.DoesNotExist:
+        # Closed tickets moved to the archive tier stay readable
+        ticket = await sync_to_async(archive_service.get_closed)(pk)
+        if ticket is None:
+            raise NotFound('No Ticket matches the given query.')
+    etag, user_modified = validators([TicketVersionService.USERS], 'ticket', ticket.pk, ticket.updated_at)
+    last_modified = max(ticket.updated_at, user_modified)
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    response = HttpResponse(payload_cache.get_json(ticket), content_type='application/json')
+    return set_validators(response, etag, last_modified)
+
+
+@read_endpoint
+async def ticket_stats(request):
+    """Async ``GET /tickets/stats/``"""
+    etag, last_modified = validators([TicketVersionService.TICKETS], 'stats')
+    response = not_modified(request, etag, last_modified)
+    if response is not None:
+        return response
+    return set_validators(json_response(await stats_service.aget_stats()), etag, last_modified)
+
+
+@read_endpoint
+async def ticket_changes(request):
+    """Async ``GET /tickets/changes/`` (the polling/resync feed)"""
+    since = request.GET.get('since')
+    if since == changes_service.LATEST:
+        return json_response({'results': [], 'cursor': await changes_service.alatest_cursor(), 'has_more': False})
+
+    page_size = TicketKeysetPagination().get_page_size(Request(request))
+    try:
+        queryset = changes_service.changed_since(Ticket.all_objects.all(), since)
+    except InvalidChangeCursor:
+        return json_response({'error': 'Invalid cursor.'}, status=400)
+    rows = [row async for row in changes_rows(queryset, page_size)]
+    return json_response(changes_page(rows, page_size, since))
@@ -0,0 +1,21 @@
+from rest_framework.filters import SearchFilter
+
+from services import search_service
+
+
+class TicketSearchFilter(SearchFilter):
+    """
+    ``?search=`` backed by the full-text search service instead of ``icontains``.
+
+    Runs after ``OrderingFilter``: without an explicit ``?ordering=`` the
+    results are ordered by relevance (``search_rank``, then ``id``).
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        query = request.query_params.get(self.search_param, '')
+        if not query.strip():
+            return queryset
+        ranked = search_service.search(queryset, query)
+        if request.query_params.get('ordering'):
+            return ranked.order_by(*queryset.query.order_by)
+        return ranked
@@ -0,0 +1,239 @@
+import base64
+import binascii
+import heapq
+import json
+from collections import OrderedDict
+from functools import cmp_to_key
+
+from django.conf import settings
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db.models import Q
+from django.utils.encoding import force_str
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def _pagination_setting(name, default):
+    return getattr(settings, 'TICKET_PAGINATION', {}).get(name, default)
+
+
+class TieredRows:
+    """
+    Several ordered ``values()`` querysets (e.g. live tickets and the archive) read as one.
+
+    Supports the queryset subset the ticket paginators use: ``order_by``,
+    ``filter`` and ``count`` apply to every tier, and a slice fetches at most
+    ``stop`` rows from each tier (each one through its own index) and merges
+    them in ordering order.
+    """
+
+    ordered = True
+
+    def __init__(self, first, *others):
+        # Every tier follows the first one's ordering so the merge is valid
+        ordering = first.query.order_by or first.model._meta.ordering
+        self.querysets = (first, *(queryset.order_by(*ordering) for queryset in others))
+        self.model = first.model
+        self.query = first.query
+
+    def order_by(self, *fields):
+        return TieredRows(*(queryset.order_by(*fields) for queryset in self.querysets))
+
+    def filter(self, *args, **kwargs):
+        return TieredRows(*(queryset.filter(*args, **kwargs) for queryset in self.querysets))
+
+    def count(self):
+        return sum(queryset.count() for queryset in self.querysets)
+
+    def __len__(self):
+        return self.count()
+
+    def _key(self):
+        ordering = [str(field) for field in self.query.order_by]
+
+        def compare(a, b):
+            for field in ordering:
+                name = field.lstrip('-')
+                if a[name] != b[name]:
+                    result = -1 if a[name] < b[name] else 1
+                    return -result if field.startswith('-') else result
+            return 0
+
+        return cmp_to_key(compare)
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index:index + 1][0]
+        start, stop = index.start or 0, index.stop
+        tiers = [queryset[:stop] if stop is not None else queryset for queryset in self.querysets]
+        rows = list(heapq.merge(*tiers, key=self._key()))
+        return rows[start:stop]
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class TicketKeysetPagination(BasePagination):
+    """
+    Keyset (cursor) pagination on a composite ``(field, id)`` key.
+
+    The first ordering field applied by ``OrderingFilter`` (``-created_at`` by
+    default) is combined with the primary key as a tie breaker, so every page
+    is fetched with an indexed ``WHERE (field, id) < (value, pk)`` instead of
+    an ``OFFSET`` and costs the same no matter how deep it is.
+    """
+
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    invalid_cursor_message = 'Invalid cursor'
+    default_ordering = '-created_at'
+
+    def __init__(self):
+        self.page_size = _pagination_setting('PAGE_SIZE', 20)
+        self.max_page_size = _pagination_setting('MAX_PAGE_SIZE', 100)
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return self.page_size
+        if page_size <= 0:
+            return self.page_size
+        return min(page_size, self.max_page_size)
+
+    def get_ordering(self, queryset):
+        """Returns the composite key: first ordering field plus ``id`` in the same direction"""
+        order_by = queryset.query.order_by or queryset.model._meta.ordering or [self.default_ordering]
+        field = str(order_by[0])
+        if field.lstrip('-') in ('id', 'pk'):
+            return (field.replace('pk', 'id'),)
+        return (field, '-id' if field.startswith('-') else 'id')
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self._set_page(list(self._page_queryset(queryset, request)))
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """``paginate_queryset`` for async views: the page is read with the async ORM"""
+        return self._set_page([row async for row in self._page_queryset(queryset, request)])
+
+    def _page_queryset(self, queryset, request):
+        """Ordered, cursor-filtered slice with one row more than the page (to detect a next page)"""
+        self.request = request
+        self.model = queryset.model
+        self.page_size = self.get_page_size(request)
+        self.ordering = self.get_ordering(queryset)
+        self.cursor = self.decode_cursor(request)
+
+        self.reverse = bool(self.cursor and self.cursor['r'])
+        ordering = [self._invert(f) for f in self.ordering] if self.reverse else list(self.ordering)
+        queryset = queryset.order_by(*ordering)
+        if self.cursor:
+            queryset = queryset.filter(self._after_position(ordering, self.cursor['p']))
+        return queryset[: self.page_size + 1]
+
+    def _set_page(self, results):
+        reverse = self.reverse
+        has_more = len(results) > self.page_size
+        self.page = results[: self.page_size]
+
+        if reverse:
+            self.page.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous, self.has_next = self.cursor is not None, has_more
+        return self.page
+
+    def get_paginated_response(self, data):
+        return Response(
+            OrderedDict([('next', self.get_next_link()), ('previous', self.get_previous_link()), ('results', data)])
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.encode_cursor(self.page[-1], reverse=False)
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        if not self.page:
+            return remove_query_param(self.request.build_absolute_uri(), self.cursor_query_param)
+        return self.encode_cursor(self.page[0], reverse=True)
+
+    # ----- Cursor encoding -----
+    def encode_cursor(self, instance, reverse):
+        position = [self._field_value(instance, f.lstrip('-')) for f in self.ordering]
+        payload = json.dumps({'o': self.ordering[0], 'r': int(reverse), 'p': position}, separators=(',', ':'))
+        token = base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+        return replace_query_param(self.request.build_absolute_uri(), self.cursor_query_param, token)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            cursor = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if cursor['o'] != self.ordering[0] or len(cursor['p']) != len(self.ordering):
+                raise ValueError
+            cursor['p'] = [self._to_python(f.lstrip('-'), value) for f, value in zip(self.ordering, cursor['p'])]
+        except (TypeError, ValueError, KeyError, binascii.Error, ValidationError):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor
+
+    # ----- Helpers -----
+    def _to_python(self, name, value):
+        try:
+            field = self.model._meta.get_field(name)
+        except FieldDoesNotExist:
+            # Annotations (e.g. ``search_rank``) keep their JSON value
+            if not isinstance(value, (int, float, str)):
+                raise ValueError
+            return value
+        return field.to_python(value)
+
+    @staticmethod
+    def _field_value(instance, name):
+        # Rows may be model instances or ``values()`` dicts
+        value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+        if hasattr(value, 'isoformat'):
+            return value.isoformat()
+        return value if isinstance(value, (int, float)) else force_str(value)
+
+    @staticmethod
+    def _invert(field):
+        return field[1:] if field.startswith('-') else f'-{field}'
+
+    @staticmethod
+    def _after_position(ordering, position):
+        """Builds ``(a, b) > (x, y)`` as ``a > x OR (a = x AND b > y)`` honouring each field's direction"""
+        condition = Q()
+        equal = Q()
+        for field, value in zip(ordering, position):
+            name = field.lstrip('-')
+            lookup = 'lt' if field.startswith('-') else 'gt'
+            condition |= equal & Q(**{f'{name}__{lookup}': value})
+            equal &= Q(**{name: value})
+        return condition
+
+
+class TicketOffsetPagination(PageNumberPagination):
+    """Classic page-number pagination, kept as an opt-in for clients that need page numbers"""
+
+    page_size_query_param = 'page_size'
+
+    def __init__(self):
+        self.page_size = _pagination_setting('PAGE_SIZE', 20)
+        self.max_page_size = _pagination_setting('MAX_PAGE_SIZE', 100)
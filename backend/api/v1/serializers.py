@@ -1,8 +1,26 @@
+from functools import lru_cache
+
 from rest_framework import serializers
-from django.utils.translation import gettext_lazy as _
+from django.conf import settings
+from django.utils import timezone, translation
 from core.models import Ticket, CustomUser, TicketStatus
 
 
+# Display labels (lazy) for status/priority, resolved once per language by ``display_labels``
+STATUS_LABELS = dict(TicketStatus.get_choices())
+PRIORITY_LABELS = dict(Ticket.PRIORITY_CHOICES)
+
+
+@lru_cache(maxsize=None)
+def display_labels(language):
+    """Returns ``(status_labels, priority_labels)`` as plain strings for ``language``"""
+    with translation.override(language):
+        return (
+            {value: str(label) for value, label in STATUS_LABELS.items()},
+            {value: str(label) for value, label in PRIORITY_LABELS.items()},
+        )
+
+
 class UserSerializer(serializers.ModelSerializer):
     """Serializer for CustomUser"""
     full_name = serializers.SerializerMethodField()
@@ -34,23 +52,81 @@ class TicketSerializer(serializers.ModelSerializer):
     
     def get_status_display(self, obj):
         """Get translated status display"""
-        status_map = {
-            TicketStatus.OPEN.value: _('Open'),
-            TicketStatus.IN_PROGRESS.value: _('In Progress'),
-            TicketStatus.RESOLVED.value: _('Resolved'),
-            TicketStatus.CANCELLED.value: _('Cancelled'),
-        }
-        return str(status_map.get(obj.status, obj.status))
+        status_labels, _priority_labels = display_labels(translation.get_language())
+        return status_labels.get(obj.status, obj.status)
     
     def get_priority_display(self, obj):
         """Get translated priority display"""
-        priority_map = {
-            'low': _('Baixa'),
-            'medium': _('Média'),
-            'high': _('Alta'),
-            'urgent': _('Urgente'),
+        _status_labels, priority_labels = display_labels(translation.get_language())
+        return priority_labels.get(obj.priority, obj.priority)
+
+
+class TicketRowSerializer:
+    """
+    Fast read-only serializer for ticket lists.
+
+    Produces the same JSON as ``TicketSerializer(many=True)`` from a single
+    ``values()`` query (ticket columns plus both users' columns through
+    joins), without DRF field machinery or per-row nested serializers.
+    """
+
+    ticket_fields = ('id', 'title', 'description', 'priority', 'department', 'status', 'created_at', 'updated_at')
+    user_fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'department')
+    user_relations = ('created_by', 'assigned_to')
+
+    def __init__(self, language=None):
+        self.status_labels, self.priority_labels = display_labels(language or translation.get_language())
+        self.timezone = timezone.get_current_timezone()
+
+    def datetime(self, value):
+        """Same output as DRF's ``DateTimeField.to_representation`` for aware datetimes"""
+        if value is None:
+            return None
+        value = value.astimezone(self.timezone).isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    @classmethod
+    def values(cls, queryset, extra_fields=()):
+        """``values()`` queryset with every column the rows need (keeps filters, ordering and annotations)"""
+        columns = [*cls.ticket_fields, *extra_fields, *queryset.query.annotations]
+        for relation in cls.user_relations:
+            columns.extend(f'{relation}__{field}' for field in cls.user_fields)
+        return queryset.values(*columns)
+
+    def user(self, row, relation):
+        prefix = f'{relation}__'
+        if row[prefix + 'id'] is None:
+            return None
+        first_name, last_name, username = row[prefix + 'first_name'], row[prefix + 'last_name'], row[prefix + 'username']
+        return {
+            'id': row[prefix + 'id'],
+            'username': username,
+            'email': row[prefix + 'email'],
+            'first_name': first_name,
+            'last_name': last_name,
+            'full_name': f'{first_name} {last_name}'.strip() or username,
+            'role': row[prefix + 'role'],
+            'department': row[prefix + 'department'],
         }
-        return str(priority_map.get(obj.priority, obj.priority))
+
+    def row(self, row):
+        return {
+            'id': row['id'],
+            'title': row['title'],
+            'description': row['description'],
+            'priority': row['priority'],
+            'priority_display': self.priority_labels.get(row['priority'], row['priority']),
+            'department': row['department'],
+            'status': row['status'],
+            'status_display': self.status_labels.get(row['status'], row['status']),
+            'created_by': self.user(row, 'created_by'),
+            'assigned_to': self.user(row, 'assigned_to'),
+            'created_at': self.datetime(row['created_at']),
+            'updated_at': self.datetime(row['updated_at']),
+        }
+
+    def serialize(self, rows):
+        return [self.row(row) for row in rows]
 
 
 class TicketCreateSerializer(serializers.ModelSerializer):
@@ -79,7 +155,42 @@ class TicketUpdateSerializer(serializers.ModelSerializer):
         if ticket and ticket.status in TicketStatus.get_non_editable_statuses():
             raise serializers.ValidationError("Cannot edit closed or cancelled tickets.")
         return value
-    
+
+
+def bulk_max_ids():
+    return getattr(settings, 'TICKET_BULK_MAX_IDS', 500)
+
+
+class TicketBulkResolveSerializer(serializers.Serializer):
+    """Serializer for bulk resolve requests"""
+    ids = serializers.ListField(child=serializers.IntegerField(min_value=1), allow_empty=False)
+
+    def validate_ids(self, value):
+        limit = bulk_max_ids()
+        if len(set(value)) > limit:
+            raise serializers.ValidationError(f"At most {limit} tickets per request.")
+        return value
+
+
+class TicketBulkChangesSerializer(serializers.ModelSerializer):
+    """Fields that can be changed on many tickets at once"""
+
+    class Meta:
+        model = Ticket
+        fields = ['priority', 'department', 'status']
+        extra_kwargs = {field: {'required': False} for field in fields}
+
+
+class TicketBulkUpdateSerializer(TicketBulkResolveSerializer):
+    """Serializer for bulk update requests"""
+    changes = TicketBulkChangesSerializer()
+
+    def validate_changes(self, value):
+        if not value:
+            raise serializers.ValidationError("At least one field must be changed.")
+        return value
+
+
 class HealthCheckSerializer(serializers.Serializer):
     """Serializer for health check response"""
     status = serializers.CharField()
@@ -1,6 +1,6 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from . import views
+from . import async_views, views
 
 app_name = 'api_v1'
 
@@ -12,6 +12,18 @@ urlpatterns = [
     # Health check
     path('health/', views.health_check, name='health_check'),
     
+    # WebSocket notification dispatcher metrics
+    path('notifications/metrics/', views.notification_metrics, name='notification_metrics'),
+
+    # Per-view request instrumentation aggregates
+    path('requests/metrics/', views.request_metrics_view, name='request_metrics'),
+
+    # ASGI-native read endpoints (same responses as the ticket list/retrieve/stats/changes actions)
+    path('async/tickets/', async_views.ticket_list, name='async_ticket_list'),
+    path('async/tickets/stats/', async_views.ticket_stats, name='async_ticket_stats'),
+    path('async/tickets/changes/', async_views.ticket_changes, name='async_ticket_changes'),
+    path('async/tickets/<int:pk>/', async_views.ticket_detail, name='async_ticket_detail'),
+
     # API info
     path('info/', views.api_info, name='api_info'),
     
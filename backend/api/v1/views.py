@@ -1,25 +1,51 @@
+import codecs
+
 from rest_framework import viewsets, status
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.filters import SearchFilter, OrderingFilter
+from rest_framework.filters import OrderingFilter
 from drf_spectacular.utils import extend_schema, extend_schema_view
 from services.permissions import require_roles
 from services.roles import SUPPORT_READ_ROLES, SUPPORT_UPDATE_ROLES
 from drf_spectacular.utils import extend_schema, OpenApiResponse
 from rest_framework.decorators import api_view, permission_classes
+from django.core.handlers.asgi import ASGIRequest
+from django.http import Http404, HttpResponse, StreamingHttpResponse
+from django.utils import timezone
+from django.utils import translation
 from django.utils.translation import gettext_lazy as _
 
+from .filters import TicketSearchFilter
+from .pagination import TicketKeysetPagination, TicketOffsetPagination, TieredRows
+from .exports import TicketExport
 from .serializers import (
     ApiInfoSerializer,
     HealthCheckSerializer,
+    TicketBulkResolveSerializer,
+    TicketBulkUpdateSerializer,
+    TicketRowSerializer,
     TicketSerializer,
     TicketCreateSerializer,
     TicketUpdateSerializer,
 )
-from services import websocket_service
+from services import (
+    InvalidChangeCursor,
+    TicketBulkError,
+    archive_service,
+    bulk_service,
+    changes_service,
+    import_service,
+    notification_dispatcher,
+    payload_cache,
+    stats_service,
+    websocket_service,
+)
+from services.conditional_service import TicketVersionService, make_etag, not_modified, set_validators
 from core.models import Ticket, TicketStatus
+from config.middleware import instrumentation_setting, request_metrics
+from api.consumers import connection_registry, inbound_totals, outbound_totals
 
 
 @extend_schema(
@@ -52,6 +78,7 @@ def api_info(request):
             'description': 'Sistema de tickets - API v1',
             'endpoints': {
                 'health': '/api/v1/health/',
+                'notification_metrics': '/api/v1/notifications/metrics/',
                 'info': '/api/v1/info/',
                 'docs': '/api/docs/',
                 'schema': '/api/schema/',
@@ -66,14 +93,92 @@ def api_info(request):
     )
 
 
+def changes_rows(queryset, page_size):
+    """Rows of one changes feed page (plus one, to tell whether there is more)"""
+    return TicketRowSerializer.values(queryset, extra_fields=('change_seq', 'deleted_at'))[:page_size + 1]
+
+
+def changes_page(rows, page_size, since):
+    """Changes feed body from ``changes_rows``: tickets (or tombstones), next cursor and ``has_more``"""
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+
+    serializer = TicketRowSerializer()
+    results = []
+    for row in rows:
+        if row['deleted_at'] is not None:
+            item = {'id': row['id'], 'deleted': True, 'deleted_at': serializer.datetime(row['deleted_at'])}
+        else:
+            item = serializer.row(row)
+        item['change_seq'] = row['change_seq']
+        results.append(item)
+    if rows:
+        cursor = changes_service.encode_cursor(rows[-1]['change_seq'], rows[-1]['id'])
+    else:
+        cursor = since or changes_service.encode_cursor(0, 0)
+    return {'results': results, 'cursor': cursor, 'has_more': has_more}
+
+
+@extend_schema(
+    tags=['Health'],
+    summary='Notification dispatcher metrics',
+    description=(
+        'Profundidade da fila, atraso e contadores do dispatcher de notificações WebSocket, mais os contadores '
+        'de mensagens recebidas dos clientes (aceitas, descartadas e agrupadas) e das filas de envio por conexão '
+        '(unidas, descartadas e clientes lentos desconectados) e o número de sockets abertos, ociosos e '
+        'encerrados por falta de resposta ao heartbeat neste processo'
+    ),
+)
+@api_view(['GET'])
+def notification_metrics(request):
+    """Queue depth/lag metrics of the WebSocket notification dispatcher, per-socket frame counters and open sockets"""
+    require_roles(request.user, SUPPORT_READ_ROLES)
+    return Response({
+        **notification_dispatcher.metrics(),
+        'inbound': dict(inbound_totals),
+        'outbound': dict(outbound_totals),
+        'connections': connection_registry.snapshot(),
+    })
+
+
+@extend_schema(
+    tags=['Health'],
+    summary='Request instrumentation metrics',
+    description=(
+        'Tempo médio/máximo, consultas SQL, tempo de banco e de renderização por view desde o início do processo '
+        '(requer REQUEST_INSTRUMENTATION habilitado)'
+    ),
+)
+@api_view(['GET'])
+def request_metrics_view(request):
+    """Per-view query count and timings collected by RequestInstrumentationMiddleware"""
+    require_roles(request.user, SUPPORT_READ_ROLES)
+    return Response({
+        'enabled': instrumentation_setting('ENABLED', False),
+        'views': request_metrics.snapshot(),
+    })
+
+
 @extend_schema_view(
-    list=extend_schema(summary="List tickets", description="Get a list of all tickets with filtering and pagination"),
+    list=extend_schema(
+        summary="List tickets",
+        description=(
+            "Get a list of all tickets with filtering and keyset (cursor) pagination. "
+            "Pass `page` to use offset pagination instead."
+        ),
+    ),
     retrieve=extend_schema(
         summary="Get ticket details", description="Get detailed information about a specific ticket"
     ),
     create=extend_schema(summary="Create ticket", description="Create a new ticket"),
-    update=extend_schema(summary="Update ticket", description="Update an existing ticket"),
-    partial_update=extend_schema(summary="Partially update ticket", description="Partially update an existing ticket"),
+    update=extend_schema(
+        summary="Update ticket", description="Update an existing ticket", responses={200: TicketSerializer}
+    ),
+    partial_update=extend_schema(
+        summary="Partially update ticket",
+        description="Partially update an existing ticket",
+        responses={200: TicketSerializer},
+    ),
     destroy=extend_schema(summary="Delete ticket", description="Delete a ticket (soft delete)"),
 )
 class TicketViewSet(viewsets.ModelViewSet):
@@ -83,11 +188,22 @@ class TicketViewSet(viewsets.ModelViewSet):
 
     queryset = Ticket.objects.select_related('created_by', 'assigned_to').all()
     permission_classes = [IsAuthenticated]
-    filter_backends = [DjangoFilterBackend, SearchFilter, OrderingFilter]
+    filter_backends = [DjangoFilterBackend, OrderingFilter, TicketSearchFilter]
     filterset_fields = ['status', 'priority', 'department']
     search_fields = ['title', 'description', 'id']
     ordering_fields = ['created_at', 'updated_at', 'priority']
     ordering = ['-created_at']
+    pagination_class = TicketKeysetPagination
+
+    @property
+    def paginator(self):
+        """Keyset pagination by default; ``?page=N`` opts into offset pagination"""
+        if not hasattr(self, '_paginator'):
+            if 'page' in self.request.query_params:
+                self._paginator = TicketOffsetPagination()
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
 
     def get_serializer_class(self):
         if self.action == 'create':
@@ -114,12 +230,15 @@ class TicketViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         """Set the created_by field to the current user"""
         ticket = serializer.save(created_by=self.request.user)
+        stats_service.record_created(ticket)
         websocket_service.send_ticket_created(ticket)
         return ticket
 
     def perform_update(self, serializer):
         """Set the updated_by field to the current user"""
+        before = stats_service.snapshot(serializer.instance)
         ticket = serializer.save(updated_by=self.request.user)
+        stats_service.record_changed(before, ticket)
         websocket_service.send_ticket_updated(ticket)
         return ticket
 
@@ -131,13 +250,27 @@ class TicketViewSet(viewsets.ModelViewSet):
     def _validate_read_role(self, request):
         require_roles(request.user, SUPPORT_READ_ROLES)
 
+    def _ticket_response(self, ticket):
+        """Full ticket payload; JSON clients get the pre-rendered bytes shared with WebSocket events"""
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        if renderer is not None and renderer.format == 'json':
+            return HttpResponse(payload_cache.get_json(ticket), content_type='application/json')
+        return Response(TicketSerializer(ticket, context=self.get_serializer_context()).data)
+
+    def _validators(self, scopes, *parts):
+        """ETag/Last-Modified from the table versions of ``scopes`` plus request specific ``parts``"""
+        tokens, last_modified = TicketVersionService.combined(*scopes)
+        renderer = getattr(self.request, 'accepted_renderer', None)
+        etag = make_etag(*tokens, *parts, translation.get_language(), renderer.format if renderer else '')
+        return etag, last_modified
+
     def update(self, request, *args, **kwargs):  # type: ignore[override]
         instance = self.get_object()
         self._validate_update_role(request, instance)
         serializer = self.get_serializer(instance, data=request.data, partial=False)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response(serializer.data)
+        return self._ticket_response(serializer.instance)
 
     def partial_update(self, request, *args, **kwargs):  # type: ignore[override]
         instance = self.get_object()
@@ -145,16 +278,104 @@ class TicketViewSet(viewsets.ModelViewSet):
         serializer = self.get_serializer(instance, data=request.data, partial=True)
         serializer.is_valid(raise_exception=True)
         self.perform_update(serializer)
-        return Response(serializer.data)
+        return self._ticket_response(serializer.instance)
 
     # ----- Read methods with role validation -----
     def list(self, request, *args, **kwargs):  # type: ignore[override]
         self._validate_read_role(request)
-        return super().list(request, *args, **kwargs)
+        # Any ticket/user write changes the validators, so "nothing changed" costs no query
+        etag, last_modified = self._validators(
+            [TicketVersionService.TICKETS, TicketVersionService.USERS], 'list', request.get_full_path()
+        )
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        # Fast path: one values() query and precomputed labels instead of nested serializers
+        rows = TicketRowSerializer.values(self.filter_queryset(self.get_queryset()))
+        if archive_service.wants_closed(request.query_params.get('status')):
+            # Old closed tickets live in the archive tier; only explicit closed filters read it
+            archived = TicketRowSerializer.values(self.filter_queryset(archive_service.closed_queryset()))
+            rows = TieredRows(rows, archived)
+        serializer = TicketRowSerializer()
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            response = self.get_paginated_response(serializer.serialize(page))
+        else:
+            response = Response(serializer.serialize(rows))
+        return set_validators(response, etag, last_modified)
 
     def retrieve(self, request, *args, **kwargs):  # type: ignore[override]
         self._validate_read_role(request)
-        return super().retrieve(request, *args, **kwargs)
+        try:
+            ticket = self.get_object()
+        except Http404:
+            # Closed tickets moved to the archive tier stay readable
+            ticket = archive_service.get_closed(kwargs.get(self.lookup_url_kwarg or self.lookup_field))
+            if ticket is None:
+                raise
+        etag, user_modified = self._validators([TicketVersionService.USERS], 'ticket', ticket.pk, ticket.updated_at)
+        last_modified = max(ticket.updated_at, user_modified)
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(self._ticket_response(ticket), etag, last_modified)
+
+    @extend_schema(
+        summary="Export tickets",
+        description=(
+            "Streams every ticket matching the list filters (`status`, `priority`, `department`, `search`, "
+            "`ordering`) as CSV (`output=csv`, default) or NDJSON (`output=ndjson`), without pagination."
+        ),
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """Stream the filtered tickets as CSV or NDJSON with constant memory"""
+        self._validate_read_role(request)
+        output = request.query_params.get('output', 'csv')
+        if output not in TicketExport.formats:
+            return Response(
+                {'error': f'Unknown output, use one of: {", ".join(TicketExport.formats)}.'},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        querysets = [self.filter_queryset(self.get_queryset())]
+        if archive_service.wants_closed(request.query_params.get('status')):
+            querysets.append(self.filter_queryset(archive_service.closed_queryset()))
+
+        export = TicketExport(output)
+        # ASGI handlers need an async iterator to stream without buffering the whole export
+        content = export.astream(querysets) if isinstance(request._request, ASGIRequest) else export.stream(querysets)
+        response = StreamingHttpResponse(content, content_type=export.content_type)
+        filename = f'tickets-{timezone.now():%Y%m%d-%H%M%S}.{export.extension}'
+        response['Content-Disposition'] = f'attachment; filename="{filename}"'
+        return response
+
+    @extend_schema(
+        summary="Import tickets",
+        description=(
+            "Bulk import from an uploaded CSV or NDJSON `file` (same columns as the export). Rows are validated "
+            "like ticket creation, inserted in batches and announced with a single WebSocket summary."
+        ),
+    )
+    @action(detail=False, methods=['post'], url_path='import', url_name='import')
+    def import_tickets(self, request):
+        """Bulk import tickets from a CSV/NDJSON upload"""
+        require_roles(request.user, SUPPORT_UPDATE_ROLES)
+        upload = request.FILES.get('file')
+        if upload is None:
+            return Response({'error': 'Upload a CSV or NDJSON "file".'}, status=status.HTTP_400_BAD_REQUEST)
+        file_format = request.data.get('format_type') or (
+            'ndjson' if upload.name.endswith(('.ndjson', '.jsonl')) else 'csv'
+        )
+        if file_format not in import_service.formats:
+            return Response({'error': 'Unknown format_type.'}, status=status.HTTP_400_BAD_REQUEST)
+
+        # The upload is decoded line by line from memory/temp file, never read as a whole
+        stream = codecs.iterdecode(upload, 'utf-8')
+        result = import_service.run(stream, file_format, default_user=request.user)
+        if result.error:
+            # Rows before the undecodable byte are already imported; the summary says how many
+            return Response(result.as_dict(), status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_201_CREATED if result.imported else status.HTTP_200_OK)
 
     @extend_schema(summary="Mark ticket as resolved", description="Mark a ticket as resolved")
     @action(detail=True, methods=['post'])
@@ -172,27 +393,87 @@ class TicketViewSet(viewsets.ModelViewSet):
             )
 
         # Resolve ticket using service
+        before = stats_service.snapshot(ticket)
         ticket.status = TicketStatus.RESOLVED.value
         ticket.updated_by = request.user
         ticket.save()
+        stats_service.record_changed(before, ticket)
         websocket_service.send_ticket_resolved(ticket)
-        serializer = self.get_serializer(ticket)
-        return Response(serializer.data)
+        return self._ticket_response(ticket)
 
-    @extend_schema(summary="Get ticket statistics", description="Get statistics about tickets")
+    @extend_schema(
+        summary="Ticket changes feed",
+        description=(
+            "Tickets created, updated, resolved or deleted after `since` (a cursor from a previous call), "
+            "in change order. Deleted tickets come back as tombstones. `since=latest` returns only the "
+            "current cursor; call it before loading the full list to resync from there later."
+        ),
+    )
+    @action(detail=False, methods=['get'])
+    def changes(self, request):
+        """Incremental delta feed for resyncing clients"""
+        self._validate_read_role(request)
+        since = request.query_params.get('since')
+        if since == changes_service.LATEST:
+            return Response({'results': [], 'cursor': changes_service.latest_cursor(), 'has_more': False})
+
+        page_size = TicketKeysetPagination().get_page_size(request)
+        try:
+            queryset = changes_service.changed_since(Ticket.all_objects.all(), since)
+        except InvalidChangeCursor:
+            return Response({'error': 'Invalid cursor.'}, status=status.HTTP_400_BAD_REQUEST)
+        rows = list(changes_rows(queryset, page_size))
+        return Response(changes_page(rows, page_size, since))
+
+    @extend_schema(
+        summary="Bulk update tickets",
+        description="Apply the same changes (priority, department, status) to many tickets with a single UPDATE",
+        request=TicketBulkUpdateSerializer,
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_update(self, request):
+        """Update many tickets at once (all or nothing)"""
+        require_roles(request.user, SUPPORT_UPDATE_ROLES)
+        serializer = TicketBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            ticket_ids = bulk_service.update(
+                serializer.validated_data['ids'], serializer.validated_data['changes'], request.user
+            )
+        except TicketBulkError as error:
+            return Response(error.detail, status=error.status_code)
+        return Response({'updated': len(ticket_ids), 'ids': ticket_ids})
+
+    @extend_schema(
+        summary="Bulk resolve tickets",
+        description="Mark many tickets as resolved with a single UPDATE",
+        request=TicketBulkResolveSerializer,
+    )
+    @action(detail=False, methods=['post'])
+    def bulk_resolve(self, request):
+        """Mark many tickets as resolved (all or nothing)"""
+        require_roles(request.user, SUPPORT_UPDATE_ROLES)
+        serializer = TicketBulkResolveSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            ticket_ids = bulk_service.resolve(serializer.validated_data['ids'], request.user)
+        except TicketBulkError as error:
+            return Response(error.detail, status=error.status_code)
+        return Response({'updated': len(ticket_ids), 'ids': ticket_ids})
+
+    @extend_schema(
+        summary="Get ticket statistics",
+        description="Get ticket counts by status, priority and department, served from an incrementally updated cache",
+    )
     @action(detail=False, methods=['get'])
     def stats(self, request):
         """Get ticket statistics"""
         self._validate_read_role(request)
-        queryset = Ticket.objects.all()
-        stats = {
-            'total': queryset.count(),
-            'open': queryset.filter(status=TicketStatus.OPEN.value).count(),
-            'in_progress': queryset.filter(status=TicketStatus.IN_PROGRESS.value).count(),
-            'resolved': queryset.filter(status=TicketStatus.RESOLVED.value).count(),
-            'cancelled': queryset.filter(status=TicketStatus.CANCELLED.value).count(),
-        }
-        return Response(stats)
+        etag, last_modified = self._validators([TicketVersionService.TICKETS], 'stats')
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+        return set_validators(Response(stats_service.get_stats()), etag, last_modified)
 
     @extend_schema(summary="Send custom notification", description="Send a custom notification via WebSocket")
     @action(detail=False, methods=['post'])
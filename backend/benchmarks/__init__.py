@@ -0,0 +1,6 @@
+"""
+Benchmark harnesses for the OpenTicket backend.
+
+Each module is runnable with ``python -m benchmarks.<module> --help`` from the
+``backend`` directory and prints a summary (and optionally JSON) of its results.
+"""
@@ -0,0 +1,264 @@
+"""
+Sync vs async ticket read endpoints under mixed HTTP + WebSocket load.
+
+Starts Daphne on a seeded throwaway database (with the Redis stand-in or
+``--redis-url`` as channel layer), keeps ``--ws-clients`` WebSocket clients
+connected to ``ws/tickets/`` while custom notifications are broadcast to them
+at ``--ws-rate`` per second, and then hammers each read endpoint with
+``--concurrency`` keep-alive HTTP clients for ``--duration`` seconds: first the
+DRF view (``/api/v1/tickets/...``), then its async twin
+(``/api/v1/async/tickets/...``). Reports requests per second, latency
+percentiles, errors and the WebSocket messages delivered meanwhile.
+
+Example:
+    python -m benchmarks.async_reads --tickets 20000 --concurrency 100 --ws-clients 500
+    python -m benchmarks.async_reads --endpoint list --endpoint stats --duration 20 --json reads.json
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+
+from .utils import create_benchmark_database, percentiles, seed_tickets, setup_django, write_json
+from .websocket_load import PONG, SocketConnection, raise_file_limit, start_redis_standin, start_server
+
+ENDPOINTS = ('list', 'retrieve', 'stats', 'changes')
+MODES = {'sync': '/api/v1/tickets/', 'async': '/api/v1/async/tickets/'}
+PING = json.dumps({'type': 'ping'})
+
+
+def endpoint_paths(endpoint, prefix, ids, page_size, rng):
+    """Callable returning the next request path of ``endpoint`` under ``prefix``"""
+    if endpoint == 'list':
+        return lambda: f'{prefix}?page_size={page_size}'
+    if endpoint == 'retrieve':
+        return lambda: f'{prefix}{rng.choice(ids)}/'
+    if endpoint == 'stats':
+        return lambda: f'{prefix}stats/'
+    return lambda: f'{prefix}changes/?page_size={page_size}'
+
+
+async def measure(address, headers, next_path, concurrency, duration):
+    """``concurrency`` clients sending requests back to back for ``duration`` seconds"""
+    from .http_client import HttpClient
+
+    latencies = []
+    statuses = {}
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        client = await HttpClient.connect(*address, headers=headers)
+        try:
+            while time.perf_counter() < deadline:
+                started = time.perf_counter()
+                status, _body = await client.get(next_path())
+                latencies.append(time.perf_counter() - started)
+                statuses[status] = statuses.get(status, 0) + 1
+        finally:
+            client.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+    errors = sum(count for status, count in statuses.items() if status != 200)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'statuses': {str(status): count for status, count in sorted(statuses.items())},
+        'requests_per_second': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            name: round(value * 1000, 2) if value is not None else None
+            for name, value in percentiles(latencies).items()
+        },
+    }
+
+
+class WebSocketLoad:
+    """Connected ``ws/tickets/`` clients plus a background broadcaster"""
+
+    def __init__(self, address, tokens, clients, rate):
+        self.connections = [
+            SocketConnection(address, f'/ws/tickets/?token={tokens[number % len(tokens)]}')
+            for number in range(clients)
+        ]
+        self.rate = rate
+        self.received = 0
+        self.sent = 0
+        self.tasks = []
+
+    async def start(self):
+        from asgiref.sync import sync_to_async
+
+        semaphore = asyncio.Semaphore(100)
+
+        async def connect(connection):
+            async with semaphore:
+                await connection.connect()
+
+        await asyncio.gather(*(connect(connection) for connection in self.connections))
+        self.tasks = [asyncio.ensure_future(self._drain(connection)) for connection in self.connections]
+        if self.rate and self.connections:
+            self.tasks.append(asyncio.ensure_future(self._broadcast(sync_to_async(self._send))))
+
+    async def stop(self):
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(*self.tasks, return_exceptions=True)
+        await asyncio.gather(*(connection.close() for connection in self.connections), return_exceptions=True)
+
+    async def _drain(self, connection):
+        while (text := await connection.recv()) is not None:
+            if text == PING:
+                await connection.send(PONG)
+                continue
+            self.received += 1
+
+    async def _broadcast(self, send):
+        while True:
+            await send()
+            await asyncio.sleep(1 / self.rate)
+
+    def _send(self):
+        from services.websocket_service import WebSocketNotificationService
+
+        self.sent += 1
+        WebSocketNotificationService.send_custom_notification(f'Async reads benchmark {self.sent}')
+
+
+async def run(options, address):
+    from asgiref.sync import sync_to_async
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from core.load_data import LoadDataGenerator
+    from core.models import Ticket
+
+    rng = random.Random(options['seed'])
+    users = await sync_to_async(LoadDataGenerator(seed=options['seed']).ensure_users)(options['users'])
+    technician = next(user for user in users if user.role == 'technician')
+    headers = {'Authorization': f'Bearer {AccessToken.for_user(technician)}', 'Accept': 'application/json'}
+    ids = await sync_to_async(list)(Ticket.objects.values_list('pk', flat=True)[:10000])
+
+    ws_load = WebSocketLoad(
+        address, [str(AccessToken.for_user(user)) for user in users], options['ws_clients'], options['ws_rate']
+    )
+    await ws_load.start()
+    results = {}
+    try:
+        for endpoint in options['endpoints']:
+            results[endpoint] = {}
+            for mode in options['modes']:
+                next_path = endpoint_paths(endpoint, MODES[mode], ids, options['page_size'], rng)
+                if options['warmup']:
+                    await measure(address, headers, next_path, options['concurrency'], options['warmup'])
+                received = ws_load.received
+                result = await measure(address, headers, next_path, options['concurrency'], options['duration'])
+                result['ws_messages_received'] = ws_load.received - received
+                results[endpoint][mode] = result
+            if {'sync', 'async'} <= results[endpoint].keys() and results[endpoint]['sync']['requests_per_second']:
+                results[endpoint]['async_speedup'] = round(
+                    results[endpoint]['async']['requests_per_second'] / results[endpoint]['sync']['requests_per_second'],
+                    2,
+                )
+    finally:
+        await ws_load.stop()
+
+    return {
+        'options': options,
+        'endpoints': results,
+        'websocket': {'clients': options['ws_clients'], 'sent': ws_load.sent, 'received': ws_load.received},
+    }
+
+
+def print_report(report):
+    options = report['options']
+    print(
+        f"{options['concurrency']} HTTP clients x {options['duration']}s per run, "
+        f"{options['ws_clients']} WebSocket clients, {options['ws_rate']} broadcasts/s"
+    )
+    print(f"{'endpoint':<10} {'mode':<6} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7} {'ws msgs':>8}")
+    for endpoint, modes in report['endpoints'].items():
+        for mode in options['modes']:
+            result = modes[mode]
+            latency = result['latency_ms']
+            print(
+                f"{endpoint:<10} {mode:<6} {result['requests_per_second']:>9} {latency['p50']:>9} "
+                f"{latency['p95']:>9} {latency['p99']:>9} {result['errors']:>7} {result['ws_messages_received']:>8}"
+            )
+        if 'async_speedup' in modes:
+            print(f"{'':<10} async/sync throughput: {modes['async_speedup']}x")
+    websocket = report['websocket']
+    print(f"\nWebSocket: {websocket['sent']} broadcasts sent, {websocket['received']} messages received")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(__doc__.strip().splitlines()[1:]),
+    )
+    parser.add_argument('--tickets', type=int, default=10000, help='Tickets to seed')
+    parser.add_argument('--users', type=int, default=50, help='Load users (tickets and WebSocket clients use them)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for the data and the requests')
+    parser.add_argument('--endpoint', action='append', choices=ENDPOINTS, help='Endpoints to run (default: all)')
+    parser.add_argument('--mode', action='append', choices=tuple(MODES), help='sync, async or both (default)')
+    parser.add_argument('--concurrency', type=int, default=50, help='Concurrent keep-alive HTTP clients')
+    parser.add_argument('--duration', type=float, default=10.0, help='Seconds measured per endpoint and mode')
+    parser.add_argument('--warmup', type=float, default=2.0, help='Unmeasured seconds before each run')
+    parser.add_argument('--page-size', type=int, default=20, help='page_size of list and changes requests')
+    parser.add_argument('--ws-clients', type=int, default=200, help='WebSocket clients connected during the runs')
+    parser.add_argument('--ws-rate', type=float, default=10.0, help='Broadcasts per second to those clients')
+    parser.add_argument('--redis-url', help='Use a real Redis instead of the stand-in')
+    parser.add_argument('--backend', choices=('pubsub', 'core'), default='pubsub', help='channels_redis layer')
+    parser.add_argument('--quiet', action='store_true', help='Hide the Daphne log')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON (- for stdout)')
+    args = parser.parse_args()
+
+    options = {
+        'tickets': args.tickets,
+        'users': args.users,
+        'seed': args.seed,
+        'endpoints': args.endpoint or list(ENDPOINTS),
+        'modes': args.mode or list(MODES),
+        'concurrency': args.concurrency,
+        'duration': args.duration,
+        'warmup': args.warmup,
+        'page_size': args.page_size,
+        'ws_clients': args.ws_clients,
+        'ws_rate': args.ws_rate,
+        'backend': args.backend,
+        'quiet': args.quiet,
+    }
+    raise_file_limit()
+    processes = []
+    server = None
+    try:
+        redis_url = args.redis_url
+        if not redis_url:
+            standin, redis_url = start_redis_standin()
+            processes.append(standin)
+        os.environ['CHANNEL_LAYER_REDIS_URL'] = redis_url
+        os.environ['CHANNEL_LAYER_REDIS_BACKEND'] = args.backend
+
+        setup_django()
+        from django.db import connection
+
+        create_benchmark_database(on_disk=True)
+        seed_tickets(args.tickets, users=args.users, seed=args.seed)
+        server, address = start_server(options, connection.settings_dict['NAME'], redis_url)
+        report = asyncio.run(run(options, address))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        for process in processes:
+            process.terminate()
+
+    print_report(report)
+    if args.json:
+        write_json(args.json, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,229 @@
+"""
+Multi-process WebSocket fan-out benchmark over a Redis channel layer.
+
+Starts a Redis-protocol stand-in (or uses ``--redis-url``), spawns N worker
+processes that each run the ``ws/tickets/`` ASGI application with M connected
+clients, then publishes ``ticket_created``/``ticket_updated``/``ticket_resolved``
+events to the support group from the parent process. Every client must receive
+every event, so the harness reports end-to-end broadcast latency, lost
+messages and delivered messages per second per event type.
+
+Example: python -m benchmarks.channel_layer_fanout --workers 4 --clients 25 --events 300
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import time
+import uuid
+from collections import defaultdict
+
+from .utils import percentiles, setup_django, write_json
+
+EVENT_TYPES = ('ticket_created', 'ticket_updated', 'ticket_resolved')
+
+
+class BenchmarkUser:
+    """Stand-in for an authenticated technician (joins the all-tickets group without a DB lookup)"""
+
+    is_authenticated = True
+    role = 'technician'
+    department = ''
+
+    def __init__(self, pk):
+        self.pk = self.id = pk
+
+
+def configure_layer(redis_url, backend):
+    os.environ['CHANNEL_LAYER_REDIS_URL'] = redis_url
+    os.environ['CHANNEL_LAYER_REDIS_BACKEND'] = backend
+
+
+# ----- Worker process -----
+def worker_main(index, options, redis_url, ready, results):
+    configure_layer(redis_url, options['backend'])
+    setup_django()
+    results.put(asyncio.run(run_worker(index, options, ready)))
+
+
+async def run_worker(index, options, ready):
+    from channels.routing import URLRouter
+    from channels.testing import WebsocketCommunicator
+
+    import api.routing
+
+    application = URLRouter(api.routing.websocket_urlpatterns)
+    communicators = []
+    for client in range(options['clients']):
+        communicator = WebsocketCommunicator(application, '/ws/tickets/')
+        communicator.scope['user'] = BenchmarkUser(index * options['clients'] + client + 1)
+        connected, _ = await communicator.connect()
+        if not connected:
+            raise RuntimeError(f'Worker {index}: client {client} could not connect')
+        communicators.append(communicator)
+    # Give the layer a moment to finish the group subscriptions
+    await asyncio.sleep(0.2)
+    ready.put(index)
+
+    latencies = defaultdict(list)
+    received = {'first': None, 'last': None}
+
+    async def drain(communicator):
+        remaining = options['events']
+        while remaining:
+            try:
+                # Read the output queue directly: receive_from(timeout) would cancel the app on timeout
+                output = await asyncio.wait_for(communicator.output_queue.get(), options['idle_timeout'])
+            except asyncio.TimeoutError:
+                return
+            now = time.time()
+            data = json.loads(output['text'])
+            if data.get('type') not in EVENT_TYPES:
+                continue
+            latencies[data['type']].append(now - data['ticket']['sent_at'])
+            received['first'] = received['first'] or now
+            received['last'] = now
+            remaining -= 1
+
+    await asyncio.gather(*(drain(communicator) for communicator in communicators))
+    for communicator in communicators:
+        await communicator.disconnect()
+    return {'worker': index, 'latencies': dict(latencies), **received}
+
+
+# ----- Publisher (parent process) -----
+async def publish(options):
+    from channels.layers import get_channel_layer
+
+    from services.ticket_groups import ALL_TICKETS_GROUP
+
+    channel_layer = get_channel_layer()
+    padding = 'x' * options['payload_bytes']
+    interval = 1 / options['rate'] if options['rate'] else 0
+    sent = defaultdict(int)
+    started = time.time()
+    for number in range(options['events']):
+        event_type = EVENT_TYPES[number % len(EVENT_TYPES)]
+        message = {
+            'type': event_type,
+            'event_id': uuid.uuid4().hex,
+            'ticket': {'id': number, 'title': 'Benchmark', 'description': padding, 'sent_at': time.time()},
+        }
+        await channel_layer.group_send(ALL_TICKETS_GROUP, message)
+        sent[event_type] += 1
+        if interval:
+            await asyncio.sleep(interval)
+    return started, dict(sent)
+
+
+def summarize(options, started, sent, worker_results):
+    receivers = options['workers'] * options['clients']
+    report = {'config': options, 'event_types': {}}
+    all_latencies = []
+    for event_type in EVENT_TYPES:
+        latencies = [value for result in worker_results for value in result['latencies'].get(event_type, [])]
+        all_latencies.extend(latencies)
+        expected = sent.get(event_type, 0) * receivers
+        report['event_types'][event_type] = {
+            'published': sent.get(event_type, 0),
+            'expected_deliveries': expected,
+            'delivered': len(latencies),
+            'lost': expected - len(latencies),
+            'latency_ms': {k: v and round(v * 1000, 3) for k, v in percentiles(latencies).items()},
+        }
+    last = max((result['last'] or started for result in worker_results), default=started)
+    duration = max(last - started, 1e-9)
+    report['totals'] = {
+        'receivers': receivers,
+        'delivered': len(all_latencies),
+        'duration_seconds': round(duration, 3),
+        'messages_per_second': round(len(all_latencies) / duration, 1),
+        'latency_ms': {k: v and round(v * 1000, 3) for k, v in percentiles(all_latencies).items()},
+    }
+    return report
+
+
+def print_report(report):
+    print(f"{'event type':<18}{'published':>10}{'delivered':>11}{'lost':>7}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+    for event_type, row in report['event_types'].items():
+        latency = row['latency_ms']
+        print(
+            f"{event_type:<18}{row['published']:>10}{row['delivered']:>11}{row['lost']:>7}"
+            f"{latency['p50'] or 0:>9.2f}{latency['p95'] or 0:>9.2f}{latency['p99'] or 0:>9.2f}"
+        )
+    totals = report['totals']
+    print(
+        f"\n{totals['receivers']} receivers, {totals['delivered']} messages in {totals['duration_seconds']}s "
+        f"-> {totals['messages_per_second']} msg/s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--workers', type=int, default=2, help='ASGI worker processes')
+    parser.add_argument('--clients', type=int, default=20, help='WebSocket clients per worker')
+    parser.add_argument('--events', type=int, default=150, help='Events to publish')
+    parser.add_argument('--rate', type=float, default=0, help='Events per second (0 = as fast as possible)')
+    parser.add_argument('--payload-bytes', type=int, default=512, help='Padding added to each ticket payload')
+    parser.add_argument('--idle-timeout', type=float, default=5.0, help='Seconds without messages before a client gives up')
+    parser.add_argument('--redis-url', help='Use a real Redis instead of the stand-in')
+    parser.add_argument('--backend', choices=('pubsub', 'core'), default='pubsub', help='channels_redis layer')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON (- for stdout)')
+    args = parser.parse_args()
+
+    options = {
+        'workers': args.workers,
+        'clients': args.clients,
+        'events': args.events,
+        'rate': args.rate,
+        'payload_bytes': args.payload_bytes,
+        'idle_timeout': args.idle_timeout,
+        'backend': args.backend,
+    }
+    context = multiprocessing.get_context('spawn')
+    processes = []
+
+    redis_url = args.redis_url
+    if not redis_url:
+        from .redis_standin import run as run_standin
+
+        port_queue = context.Queue()
+        standin = context.Process(target=run_standin, args=('127.0.0.1', 0, port_queue), daemon=True)
+        standin.start()
+        processes.append(standin)
+        redis_url = f'redis://127.0.0.1:{port_queue.get(timeout=10)}/0'
+    options['redis_url'] = redis_url
+
+    ready, results = context.Queue(), context.Queue()
+    workers = [
+        context.Process(target=worker_main, args=(index, options, redis_url, ready, results))
+        for index in range(args.workers)
+    ]
+    for worker in workers:
+        worker.start()
+    processes.extend(workers)
+    try:
+        for _ in workers:
+            ready.get(timeout=60)
+
+        configure_layer(redis_url, args.backend)
+        setup_django()
+        started, sent = asyncio.run(publish(options))
+        worker_results = [results.get(timeout=args.idle_timeout + 120) for _ in workers]
+    finally:
+        for process in processes:
+            if process.is_alive() and process not in workers:
+                process.terminate()
+        for worker in workers:
+            worker.join(timeout=10)
+
+    report = summarize(options, started, sent, worker_results)
+    print_report(report)
+    if args.json:
+        write_json(args.json, report)
+
+
+if __name__ == '__main__':
+    main()
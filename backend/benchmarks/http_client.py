@@ -0,0 +1,79 @@
+"""
+Minimal asyncio HTTP/1.1 client for local load tests.
+
+Keeps one connection alive and sends GET requests on it one at a time;
+understands ``Content-Length`` and chunked bodies. No TLS, redirects or
+pipelining: it only exists so the benchmarks can drive Daphne with thousands
+of concurrent requests from a single event loop without extra dependencies.
+"""
+
+import asyncio
+
+
+class HttpClient:
+    """One keep-alive connection (``await HttpClient.connect(...)``)"""
+
+    def __init__(self, host, port, reader, writer, headers):
+        self.host = host
+        self.port = port
+        self.reader = reader
+        self.writer = writer
+        self.headers = headers
+
+    @classmethod
+    async def connect(cls, host, port, headers=None, timeout=10.0):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        return cls(host, port, reader, writer, headers or {})
+
+    async def get(self, path):
+        """Returns ``(status, body)``; reconnects once if the server closed the idle connection"""
+        for attempt in range(2):
+            try:
+                return await self._get(path)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                if attempt:
+                    raise
+                self.close()
+                self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def _get(self, path):
+        lines = [f'GET {path} HTTP/1.1', f'Host: {self.host}:{self.port}']
+        lines.extend(f'{name}: {value}' for name, value in self.headers.items())
+        self.writer.write(('\r\n'.join(lines) + '\r\n\r\n').encode('latin-1'))
+        await self.writer.drain()
+
+        status_line = await self.reader.readline()
+        if not status_line:
+            raise ConnectionError('Connection closed by the server')
+        status = int(status_line.split()[1])
+        headers = {}
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get('transfer-encoding', '').lower() == 'chunked':
+            body = await self._read_chunked()
+        else:
+            body = await self.reader.readexactly(int(headers.get('content-length', 0)))
+        if headers.get('connection', '').lower() == 'close':
+            self.close()
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return status, body
+
+    async def _read_chunked(self):
+        chunks = []
+        while True:
+            size = int((await self.reader.readline()).split(b';')[0], 16)
+            if size == 0:
+                # Trailers (none expected) end with an empty line
+                while (await self.reader.readline()) not in (b'\r\n', b''):
+                    pass
+                return b''.join(chunks)
+            chunks.append(await self.reader.readexactly(size))
+            await self.reader.readexactly(2)
+
+    def close(self):
+        self.writer.close()
@@ -0,0 +1,296 @@
+"""
+End-to-end HTTP benchmark for the REST API and the server-rendered pages.
+
+Drives the full Django stack (middleware, authentication, views, rendering)
+in-process with ``django.test.Client`` against a generated dataset and reports,
+per scenario, p50/p95/p99 latency, queries per request and peak allocated
+memory (``tracemalloc``, measured in a separate pass so it does not distort the
+latencies). Scenarios: ticket list/retrieve/partial_update/resolve/stats,
+JWT obtain/refresh, dashboard and ticket detail pages.
+
+``--compare baseline.json`` checks the run against a previous ``--json`` output
+and exits with status 1 when any metric regresses past ``--threshold`` percent
+(query counts must not grow at all).
+
+Example:
+    python -m benchmarks.http_endpoints --tickets 50000 --json results.json
+    python -m benchmarks.http_endpoints --tickets 50000 --compare results.json --threshold 15
+"""
+
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+from .utils import create_benchmark_database, percentiles, seed_tickets, setup_django, write_json
+
+SCENARIOS = (
+    'ticket_list', 'ticket_list_filtered', 'ticket_retrieve', 'ticket_partial_update', 'ticket_resolve',
+    'ticket_stats', 'token_obtain', 'token_refresh', 'dashboard_view', 'ticket_detail_view',
+)
+
+# Metrics checked by --compare: (path in a scenario result, allowed growth in percent or None = --threshold)
+COMPARED_METRICS = (
+    (('latency_ms', 'p50'), None),
+    (('latency_ms', 'p95'), None),
+    (('latency_ms', 'p99'), None),
+    (('queries', 'max'), 0),
+    (('memory_kb', 'max'), None),
+)
+
+
+class Scenario:
+    """One request shape; ``send`` issues a request and returns the response"""
+
+    def __init__(self, name, send, expected=(200,)):
+        self.name = name
+        self.send = send
+        self.expected = expected
+
+
+class Fixture:
+    """Users, tokens and clients shared by every scenario"""
+
+    def __init__(self):
+        from django.test import Client
+
+        from core.load_data import DEFAULT_PASSWORD, USERNAME_PREFIX
+        from core.models import CustomUser, Ticket, TicketStatus
+
+        users = CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id')
+        self.technician = users.filter(role='technician').first() or users.filter(role='admin').first()
+        self.agent = users.filter(role='agent').first()
+        if self.technician is None or self.agent is None:
+            raise SystemExit('The dataset needs load users; run manage.py generate_load_data first.')
+        self.password = DEFAULT_PASSWORD
+
+        self.api = Client()
+        tokens = self.api.post(
+            '/api/token/', {'email': self.technician.email, 'password': self.password},
+            content_type='application/json',
+        ).json()
+        self.refresh_token = tokens['refresh']
+        self.api.defaults['HTTP_AUTHORIZATION'] = f"Bearer {tokens['access']}"
+        self.anonymous = Client()
+        self.pages = Client()
+        self.pages.force_login(self.agent)
+
+        editable = Ticket.objects.filter(status__in=[TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value])
+        self.ticket_ids = list(Ticket.objects.order_by('-created_at', '-id').values_list('id', flat=True)[:500])
+        self.editable_id = editable.order_by('-created_at', '-id').values_list('id', flat=True).first()
+        # resolve consumes a ticket per request
+        self.resolvable_ids = list(editable.order_by('id').values_list('id', flat=True)[1:])
+        if not self.ticket_ids or self.editable_id is None:
+            raise SystemExit('The dataset has no editable tickets; generate more data first.')
+        self.counter = 0
+
+    def next_ticket_id(self):
+        self.counter += 1
+        return self.ticket_ids[self.counter % len(self.ticket_ids)]
+
+    def next_resolvable_id(self):
+        if not self.resolvable_ids:
+            raise SystemExit('Ran out of open tickets for ticket_resolve; lower --iterations or add tickets.')
+        return self.resolvable_ids.pop()
+
+    def next_refresh(self):
+        response = self.anonymous.post(
+            '/api/token/refresh/', {'refresh': self.refresh_token}, content_type='application/json'
+        )
+        # Refresh tokens rotate: keep the chain going with the newest one
+        self.refresh_token = response.json().get('refresh', self.refresh_token)
+        return response
+
+
+def build_scenarios(fixture):
+    api, pages, anonymous = fixture.api, fixture.pages, fixture.anonymous
+    priorities = ('low', 'medium', 'high', 'urgent')
+
+    def partial_update():
+        priority = priorities[fixture.counter % len(priorities)]
+        fixture.counter += 1
+        return api.patch(
+            f'/api/v1/tickets/{fixture.editable_id}/', {'priority': priority}, content_type='application/json'
+        )
+
+    def token_obtain():
+        return anonymous.post(
+            '/api/token/', {'email': fixture.technician.email, 'password': fixture.password},
+            content_type='application/json',
+        )
+
+    scenarios = [
+        Scenario('ticket_list', lambda: api.get('/api/v1/tickets/')),
+        Scenario('ticket_list_filtered', lambda: api.get('/api/v1/tickets/', {'status': 'open', 'priority': 'high'})),
+        Scenario('ticket_retrieve', lambda: api.get(f'/api/v1/tickets/{fixture.next_ticket_id()}/')),
+        Scenario('ticket_partial_update', partial_update),
+        Scenario('ticket_resolve', lambda: api.post(f'/api/v1/tickets/{fixture.next_resolvable_id()}/resolve/')),
+        Scenario('ticket_stats', lambda: api.get('/api/v1/tickets/stats/')),
+        Scenario('token_obtain', token_obtain),
+        Scenario('token_refresh', fixture.next_refresh),
+        Scenario('dashboard_view', lambda: pages.get('/dashboard/')),
+        Scenario('ticket_detail_view', lambda: pages.get(f'/ticket/{fixture.next_ticket_id()}/')),
+    ]
+    return {scenario.name: scenario for scenario in scenarios}
+
+
+def check(scenario, response):
+    if response.status_code not in scenario.expected:
+        body = getattr(response, 'content', b'')[:300]
+        raise SystemExit(f'{scenario.name}: unexpected HTTP {response.status_code}: {body!r}')
+
+
+def run_scenario(scenario, iterations, warmup, memory_iterations):
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    for _ in range(warmup):
+        check(scenario, scenario.send())
+
+    latencies, queries = [], []
+    for _ in range(iterations):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            response = scenario.send()
+            elapsed = time.perf_counter() - started
+        check(scenario, response)
+        latencies.append(elapsed * 1000)
+        queries.append(len(captured))
+
+    # Separate pass: tracemalloc slows allocations down too much to time the same requests
+    peaks = []
+    tracemalloc.start()
+    try:
+        for _ in range(memory_iterations):
+            tracemalloc.reset_peak()
+            baseline, _peak = tracemalloc.get_traced_memory()
+            response = scenario.send()
+            _current, peak = tracemalloc.get_traced_memory()
+            check(scenario, response)
+            peaks.append((peak - baseline) / 1024)
+    finally:
+        tracemalloc.stop()
+
+    return {
+        'iterations': iterations,
+        'latency_ms': rounded(percentiles(latencies)),
+        'queries': {'min': min(queries), 'max': max(queries), 'mean': round(sum(queries) / len(queries), 2)},
+        'memory_kb': rounded(percentiles(peaks)) if peaks else None,
+        'requests_per_second': round(iterations / (sum(latencies) / 1000), 1),
+    }
+
+
+def rounded(values):
+    return {key: round(value, 3) if value is not None else None for key, value in values.items()}
+
+
+def metric(result, path):
+    value = result
+    for key in path:
+        value = (value or {}).get(key)
+    return value
+
+
+def compare(baseline, current, threshold):
+    """Returns ``[(scenario, metric, before, after, change %), ...]`` for regressions past ``threshold``"""
+    regressions = []
+    for name, result in current['scenarios'].items():
+        previous = baseline.get('scenarios', {}).get(name)
+        if previous is None:
+            continue
+        for path, allowed in COMPARED_METRICS:
+            before, after = metric(previous, path), metric(result, path)
+            if before is None or after is None:
+                continue
+            limit = threshold if allowed is None else allowed
+            change = (after - before) / before * 100 if before else (100.0 if after > before else 0.0)
+            if change > limit:
+                regressions.append((name, '.'.join(path), before, after, round(change, 1)))
+    return regressions
+
+
+def print_table(results):
+    header = f"{'scenario':<24}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'mem KB':>10}{'req/s':>9}"
+    print(header)
+    print('-' * len(header))
+    for name, result in results.items():
+        latency, memory = result['latency_ms'], result['memory_kb'] or {}
+        print(
+            f"{name:<24}{latency['p50']:>9.2f}{latency['p95']:>9.2f}{latency['p99']:>9.2f}"
+            f"{result['queries']['max']:>9}{memory.get('max') or 0:>10.1f}{result['requests_per_second']:>9}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(__doc__.strip().splitlines()[1:]),
+    )
+    parser.add_argument('--tickets', type=int, default=20000, help='Tickets to generate in the throwaway database')
+    parser.add_argument('--users', type=int, default=50, help='Load users to generate')
+    parser.add_argument('--seed', type=int, default=42, help='Dataset seed')
+    parser.add_argument(
+        '--existing-db', action='store_true',
+        help='Use the configured database as is (e.g. after manage.py generate_load_data) instead of a fresh one',
+    )
+    parser.add_argument('--iterations', type=int, default=200, help='Timed requests per scenario')
+    parser.add_argument('--warmup', type=int, default=10, help='Untimed requests per scenario')
+    parser.add_argument('--memory-iterations', type=int, default=10, help='Requests per scenario traced for memory')
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS, help='Run only these (repeatable)')
+    parser.add_argument('--json', metavar='PATH', help='Write the results as JSON (- for stdout)')
+    parser.add_argument('--compare', metavar='PATH', help='Baseline JSON from a previous run')
+    parser.add_argument('--threshold', type=float, default=10.0, help='Allowed regression in percent for --compare')
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from django.db import connection
+
+    # The test client talks to "testserver"; DEBUG would also keep every query in memory
+    settings.ALLOWED_HOSTS = [*settings.ALLOWED_HOSTS, 'testserver']
+    settings.DEBUG = False
+    if not args.existing_db:
+        create_benchmark_database(on_disk=True)
+        started = time.perf_counter()
+        seed_tickets(args.tickets, users=args.users, seed=args.seed, deleted_ratio=0.01)
+        print(f'Seeded {args.tickets} tickets in {time.perf_counter() - started:.1f}s')
+
+    from core.models import Ticket
+
+    fixture = Fixture()
+    scenarios = build_scenarios(fixture)
+    results = {}
+    for name in args.scenario or SCENARIOS:
+        results[name] = run_scenario(scenarios[name], args.iterations, args.warmup, args.memory_iterations)
+        print(f"  {name}: p95 {results[name]['latency_ms']['p95']:.2f} ms", file=sys.stderr)
+
+    report = {
+        'meta': {
+            'tickets': Ticket.all_objects.count(),
+            'database': connection.vendor,
+            'iterations': args.iterations,
+            'warmup': args.warmup,
+            'memory_iterations': args.memory_iterations,
+            'python': sys.version.split()[0],
+        },
+        'scenarios': results,
+    }
+    print_table(results)
+    if args.json:
+        write_json(args.json, report)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as source:
+            baseline = json.load(source)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            print(f'\nRegressions over {args.threshold}% (queries: any increase):')
+            for name, path, before, after, change in regressions:
+                print(f'  {name} {path}: {before} -> {after} (+{change}%)')
+            sys.exit(1)
+        print(f'\nNo regressions over {args.threshold}% against {args.compare}')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,140 @@
+"""
+Minimal Redis-protocol server for local benchmarks.
+
+Implements just what ``channels_redis.pubsub.RedisPubSubChannelLayer`` needs
+(HELLO, PING, SUBSCRIBE, UNSUBSCRIBE, PUBLISH, plus harmless CLIENT/SELECT/ECHO)
+in both RESP2 and RESP3 (redis-py negotiates RESP3 by default), so
+multi-process fan-out can be measured without a real Redis installation.
+It keeps no data and is not meant for anything but benchmarking.
+
+Run standalone: python -m benchmarks.redis_standin --port 6390
+"""
+
+import argparse
+import asyncio
+from collections import defaultdict
+
+
+def encode(value, push=False):
+    """Encodes a Python value as a RESP reply (``push=True`` emits a RESP3 push frame)"""
+    if value is None:
+        return b'$-1\r\n'
+    if isinstance(value, dict):
+        return b'%%%d\r\n' % len(value) + b''.join(encode(k) + encode(v) for k, v in value.items())
+    if isinstance(value, int):
+        return b':%d\r\n' % value
+    if isinstance(value, str):
+        value = value.encode()
+    if isinstance(value, bytes):
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+    if isinstance(value, (list, tuple)):
+        return (b'>%d\r\n' if push else b'*%d\r\n') % len(value) + b''.join(encode(item) for item in value)
+    raise TypeError(f'Cannot encode {type(value)!r}')
+
+
+OK = b'+OK\r\n'
+PONG = b'+PONG\r\n'
+
+
+class RedisStandIn:
+    """In-process pub/sub broker speaking RESP2/RESP3"""
+
+    def __init__(self):
+        self.subscribers = defaultdict(set)
+        self.published = 0
+        self.delivered = 0
+
+    async def serve(self, host='127.0.0.1', port=0):
+        """Starts listening; returns the asyncio server (``server.sockets[0]`` has the port)"""
+        return await asyncio.start_server(self.handle_client, host, port)
+
+    async def read_command(self, reader):
+        line = await reader.readline()
+        if not line:
+            return None
+        if not line.startswith(b'*'):
+            # Inline command (e.g. from redis-cli / telnet)
+            return line.strip().split()
+        args = []
+        for _ in range(int(line[1:])):
+            length = int((await reader.readline())[1:])
+            args.append((await reader.readexactly(length + 2))[:-2])
+        return args
+
+    async def handle_client(self, reader, writer):
+        subscriptions = set()
+        writer.resp3 = False
+        try:
+            while True:
+                command = await self.read_command(reader)
+                if command is None:
+                    break
+                if not command:
+                    continue
+                name, args = command[0].upper(), command[1:]
+                push = writer.resp3
+                if name == b'HELLO':
+                    writer.resp3 = bool(args) and args[0] == b'3'
+                    info = {
+                        'server': 'redis', 'version': '7.2.0', 'proto': 3 if writer.resp3 else 2,
+                        'id': id(writer) % 100000, 'mode': 'standalone', 'role': 'master', 'modules': [],
+                    }
+                    writer.write(encode(info if writer.resp3 else [x for kv in info.items() for x in kv]))
+                elif name == b'PING':
+                    writer.write(encode([b'pong', b'']) if subscriptions and not push else PONG)
+                elif name == b'SUBSCRIBE':
+                    for channel in args:
+                        subscriptions.add(channel)
+                        self.subscribers[channel].add(writer)
+                        writer.write(encode([b'subscribe', channel, len(subscriptions)], push))
+                elif name == b'UNSUBSCRIBE':
+                    for channel in args or list(subscriptions):
+                        subscriptions.discard(channel)
+                        self.subscribers[channel].discard(writer)
+                        writer.write(encode([b'unsubscribe', channel, len(subscriptions)], push))
+                elif name == b'PUBLISH':
+                    channel, payload = args
+                    receivers = list(self.subscribers.get(channel, ()))
+                    for receiver in receivers:
+                        receiver.write(encode([b'message', channel, payload], receiver.resp3))
+                    self.published += 1
+                    self.delivered += len(receivers)
+                    writer.write(encode(len(receivers)))
+                elif name == b'ECHO':
+                    writer.write(encode(args[0]))
+                elif name in (b'CLIENT', b'SELECT'):
+                    writer.write(OK)
+                elif name == b'QUIT':
+                    writer.write(OK)
+                    break
+                else:
+                    writer.write(b'-ERR unknown command \'%s\'\r\n' % name)
+                await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            for channel in subscriptions:
+                self.subscribers[channel].discard(writer)
+            writer.close()
+
+
+def run(host, port, ready=None):
+    """Runs the stand-in forever (target for ``multiprocessing.Process``)"""
+
+    async def main():
+        server = await RedisStandIn().serve(host, port)
+        if ready is not None:
+            ready.put(server.sockets[0].getsockname()[1])
+        async with server:
+            await server.serve_forever()
+
+    asyncio.run(main())
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=6390)
+    options = parser.parse_args()
+    print(f'Redis stand-in listening on {options.host}:{options.port}')
+    run(options.host, options.port)
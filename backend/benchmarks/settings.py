@@ -0,0 +1,13 @@
+"""
+Settings for benchmark server subprocesses (e.g. Daphne started by ``benchmarks.websocket_load``).
+
+Same as ``config.settings`` but on the benchmark's throwaway database, passed
+in ``BENCHMARK_DATABASE`` by the parent process.
+"""
+
+import os
+
+from config.settings import *  # noqa: F401,F403
+from config.settings import DATABASES
+
+DATABASES = {'default': {**DATABASES['default'], 'NAME': os.environ['BENCHMARK_DATABASE']}}
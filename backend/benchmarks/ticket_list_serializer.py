@@ -0,0 +1,81 @@
+"""
+Ticket list serialization benchmark: ``TicketSerializer(many=True)`` vs ``TicketRowSerializer``.
+
+Seeds a throwaway database and measures rows per second for both paths,
+including the query (``select_related`` objects vs a single ``values()``)
+and, with ``--render``, the JSON rendering of the result.
+
+Example: python -m benchmarks.ticket_list_serializer --rows 10000 100000
+"""
+
+import argparse
+import time
+
+from .utils import create_benchmark_database, seed_tickets, setup_django, write_json
+
+
+def measure(function, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10000, 100000], help='Dataset sizes')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per measurement (best is kept)')
+    parser.add_argument('--render', action='store_true', help='Include JSON rendering in the timing')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON (- for stdout)')
+    args = parser.parse_args()
+
+    setup_django()
+    create_benchmark_database()
+
+    from django.utils import translation
+    from rest_framework.renderers import JSONRenderer
+
+    from api.v1.serializers import TicketRowSerializer, TicketSerializer
+    from core.models import Ticket
+
+    translation.activate('pt-br')
+    renderer = JSONRenderer()
+    base = Ticket.objects.select_related('created_by', 'assigned_to').order_by('-created_at', '-id')
+
+    def drf(size):
+        data = TicketSerializer(base[:size], many=True).data
+        return renderer.render(data) if args.render else data
+
+    def fast(size):
+        data = TicketRowSerializer().serialize(TicketRowSerializer.values(base)[:size])
+        return renderer.render(data) if args.render else data
+
+    results = []
+    seeded = 0
+    print(f"{'rows':>8}{'TicketSerializer rows/s':>26}{'TicketRowSerializer rows/s':>29}{'speedup':>10}")
+    for size in sorted(args.rows):
+        if size > seeded:
+            seed_tickets(size - seeded, users=50)
+            seeded = size
+        drf_seconds = measure(lambda: drf(size), args.repeat)
+        fast_seconds = measure(lambda: fast(size), args.repeat)
+        row = {
+            'rows': size,
+            'ticket_serializer_rows_per_second': round(size / drf_seconds),
+            'row_serializer_rows_per_second': round(size / fast_seconds),
+            'speedup': round(drf_seconds / fast_seconds, 2),
+            'render': args.render,
+        }
+        results.append(row)
+        print(
+            f"{size:>8}{row['ticket_serializer_rows_per_second']:>26}"
+            f"{row['row_serializer_rows_per_second']:>29}{row['speedup']:>9}x"
+        )
+    if args.json:
+        write_json(args.json, results)
+
+
+if __name__ == '__main__':
+    main()
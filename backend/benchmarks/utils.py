@@ -0,0 +1,63 @@
+import atexit
+import json
+import os
+import shutil
+import statistics
+import tempfile
+
+
+def setup_django(settings_module='config.settings'):
+    """Configures Django for a standalone benchmark process"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', settings_module)
+    import django
+
+    django.setup()
+
+
+def percentiles(values, points=(50, 95, 99)):
+    """Returns ``{'p50': ..., 'p95': ..., 'p99': ..., 'max': ...}`` for a list of numbers"""
+    if not values:
+        return {f'p{point}': None for point in points} | {'max': None, 'mean': None}
+    ordered = sorted(values)
+    result = {}
+    for point in points:
+        index = min(len(ordered) - 1, max(0, round(point / 100 * len(ordered)) - 1))
+        result[f'p{point}'] = ordered[index]
+    result['max'] = ordered[-1]
+    result['mean'] = statistics.fmean(ordered)
+    return result
+
+
+def write_json(path, data):
+    """Writes benchmark results as JSON (``-`` prints to stdout)"""
+    text = json.dumps(data, indent=2, sort_keys=True, default=str)
+    if path == '-':
+        print(text)
+        return
+    with open(path, 'w', encoding='utf-8') as output:
+        output.write(text + '\n')
+
+
+def create_benchmark_database(on_disk=False):
+    """
+    Creates and migrates a throwaway database (Django's test database) for this process
+
+    ``on_disk=True`` puts a SQLite test database in a temporary file instead of
+    shared-cache memory, where background threads (the notification
+    dispatcher) would hit "database table is locked" during writes.
+    """
+    from django.db import connection
+
+    if on_disk and connection.vendor == 'sqlite':
+        directory = tempfile.mkdtemp(prefix='openticket-bench-')
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        connection.settings_dict.setdefault('TEST', {})['NAME'] = os.path.join(directory, 'db.sqlite3')
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+
+
+def seed_tickets(count, users=10, batch_size=5000, seed=42, deleted_ratio=0.0):
+    """Adds ``count`` tickets from ``manage.py generate_load_data``'s generator (load users are reused)"""
+    from core.load_data import LoadDataGenerator
+
+    generator = LoadDataGenerator(seed=seed, batch_size=batch_size, deleted_ratio=deleted_ratio)
+    return generator.generate(count, users=users)
@@ -0,0 +1,110 @@
+"""
+Minimal asyncio WebSocket client for local load tests.
+
+Speaks just enough RFC 6455 to talk to Daphne: the upgrade handshake, masked
+client frames, unmasked server frames (text, continuation, ping/pong, close).
+No extensions, TLS or subprotocols; it is not meant for anything but
+benchmarking ``ws/tickets/`` over a local socket.
+"""
+
+import asyncio
+import base64
+import hashlib
+import os
+import struct
+
+HANDSHAKE_GUID = '258EAFA5-E914-47DA-95CA-C5AB0DC85B11'
+
+OP_CONTINUATION, OP_TEXT, OP_BINARY, OP_CLOSE, OP_PING, OP_PONG = 0x0, 0x1, 0x2, 0x8, 0x9, 0xA
+
+
+class WebSocketClient:
+    """One client connection (``await WebSocketClient.connect(...)``)"""
+
+    def __init__(self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.closed = False
+
+    @classmethod
+    async def connect(cls, host, port, path, timeout=10.0):
+        reader, writer = await asyncio.wait_for(asyncio.open_connection(host, port), timeout)
+        key = base64.b64encode(os.urandom(16)).decode()
+        writer.write((
+            f'GET {path} HTTP/1.1\r\n'
+            f'Host: {host}:{port}\r\n'
+            'Upgrade: websocket\r\n'
+            'Connection: Upgrade\r\n'
+            f'Sec-WebSocket-Key: {key}\r\n'
+            'Sec-WebSocket-Version: 13\r\n\r\n'
+        ).encode())
+        await writer.drain()
+
+        status = await asyncio.wait_for(reader.readline(), timeout)
+        headers = {}
+        while True:
+            line = await asyncio.wait_for(reader.readline(), timeout)
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+        expected = base64.b64encode(hashlib.sha1((key + HANDSHAKE_GUID).encode()).digest()).decode()
+        if b' 101 ' not in status or headers.get('sec-websocket-accept') != expected:
+            writer.close()
+            raise ConnectionError(f'WebSocket handshake refused: {status.decode("latin-1").strip()}')
+        return cls(reader, writer)
+
+    async def recv(self):
+        """Next text message, or ``None`` once the server closes the connection"""
+        fragments = []
+        while True:
+            try:
+                head = await self.reader.readexactly(2)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                self.closed = True
+                return None
+            fin, opcode = head[0] & 0x80, head[0] & 0x0F
+            length = head[1] & 0x7F
+            if length == 126:
+                length = struct.unpack('!H', await self.reader.readexactly(2))[0]
+            elif length == 127:
+                length = struct.unpack('!Q', await self.reader.readexactly(8))[0]
+            mask = await self.reader.readexactly(4) if head[1] & 0x80 else None
+            payload = await self.reader.readexactly(length)
+            if mask:
+                payload = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+
+            if opcode == OP_PING:
+                await self._send(OP_PONG, payload)
+            elif opcode == OP_CLOSE:
+                self.closed = True
+                return None
+            elif opcode in (OP_TEXT, OP_BINARY, OP_CONTINUATION):
+                fragments.append(payload)
+                if fin:
+                    return b''.join(fragments).decode('utf-8')
+
+    async def send(self, text):
+        await self._send(OP_TEXT, text.encode('utf-8'))
+
+    async def close(self):
+        if not self.closed:
+            self.closed = True
+            try:
+                await self._send(OP_CLOSE, struct.pack('!H', 1000))
+            except ConnectionError:
+                pass
+        self.writer.close()
+
+    async def _send(self, opcode, payload):
+        mask = os.urandom(4)
+        length = len(payload)
+        if length < 126:
+            header = struct.pack('!BB', 0x80 | opcode, 0x80 | length)
+        elif length < 1 << 16:
+            header = struct.pack('!BBH', 0x80 | opcode, 0x80 | 126, length)
+        else:
+            header = struct.pack('!BBQ', 0x80 | opcode, 0x80 | 127, length)
+        masked = bytes(byte ^ mask[index % 4] for index, byte in enumerate(payload))
+        self.writer.write(header + mask + masked)
+        await self.writer.drain()
@@ -0,0 +1,479 @@
+"""
+WebSocket fan-out load test for ``TicketConsumer``.
+
+Opens N simulated clients on ``ws/tickets/`` (authenticated load users with a
+realistic role mix, JWT in the query string) against ``config.asgi.application``,
+then triggers ``ticket_created``/``ticket_updated``/``custom_notification``
+events through ``WebSocketNotificationService``. Reports the connect rate,
+per-client delivery latency, dropped messages (expected recipients are derived
+from the same group rules the consumer uses) and memory per connection.
+
+Transports:
+    inprocess  ``channels.testing`` communicators in this process, in-memory
+               channel layer; the notification dispatcher delivers synchronously
+               (so latency excludes its coalescing window). The in-memory layer
+               scans every channel on each receive, so past ~1000 clients the
+               numbers describe that layer more than the consumer.
+    socket     Daphne in a subprocess, real sockets, a Redis-protocol stand-in
+               (or ``--redis-url``) between publisher and server, and the
+               production dispatcher settings. Memory is the server's RSS.
+
+Example:
+    python -m benchmarks.websocket_load --clients 2000 --events 300
+    python -m benchmarks.websocket_load --transport socket --clients 1000 --events 150
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+import tracemalloc
+from collections import Counter, defaultdict
+
+from .utils import create_benchmark_database, percentiles, setup_django, write_json
+
+EVENT_TYPES = ('ticket_created', 'ticket_updated', 'custom_notification')
+# Answer to the consumer's heartbeat pings
+PONG = json.dumps({'action': 'pong'})
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def rss_kb(pid='self'):
+    """Resident set size of a process in KB (Linux ``/proc``; ``None`` elsewhere)"""
+    try:
+        with open(f'/proc/{pid}/status', encoding='ascii') as status:
+            for line in status:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def raise_file_limit():
+    """Thousands of sockets need more descriptors than the usual soft limit"""
+    try:
+        import resource
+    except ImportError:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if soft != hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+def free_port():
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+# ----- Transports -----
+class InProcessConnection:
+    """``WebsocketCommunicator`` on the full ASGI application"""
+
+    def __init__(self, application, path):
+        from channels.testing import WebsocketCommunicator
+
+        self.communicator = WebsocketCommunicator(application, path)
+
+    async def connect(self):
+        connected, _ = await self.communicator.connect(timeout=30)
+        return connected
+
+    async def recv(self):
+        # Read the output queue directly: receive_from(timeout) would cancel the app on timeout
+        message = await self.communicator.output_queue.get()
+        return message.get('text') if message['type'] == 'websocket.send' else None
+
+    async def send(self, text):
+        await self.communicator.send_to(text_data=text)
+
+    async def close(self):
+        await self.communicator.disconnect()
+
+
+class SocketConnection:
+    """Real socket to a Daphne server"""
+
+    def __init__(self, address, path):
+        self.address = address
+        self.path = path
+        self.client = None
+
+    async def connect(self):
+        from .websocket_client import WebSocketClient
+
+        self.client = await WebSocketClient.connect(*self.address, self.path, timeout=30)
+        return True
+
+    async def recv(self):
+        return await self.client.recv()
+
+    async def send(self, text):
+        await self.client.send(text)
+
+    async def close(self):
+        await self.client.close()
+
+
+class LoadClient:
+    """One simulated browser tab"""
+
+    def __init__(self, user, connection):
+        self.user = user
+        self.connection = connection
+        self.connect_seconds = None
+
+    async def connect(self):
+        started = time.perf_counter()
+        if not await self.connection.connect():
+            raise RuntimeError(f'Connection refused for user {self.user.pk}')
+        self.connect_seconds = time.perf_counter() - started
+
+    async def drain(self, sent_at, stats):
+        """Records the latency of every event frame until cancelled or closed"""
+        while True:
+            text = await self.connection.recv()
+            if text is None:
+                stats['closed'] += 1
+                return
+            now = time.time()
+            data = json.loads(text)
+            event_type = data.get('type')
+            if event_type == 'ping':
+                await self.connection.send(PONG)
+                continue
+            if event_type == 'custom_notification':
+                key = (event_type, data.get('message'))
+            elif event_type in EVENT_TYPES:
+                key = (event_type, data['ticket']['id'])
+            else:
+                continue
+            started = sent_at.get(key)
+            if started is None:
+                stats['unexpected'] += 1
+                continue
+            stats['latencies'][event_type].append(now - started)
+            stats['last_received'] = time.monotonic()
+
+
+# ----- Scenario -----
+class Publisher:
+    """Triggers events through ``WebSocketNotificationService`` and counts their expected recipients"""
+
+    def __init__(self, clients, users, rng):
+        from services.ticket_groups import groups_for_user
+
+        self.rng = rng
+        self.agents = [user for user in users if user.role == 'agent'] or users
+        # Recipients are counted per distinct user: clients_by_user[user_id] sockets share the same groups
+        self.clients_by_user = Counter(client.user.pk for client in clients)
+        self.user_groups = {user.pk: set(groups_for_user(user)) for user in users}
+        self.sent_at = {}
+        self.published = Counter()
+        self.expected = Counter()
+        self.update_targets = []
+
+    def prepare(self, events):
+        """Creates one ticket per ``ticket_updated`` event (events of the same ticket would be coalesced)"""
+        count = sum(1 for number in range(events) if EVENT_TYPES[number % len(EVENT_TYPES)] == 'ticket_updated')
+        self.update_targets = [self._create_ticket(f'Load test update target {number}') for number in range(count)]
+
+    def trigger(self, number):
+        from services.ticket_groups import BROADCAST_GROUP, groups_for_ticket
+        from services.websocket_service import WebSocketNotificationService
+
+        event_type = EVENT_TYPES[number % len(EVENT_TYPES)]
+        if event_type == 'custom_notification':
+            message = f'Load test notification {number}'
+            self.sent_at[(event_type, message)] = time.time()
+            WebSocketNotificationService.send_custom_notification(message)
+            groups = {BROADCAST_GROUP}
+        elif event_type == 'ticket_created':
+            ticket = self._create_ticket(f'Load test ticket {number}')
+            self.sent_at[(event_type, ticket.pk)] = time.time()
+            WebSocketNotificationService.send_ticket_created(ticket)
+            groups = set(groups_for_ticket(ticket))
+        else:
+            ticket = self.update_targets.pop()
+            ticket.priority = self.rng.choice(['low', 'medium', 'high', 'urgent'])
+            ticket.save()
+            self.sent_at[(event_type, ticket.pk)] = time.time()
+            WebSocketNotificationService.send_ticket_updated(ticket)
+            groups = set(groups_for_ticket(ticket))
+        self.published[event_type] += 1
+        self.expected[event_type] += sum(
+            sockets for user_id, sockets in self.clients_by_user.items() if self.user_groups[user_id] & groups
+        )
+
+    def _create_ticket(self, title):
+        from core.models import Ticket
+
+        creator = self.rng.choice(self.agents)
+        return Ticket.objects.create(
+            title=title,
+            description='Created by benchmarks.websocket_load',
+            priority='medium',
+            department=creator.department or 'TI',
+            created_by=creator,
+        )
+
+
+async def run(options, address=None, server_pid=None):
+    from asgiref.sync import sync_to_async
+    from rest_framework_simplejwt.tokens import AccessToken
+
+    from core.load_data import LoadDataGenerator
+
+    rng = random.Random(options['seed'])
+    users = await sync_to_async(LoadDataGenerator(seed=options['seed']).ensure_users)(options['users'])
+    tokens = {user.pk: str(AccessToken.for_user(user)) for user in users}
+
+    if address is None:
+        from config.asgi import application
+    clients = []
+    for number in range(options['clients']):
+        user = users[number % len(users)]
+        path = f'/ws/tickets/?token={tokens[user.pk]}'
+        connection = SocketConnection(address, path) if address else InProcessConnection(application, path)
+        clients.append(LoadClient(user, connection))
+
+    # ----- Connect -----
+    memory_before = rss_kb(server_pid or 'self')
+    if options['trace_memory']:
+        tracemalloc.start()
+    traced_before = tracemalloc.get_traced_memory()[0] if options['trace_memory'] else 0
+    semaphore = asyncio.Semaphore(options['connect_concurrency'])
+
+    async def connect(client):
+        async with semaphore:
+            await client.connect()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(connect(client) for client in clients))
+    connect_duration = time.perf_counter() - started
+    # Let group_add calls settle before measuring and publishing
+    await asyncio.sleep(0.5)
+    memory_after = rss_kb(server_pid or 'self')
+    traced = None
+    if options['trace_memory']:
+        traced = (tracemalloc.get_traced_memory()[0] - traced_before) / len(clients) / 1024
+        tracemalloc.stop()
+
+    # ----- Publish -----
+    publisher = Publisher(clients, users, rng)
+    await sync_to_async(publisher.prepare)(options['events'])
+    stats = {'latencies': defaultdict(list), 'unexpected': 0, 'closed': 0, 'last_received': time.monotonic()}
+    drains = [asyncio.ensure_future(client.drain(publisher.sent_at, stats)) for client in clients]
+    interval = 1 / options['rate'] if options['rate'] else 0
+    publish_started = time.perf_counter()
+    for number in range(options['events']):
+        await sync_to_async(publisher.trigger)(number)
+        await asyncio.sleep(interval)
+    publish_duration = time.perf_counter() - publish_started
+
+    # Wait until every expected frame arrived or nothing arrived for idle_timeout seconds
+    total_expected = sum(publisher.expected.values())
+    while sum(len(values) for values in stats['latencies'].values()) < total_expected:
+        if time.monotonic() - stats['last_received'] > options['idle_timeout']:
+            break
+        await asyncio.sleep(0.05)
+    delivery_duration = time.perf_counter() - publish_started
+    for drain in drains:
+        drain.cancel()
+    await asyncio.gather(*drains, return_exceptions=True)
+    await asyncio.gather(*(client.connection.close() for client in clients), return_exceptions=True)
+
+    connect_times = [client.connect_seconds for client in clients]
+    memory_delta = memory_after - memory_before if memory_before is not None and memory_after is not None else None
+    return summarize(
+        options, publisher, stats, connect_times, connect_duration, publish_duration, delivery_duration,
+        memory_delta, traced,
+    )
+
+
+def summarize(options, publisher, stats, connect_times, connect_duration, publish_duration, delivery_duration,
+              memory_delta, traced):
+    def milliseconds(values):
+        return {key: value and round(value * 1000, 3) for key, value in percentiles(values).items()}
+
+    clients = options['clients']
+    report = {'config': options, 'event_types': {}}
+    delivered_total = 0
+    all_latencies = []
+    for event_type in EVENT_TYPES:
+        latencies = stats['latencies'].get(event_type, [])
+        delivered_total += len(latencies)
+        all_latencies.extend(latencies)
+        report['event_types'][event_type] = {
+            'published': publisher.published[event_type],
+            'expected_deliveries': publisher.expected[event_type],
+            'delivered': len(latencies),
+            'dropped': publisher.expected[event_type] - len(latencies),
+            'latency_ms': milliseconds(latencies),
+        }
+    report['connections'] = {
+        'clients': clients,
+        'connect_seconds': round(connect_duration, 3),
+        'connects_per_second': round(clients / connect_duration, 1),
+        'connect_latency_ms': milliseconds(connect_times),
+        'rss_kb_per_connection': round(memory_delta / clients, 2) if memory_delta is not None else None,
+        'traced_kb_per_connection': round(traced, 2) if traced is not None else None,
+        'closed_by_server': stats['closed'],
+    }
+    report['totals'] = {
+        'delivered': delivered_total,
+        'dropped': sum(row['dropped'] for row in report['event_types'].values()),
+        'unexpected': stats['unexpected'],
+        'publish_seconds': round(publish_duration, 3),
+        'delivery_seconds': round(delivery_duration, 3),
+        'messages_per_second': round(delivered_total / max(delivery_duration, 1e-9), 1),
+        'latency_ms': milliseconds(all_latencies),
+    }
+    return report
+
+
+def print_report(report):
+    connections = report['connections']
+    latency = connections['connect_latency_ms']
+    print(
+        f"{connections['clients']} clients connected in {connections['connect_seconds']}s "
+        f"({connections['connects_per_second']}/s, p95 {latency['p95'] or 0:.1f} ms)"
+    )
+    if connections['rss_kb_per_connection'] is not None:
+        print(f"RSS per connection: {connections['rss_kb_per_connection']} KB", end='')
+        if connections['traced_kb_per_connection'] is not None:
+            print(f", traced Python allocations: {connections['traced_kb_per_connection']} KB", end='')
+        print()
+    print(
+        f"\n{'event type':<22}{'published':>10}{'expected':>10}{'delivered':>11}{'dropped':>9}"
+        f"{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+    )
+    for event_type, row in report['event_types'].items():
+        latency = row['latency_ms']
+        print(
+            f"{event_type:<22}{row['published']:>10}{row['expected_deliveries']:>10}{row['delivered']:>11}"
+            f"{row['dropped']:>9}{latency['p50'] or 0:>9.2f}{latency['p95'] or 0:>9.2f}{latency['p99'] or 0:>9.2f}"
+        )
+    totals = report['totals']
+    print(
+        f"\n{totals['delivered']} messages in {totals['delivery_seconds']}s -> {totals['messages_per_second']} msg/s, "
+        f"{totals['dropped']} dropped, {totals['unexpected']} unexpected"
+    )
+
+
+# ----- Socket transport setup -----
+def start_redis_standin():
+    """Starts ``benchmarks.redis_standin`` in a subprocess; returns ``(process, redis_url)``"""
+    from .redis_standin import run as run_standin
+
+    context = multiprocessing.get_context('spawn')
+    port_queue = context.Queue()
+    standin = context.Process(target=run_standin, args=('127.0.0.1', 0, port_queue), daemon=True)
+    standin.start()
+    return standin, f'redis://127.0.0.1:{port_queue.get(timeout=10)}/0'
+
+
+def start_server(options, database, redis_url):
+    """Starts Daphne on the benchmark database; returns ``(process, (host, port))`` once it accepts connections"""
+    port = free_port()
+    env = dict(
+        os.environ,
+        DJANGO_SETTINGS_MODULE='benchmarks.settings',
+        BENCHMARK_DATABASE=database,
+        CHANNEL_LAYER_REDIS_URL=redis_url,
+        CHANNEL_LAYER_REDIS_BACKEND=options['backend'],
+    )
+    process = subprocess.Popen(
+        [sys.executable, '-m', 'daphne', '-b', '127.0.0.1', '-p', str(port), 'config.asgi:application'],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE if options['quiet'] else None,
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f'Daphne exited with status {process.returncode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=0.5).close()
+            return process, ('127.0.0.1', port)
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise SystemExit('Daphne did not start within 30 seconds')
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__.strip().splitlines()[0], formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog='\n'.join(__doc__.strip().splitlines()[1:]),
+    )
+    parser.add_argument('--transport', choices=('inprocess', 'socket'), default='inprocess')
+    parser.add_argument('--clients', type=int, default=1000, help='Concurrent WebSocket clients')
+    parser.add_argument('--users', type=int, default=200, help='Distinct load users the clients log in as')
+    parser.add_argument('--events', type=int, default=150, help='Events to trigger (cycling through the types)')
+    parser.add_argument('--rate', type=float, default=0, help='Events per second (0 = as fast as possible)')
+    parser.add_argument('--connect-concurrency', type=int, default=100, help='Handshakes in flight at once')
+    parser.add_argument('--idle-timeout', type=float, default=5.0, help='Seconds without messages before giving up')
+    parser.add_argument('--trace-memory', action='store_true', help='Also trace Python allocations while connecting')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for users and events')
+    parser.add_argument('--redis-url', help='socket transport: use a real Redis instead of the stand-in')
+    parser.add_argument('--backend', choices=('pubsub', 'core'), default='pubsub', help='channels_redis layer')
+    parser.add_argument('--quiet', action='store_true', help='Hide the Daphne log')
+    parser.add_argument('--json', metavar='PATH', help='Also write the results as JSON (- for stdout)')
+    args = parser.parse_args()
+
+    options = {
+        'transport': args.transport,
+        'clients': args.clients,
+        'users': args.users,
+        'events': args.events,
+        'rate': args.rate,
+        'connect_concurrency': args.connect_concurrency,
+        'idle_timeout': args.idle_timeout,
+        'trace_memory': args.trace_memory and args.transport == 'inprocess',
+        'seed': args.seed,
+        'backend': args.backend,
+        'quiet': args.quiet,
+    }
+    raise_file_limit()
+    processes = []
+    server, address = None, None
+    try:
+        if args.transport == 'socket':
+            redis_url = args.redis_url
+            if not redis_url:
+                standin, redis_url = start_redis_standin()
+                processes.append(standin)
+            os.environ['CHANNEL_LAYER_REDIS_URL'] = redis_url
+            os.environ['CHANNEL_LAYER_REDIS_BACKEND'] = args.backend
+
+        setup_django()
+        from django.conf import settings
+        from django.db import connection
+
+        create_benchmark_database(on_disk=True)
+        if args.transport == 'inprocess':
+            # Deliver inside the publishing call: the in-memory layer only works on this event loop
+            settings.TICKET_NOTIFICATIONS = {**settings.TICKET_NOTIFICATIONS, 'ASYNC': False}
+        else:
+            server, address = start_server(options, connection.settings_dict['NAME'], redis_url)
+        report = asyncio.run(run(options, address, server.pid if server else None))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait(timeout=10)
+        for process in processes:
+            process.terminate()
+
+    print_report(report)
+    if args.json:
+        write_json(args.json, report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,17 +1,222 @@
+import cProfile
+import heapq
+import logging
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
 from django.utils import translation
+from django.utils.deprecation import MiddlewareMixin
+
+logger = logging.getLogger(__name__)
 
 
-class ForcePortugueseMiddleware:
+class ForcePortugueseMiddleware(MiddlewareMixin):
     """Middleware to force Portuguese language for API requests"""
-    
-    def __init__(self, get_response):
-        self.get_response = get_response
 
-    def __call__(self, request):
+    # MiddlewareMixin makes it async-capable: async views are not pushed to a thread because of it
+    def process_request(self, request):
         # Force Portuguese for API requests
         if request.path.startswith('/api/'):
             translation.activate('pt-br')
             request.LANGUAGE_CODE = 'pt-br'
-        
-        response = self.get_response(request)
+
+
+def instrumentation_setting(name, default):
+    return getattr(settings, 'REQUEST_INSTRUMENTATION', {}).get(name, default)
+
+
+class RequestTrace:
+    """Queries and timings collected while one request runs"""
+
+    __slots__ = ('started', 'queries', 'db_seconds', 'render_started', 'render_seconds')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = []
+        self.db_seconds = 0.0
+        self.render_started = None
+        self.render_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        # Installed with connection.execute_wrapper(): times every query of the request
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - started
+            self.db_seconds += elapsed
+            self.queries.append((sql, elapsed))
+
+
+class RequestMetrics:
+    """Per-view aggregates since the process started (thread-safe)"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(self, view, total_ms, queries, db_ms, render_ms, size):
+        with self._lock:
+            row = self._views.get(view)
+            if row is None:
+                row = self._views[view] = {
+                    'requests': 0, 'total_ms': 0.0, 'max_ms': 0.0, 'queries': 0, 'max_queries': 0,
+                    'db_ms': 0.0, 'render_ms': 0.0, 'bytes': 0,
+                }
+            row['requests'] += 1
+            row['total_ms'] += total_ms
+            row['max_ms'] = max(row['max_ms'], total_ms)
+            row['queries'] += queries
+            row['max_queries'] = max(row['max_queries'], queries)
+            row['db_ms'] += db_ms
+            row['render_ms'] += render_ms
+            row['bytes'] += size or 0
+
+    def snapshot(self):
+        """Averages per view, slowest (by mean time) first"""
+        with self._lock:
+            rows = {view: dict(row) for view, row in self._views.items()}
+        result = {}
+        for view, row in sorted(rows.items(), key=lambda item: -item[1]['total_ms'] / item[1]['requests']):
+            count = row['requests']
+            result[view] = {
+                'requests': count,
+                'mean_ms': round(row['total_ms'] / count, 2),
+                'max_ms': round(row['max_ms'], 2),
+                'mean_queries': round(row['queries'] / count, 2),
+                'max_queries': row['max_queries'],
+                'mean_db_ms': round(row['db_ms'] / count, 2),
+                'mean_render_ms': round(row['render_ms'] / count, 2),
+                'mean_bytes': round(row['bytes'] / count),
+            }
+        return result
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+
+# Global instance (one per process)
+request_metrics = RequestMetrics()
+
+
+class RequestInstrumentationMiddleware:
+    """
+    Per-request query count, DB time, render time and response size.
+
+    Enabled with ``REQUEST_INSTRUMENTATION['ENABLED']``; otherwise Django drops
+    it at startup (``MiddlewareNotUsed``) and it costs nothing. Each response
+    gets a ``Server-Timing`` header (shown by the browser dev tools), each view
+    is aggregated in ``request_metrics``, requests slower than
+    ``SLOW_REQUEST_MS`` are logged with their SQL (repeated statements
+    grouped, which makes N+1 queries obvious) and, with ``PROFILE_DIR`` set,
+    a ``PROFILE_SAMPLE_RATE`` share of the requests runs under cProfile; the
+    dumps of the ``PROFILE_KEEP`` slowest slow requests are kept on disk.
+    """
+
+    def __init__(self, get_response):
+        if not instrumentation_setting('ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.slow_ms = instrumentation_setting('SLOW_REQUEST_MS', 500)
+        self.max_logged_queries = instrumentation_setting('MAX_LOGGED_QUERIES', 50)
+        self.profile_dir = instrumentation_setting('PROFILE_DIR', None)
+        self.profile_rate = instrumentation_setting('PROFILE_SAMPLE_RATE', 0.1)
+        self.profile_keep = instrumentation_setting('PROFILE_KEEP', 20)
+        self._profiles = []  # heap of (ms, path): the fastest kept dump is dropped first
+        self._profiles_lock = threading.Lock()
+        if self.profile_dir:
+            os.makedirs(self.profile_dir, exist_ok=True)
+
+    def __call__(self, request):
+        trace = RequestTrace()
+        request._instrumentation = trace
+        profiler = cProfile.Profile() if self.profile_dir and random.random() < self.profile_rate else None
+        with ExitStack() as stack:
+            # Wrappers also apply to connections that only open during the request
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(trace))
+            if profiler is not None:
+                response = profiler.runcall(self.get_response, request)
+            else:
+                response = self.get_response(request)
+
+        total_ms = (time.perf_counter() - trace.started) * 1000
+        db_ms = trace.db_seconds * 1000
+        render_ms = trace.render_seconds * 1000
+        size = None if response.streaming else len(response.content)
+        view = self._view_name(request)
+        response['Server-Timing'] = ', '.join([
+            f'db;dur={db_ms:.1f};desc="{len(trace.queries)} queries"',
+            f'render;dur={render_ms:.1f}',
+            f'app;dur={max(total_ms - db_ms - render_ms, 0):.1f}',
+            f'total;dur={total_ms:.1f}',
+        ])
+        request_metrics.record(view, total_ms, len(trace.queries), db_ms, render_ms, size)
+
+        if total_ms >= self.slow_ms:
+            self._log_slow(request, view, trace, total_ms, db_ms, render_ms, size)
+            if profiler is not None:
+                self._save_profile(profiler, view, total_ms)
         return response
+
+    def process_template_response(self, request, response):
+        # DRF/template responses render after the view returns: time it with a post-render callback
+        trace = getattr(request, '_instrumentation', None)
+        if trace is not None:
+            trace.render_started = time.perf_counter()
+
+            def rendered(response):
+                trace.render_seconds += time.perf_counter() - trace.render_started
+
+            response.add_post_render_callback(rendered)
+        return response
+
+    @staticmethod
+    def _view_name(request):
+        match = getattr(request, 'resolver_match', None)
+        if match is None:
+            return 'unresolved'
+        return match.view_name or match._func_path
+
+    def _log_slow(self, request, view, trace, total_ms, db_ms, render_ms, size):
+        statements = Counter()
+        durations = Counter()
+        for sql, elapsed in trace.queries:
+            statements[sql] += 1
+            durations[sql] += elapsed * 1000
+        lines = [
+            f'{durations[sql]:8.1f} ms  x{count:<4} {sql}'
+            for sql, count in sorted(statements.items(), key=lambda item: -durations[item[0]])
+        ]
+        if len(lines) > self.max_logged_queries:
+            lines = lines[:self.max_logged_queries] + [f'... {len(lines) - self.max_logged_queries} more']
+        logger.warning(
+            'Slow request %s %s (%s): %.1f ms, %d queries (%d distinct), db %.1f ms, render %.1f ms, %s bytes\n%s',
+            request.method, request.get_full_path(), view, total_ms, len(trace.queries), len(statements),
+            db_ms, render_ms, size if size is not None else 'streamed', '\n'.join(lines),
+        )
+
+    def _save_profile(self, profiler, view, total_ms):
+        name = re.sub(r'[^A-Za-z0-9_.-]+', '_', view)
+        path = os.path.join(self.profile_dir, f'{int(total_ms):06d}ms-{name}-{time.time_ns()}.prof')
+        with self._profiles_lock:
+            if len(self._profiles) >= self.profile_keep:
+                if total_ms <= self._profiles[0][0]:
+                    return
+                _ms, fastest = heapq.heappop(self._profiles)
+                try:
+                    os.remove(fastest)
+                except OSError:
+                    pass
+            heapq.heappush(self._profiles, (total_ms, path))
+        profiler.dump_stats(path)
+        logger.warning('Saved profile of %s (%.1f ms) to %s', view, total_ms, path)
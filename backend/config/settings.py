@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from datetime import timedelta
 from pathlib import Path
 
@@ -49,6 +50,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Outermost so its timings cover the whole stack; a no-op unless REQUEST_INSTRUMENTATION is enabled
+    'config.middleware.RequestInstrumentationMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -174,7 +177,7 @@ CORS_ALLOW_ALL_ORIGINS = True  # Only for development
 # Django REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -182,6 +185,47 @@ REST_FRAMEWORK = {
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
 
+# Cache: ETag version tokens, ticket stats and auth user versions live here, so every process that
+# serves or writes tickets (workers, import/archive commands) must share it. Set CACHE_REDIS_URL
+# (e.g. redis://127.0.0.1:6379/1) for that; the in-memory default only fits a single process
+# (check core.W001 warns about it outside DEBUG)
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+if CACHE_REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': CACHE_REDIS_URL,
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+# Ticket list pagination (keyset by default, offset via ?page=N)
+TICKET_PAGINATION = {
+    'PAGE_SIZE': 20,
+    'MAX_PAGE_SIZE': 100,
+    # Page size for the server-rendered dashboard (offset pagination)
+    'DASHBOARD_PAGE_SIZE': 10,
+}
+
+# Ticket statistics cache (incrementally updated on writes, fully recomputed after the timeout)
+TICKET_STATS_CACHE_TIMEOUT = 300
+
+# Ticket full-text search backend: 'auto' picks SQLite FTS5 or PostgreSQL tsvector from the
+# database vendor; a dotted path (e.g. 'services.search_service.IContainsSearchBackend') forces one
+TICKET_SEARCH_BACKEND = 'auto'
+
+# Users authenticated by JWT are kept in a per-process cache (api.authentication.CachedJWTAuthentication)
+# for TIMEOUT seconds; any user save/delete invalidates it. TIMEOUT = 0 reads the user on every request.
+AUTH_USER_CACHE = {
+    'TIMEOUT': 60,
+    'MAX_ENTRIES': 10000,
+}
+
 # JWT settings
 
 SIMPLE_JWT = {
@@ -219,7 +263,7 @@ SPECTACULAR_SETTINGS = {
     'COMPONENT_SPLIT_REQUEST': True,
     'SCHEMA_PATH_PREFIX': '/api/',
     'AUTHENTICATION_WHITELIST': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'api.authentication.CachedJWTAuthentication',
     ],
     'SWAGGER_UI_SETTINGS': {
         'persistAuthorization': True,
@@ -238,12 +282,101 @@ SPECTACULAR_SETTINGS = {
     ],
 }
 
+# WebSocket notification outbox: events are sent after commit by a background worker,
+# merging updates to the same ticket that happen within COALESCE_WINDOW seconds
+TICKET_NOTIFICATIONS = {
+    'ASYNC': True,
+    'COALESCE_WINDOW': 0.25,
+}
+
+# Per-request instrumentation (config.middleware.RequestInstrumentationMiddleware): Server-Timing
+# headers with query count, DB and render time, per-view aggregates at /api/v1/requests/metrics/,
+# requests slower than SLOW_REQUEST_MS logged with their SQL and, when PROFILE_DIR is set, cProfile
+# dumps of the PROFILE_KEEP slowest sampled requests. Enable with REQUEST_INSTRUMENTATION=1.
+REQUEST_INSTRUMENTATION = {
+    'ENABLED': os.environ.get('REQUEST_INSTRUMENTATION') == '1',
+    'SLOW_REQUEST_MS': 500,
+    'MAX_LOGGED_QUERIES': 50,
+    'PROFILE_DIR': os.environ.get('REQUEST_PROFILE_DIR'),
+    'PROFILE_SAMPLE_RATE': 0.1,
+    'PROFILE_KEEP': 20,
+}
+
+# Max tickets whose rendered JSON is kept in the per-process payload cache
+TICKET_PAYLOAD_CACHE_SIZE = 5000
+
+# archive_deleted_tickets: soft-deleted tickets older than this move to the archive table
+TICKET_ARCHIVE_DELETED_AFTER_DAYS = 30
+# archive_closed_tickets: resolved/cancelled tickets untouched for this long move to the archive
+# table; the ticket list reads it only when filtering by a closed status
+TICKET_ARCHIVE_CLOSED_AFTER_DAYS = 180
+
+# Rows fetched per database round trip by the streaming ticket export
+TICKET_EXPORT_CHUNK_SIZE = 2000
+
+# Tickets inserted per bulk_create/transaction by import_tickets and the import endpoint
+TICKET_IMPORT_BATCH_SIZE = 1000
+
+# Max ticket ids accepted by the bulk_update/bulk_resolve endpoints
+TICKET_BULK_MAX_IDS = 500
+
+# Per-connection cap on explicit {"action": "subscribe"} ticket subscriptions
+WEBSOCKET_MAX_TICKET_SUBSCRIPTIONS = 100
+
+# Frames sent by WebSocket clients (TicketConsumer.receive): each connection may send RATE frames per
+# second with bursts of up to BURST, frames longer than MAX_MESSAGE_LENGTH characters are dropped and
+# relayed messages are merged for BATCH_WINDOW seconds (at most MAX_BATCH per group message)
+WEBSOCKET_INBOUND = {
+    'RATE': 5,
+    'BURST': 20,
+    'MAX_MESSAGE_LENGTH': 4096,
+    'BATCH_WINDOW': 0.05,
+    'MAX_BATCH': 20,
+}
+
+# Frames sent to WebSocket clients are buffered per connection (TicketConsumer.deliver): at most
+# MAX_QUEUE frames (queued events of the same ticket are merged, then the oldest frame is dropped);
+# a client more than MAX_BEHIND frames or MAX_LAG seconds behind gets {"type": "resync_required"}
+# and is closed. The queue only grows on servers that wait for the socket; Daphne buffers every write,
+# so there only MAX_LAG applies, measured by the heartbeat round trip (a pong later than MAX_LAG)
+WEBSOCKET_OUTBOUND = {
+    'MAX_QUEUE': 100,
+    'MAX_BEHIND': 500,
+    'MAX_LAG': 30.0,
+}
+
+# TicketConsumer sends {"type": "ping"} every INTERVAL seconds (0 disables it) and closes sockets that
+# sent no frame for TIMEOUT seconds, such as half-open connections of sleeping laptops
+WEBSOCKET_HEARTBEAT = {
+    'INTERVAL': 25.0,
+    'TIMEOUT': 60.0,
+}
+
 # Django Channels settings
 ASGI_APPLICATION = 'config.asgi.application'
 
-# Channel layers configuration (in-memory for development)
-CHANNEL_LAYERS = {
-    'default': {
-        'BACKEND': 'channels.layers.InMemoryChannelLayer',
-    },
+# Channel layers configuration
+# In-memory for development (single process). Set CHANNEL_LAYER_REDIS_URL (e.g. redis://127.0.0.1:6379/0)
+# to share one Redis bus between several Daphne/Uvicorn worker processes. The pub/sub layer
+# is the default; CHANNEL_LAYER_REDIS_BACKEND=core selects the list-based RedisChannelLayer.
+CHANNEL_LAYER_REDIS_URL = os.environ.get('CHANNEL_LAYER_REDIS_URL')
+CHANNEL_LAYER_REDIS_BACKENDS = {
+    'pubsub': 'channels_redis.pubsub.RedisPubSubChannelLayer',
+    'core': 'channels_redis.core.RedisChannelLayer',
 }
+
+if CHANNEL_LAYER_REDIS_URL:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': CHANNEL_LAYER_REDIS_BACKENDS[os.environ.get('CHANNEL_LAYER_REDIS_BACKEND', 'pubsub')],
+            'CONFIG': {
+                'hosts': [CHANNEL_LAYER_REDIS_URL],
+            },
+        },
+    }
+else:
+    CHANNEL_LAYERS = {
+        'default': {
+            'BACKEND': 'channels.layers.InMemoryChannelLayer',
+        },
+    }
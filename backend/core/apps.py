@@ -1,6 +1,72 @@
 from django.apps import AppConfig
+from django.db import connections
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def install_search_index(sender, using, **kwargs):
+    """Recreates the full-text search triggers/index if a migration dropped them"""
+    from services.search_service import TicketSearchService
+
+    connection = connections[using]
+    if 'core_ticket' in connection.introspection.table_names():
+        TicketSearchService.install(connection)
+
+
+def invalidate_ticket_payload(sender, instance, **kwargs):
+    """Drops the pre-rendered JSON of a saved/deleted ticket"""
+    from services.payload_cache import payload_cache
+
+    payload_cache.invalidate(instance.pk)
+
+
+# Columns no ticket payload, ETag or cached JWT user depends on (simplejwt saves last_login on every token obtain)
+UNRENDERED_USER_FIELDS = frozenset({'last_login'})
+
+
+def saves_unrendered_fields(update_fields):
+    """True for a ``save(update_fields=...)`` that only touches ``UNRENDERED_USER_FIELDS``"""
+    return update_fields is not None and set(update_fields) <= UNRENDERED_USER_FIELDS
+
+
+def clear_ticket_payloads(sender, update_fields=None, **kwargs):
+    """User data is nested in every ticket payload, so a user change clears the cache"""
+    from services.payload_cache import payload_cache
+
+    if saves_unrendered_fields(update_fields):
+        return
+    payload_cache.clear()
+
+
+def bump_ticket_version(sender, using, **kwargs):
+    """Changes the ticket table version used by ETag/Last-Modified (once the write commits)"""
+    from services.conditional_service import TicketVersionService
+
+    TicketVersionService.bump(TicketVersionService.TICKETS, using=using)
+
+
+def bump_user_version(sender, using, update_fields=None, **kwargs):
+    """Users are nested in ticket payloads, so their changes also invalidate validators"""
+    from services.conditional_service import TicketVersionService
+
+    if saves_unrendered_fields(update_fields):
+        return
+    TicketVersionService.bump(TicketVersionService.USERS, using=using)
 
 
 class CoreConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'core'
+
+    def ready(self):
+        from . import checks  # noqa: F401  (registers the system checks)
+
+        post_migrate.connect(install_search_index, sender=self)
+        ticket = self.get_model('Ticket')
+        post_save.connect(invalidate_ticket_payload, sender=ticket)
+        post_delete.connect(invalidate_ticket_payload, sender=ticket)
+        post_save.connect(bump_ticket_version, sender=ticket)
+        post_delete.connect(bump_ticket_version, sender=ticket)
+        user = self.get_model('CustomUser')
+        post_save.connect(clear_ticket_payloads, sender=user)
+        post_save.connect(bump_user_version, sender=user)
+        post_delete.connect(bump_user_version, sender=user)
@@ -0,0 +1,28 @@
+from django.conf import settings
+from django.core.cache import caches
+from django.core.checks import Warning, register
+
+# Backends whose data lives in (or never leaves) the current process
+PROCESS_LOCAL_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
+
+@register()
+def shared_cache_check(app_configs, **kwargs):
+    """ETag versions, cached stats and auth user versions must be shared by every worker and command"""
+    backend = type(caches['default'])
+    if settings.DEBUG or f'{backend.__module__}.{backend.__qualname__}' not in PROCESS_LOCAL_CACHES:
+        return []
+    return [
+        Warning(
+            'The default cache is local to each process.',
+            hint=(
+                'Writes from other workers and from management commands (import_tickets, archive_*, '
+                'generate_load_data) will not change the ETags, stats or cached users this process serves. '
+                'Set CACHE_REDIS_URL when more than one process serves or writes tickets.'
+            ),
+            id='core.W001',
+        )
+    ]
@@ -0,0 +1,162 @@
+"""
+Deterministic synthetic data for load tests and benchmarks.
+
+Used by ``manage.py generate_load_data`` and by ``benchmarks.utils.seed_tickets``.
+The same seed always produces the same users and tickets; distributions are
+skewed on purpose (a few busy departments and agents, most tickets closed,
+few urgent ones) so query plans and caches behave like production.
+"""
+
+import random
+from contextlib import contextmanager
+from datetime import timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import CustomUser, Ticket, TicketChangeCounter, TicketStatus
+
+USERNAME_PREFIX = 'load'
+# Every generated user can log in with this password (benchmarks obtain JWTs with it)
+DEFAULT_PASSWORD = 'loadtest'
+
+DEPARTMENTS = ['TI', 'Suporte', 'Financeiro', 'RH', 'Comercial', 'Operações', 'Jurídico', 'Marketing']
+# Zipf-like: the first departments get most of the traffic
+DEPARTMENT_WEIGHTS = [1 / (rank + 1) for rank in range(len(DEPARTMENTS))]
+
+PRIORITY_WEIGHTS = {'low': 35, 'medium': 40, 'high': 18, 'urgent': 7}
+STATUS_WEIGHTS = {
+    TicketStatus.OPEN.value: 25,
+    TicketStatus.IN_PROGRESS.value: 15,
+    TicketStatus.RESOLVED.value: 50,
+    TicketStatus.CANCELLED.value: 10,
+}
+ROLE_WEIGHTS = {'agent': 85, 'technician': 13, 'admin': 2}
+
+# Cumulative weights for random.choices(cum_weights=...) in the per-ticket hot loop
+DEPARTMENT_CUM_WEIGHTS = list(accumulate(DEPARTMENT_WEIGHTS))
+PRIORITIES, PRIORITY_CUM_WEIGHTS = list(PRIORITY_WEIGHTS), list(accumulate(PRIORITY_WEIGHTS.values()))
+STATUSES, STATUS_CUM_WEIGHTS = list(STATUS_WEIGHTS), list(accumulate(STATUS_WEIGHTS.values()))
+
+SUBJECTS = ['Impressora', 'VPN', 'E-mail', 'Notebook', 'Sistema de vendas', 'Folha de pagamento', 'Acesso',
+            'Rede Wi-Fi', 'Telefone', 'Servidor de arquivos', 'Licença', 'Monitor', 'ERP', 'Backup']
+PROBLEMS = ['não funciona', 'está lento', 'apresenta erro', 'precisa de configuração', 'sem acesso',
+            'travando', 'solicitação de instalação', 'fora do ar']
+DETAILS = ['Aconteceu após a atualização de ontem.', 'O problema afeta toda a equipe.',
+           'Já reiniciei o equipamento e continua igual.', 'Preciso disso para a reunião de hoje.',
+           'A mensagem de erro aparece ao abrir o programa.', 'Ocorre apenas no período da tarde.',
+           'Segue em anexo o print da tela.', 'Outros colegas relatam o mesmo.']
+
+
+@contextmanager
+def manual_timestamps(model, *names):
+    """Lets ``bulk_create`` keep explicit values for ``auto_now``/``auto_now_add`` fields"""
+    fields = [model._meta.get_field(name) for name in names]
+    saved = [(field.auto_now, field.auto_now_add) for field in fields]
+    for field in fields:
+        field.auto_now = field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field, (auto_now, auto_now_add) in zip(fields, saved):
+            field.auto_now, field.auto_now_add = auto_now, auto_now_add
+
+
+class LoadDataGenerator:
+    """Generates users and tickets with ``bulk_create`` in batches"""
+
+    def __init__(self, seed=42, days=365, deleted_ratio=0.01, batch_size=5000):
+        self.seed = seed
+        self.days = days
+        self.deleted_ratio = deleted_ratio
+        self.batch_size = batch_size
+
+    def ensure_users(self, count):
+        """Creates the missing ``load*`` users (reuses existing ones); returns them ordered by id"""
+        existing = list(CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id'))
+        if len(existing) >= count:
+            return existing
+        rng = random.Random(f'{self.seed}:users')
+        roles = rng.choices(list(ROLE_WEIGHTS), weights=list(ROLE_WEIGHTS.values()), k=count)
+        password = make_password(DEFAULT_PASSWORD)  # hashed once, shared by every user
+        new_users = []
+        for i in range(len(existing), count):
+            new_users.append(CustomUser(
+                username=f'{USERNAME_PREFIX}{i}',
+                email=f'{USERNAME_PREFIX}{i}@example.com',
+                first_name='Load',
+                last_name=str(i),
+                password=password,
+                # The first users are always one of each role, so every view can be exercised
+                role=['admin', 'technician', 'agent'][i] if i < 3 else roles[i],
+                department=rng.choices(DEPARTMENTS, weights=DEPARTMENT_WEIGHTS)[0],
+            ))
+        CustomUser.objects.bulk_create(new_users, batch_size=self.batch_size)
+        return list(CustomUser.objects.filter(username__startswith=USERNAME_PREFIX).order_by('id'))
+
+    def generate(self, tickets, users=50, progress=None):
+        """
+        Inserts ``tickets`` tickets created by ``users`` load users
+
+        Calling it again appends more tickets (the seed is combined with the
+        current ticket count, so the continuation is deterministic too).
+
+        Returns:
+            int: Tickets inserted
+        """
+        people = self.ensure_users(users)
+        creators = [user for user in people if user.role == 'agent'] or people
+        assignees = [user for user in people if user.role in ('technician', 'admin')] or people
+        # Busy agents: creator weight decays with rank (cumulative weights are precomputed once)
+        creator_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(creators))))
+
+        start = Ticket.all_objects.count()
+        rng = random.Random(f'{self.seed}:tickets:{start}')
+        now = timezone.now()
+        inserted = 0
+        with manual_timestamps(Ticket, 'created_at', 'updated_at'):
+            while inserted < tickets:
+                size = min(self.batch_size, tickets - inserted)
+                batch = [
+                    self._ticket(rng, start + inserted + i, now, creators, creator_weights, assignees)
+                    for i in range(size)
+                ]
+                with transaction.atomic():
+                    change_seq = TicketChangeCounter.next_value()
+                    for ticket in batch:
+                        ticket.change_seq = change_seq
+                    Ticket.all_objects.bulk_create(batch)
+                inserted += size
+                if progress is not None:
+                    progress(inserted)
+        return inserted
+
+    def _ticket(self, rng, number, now, creators, creator_weights, assignees):
+        creator = rng.choices(creators, cum_weights=creator_weights)[0]
+        status = rng.choices(STATUSES, cum_weights=STATUS_CUM_WEIGHTS)[0]
+        # Recent tickets are more frequent (triangular distribution peaking at "now")
+        created_at = now - timedelta(days=rng.triangular(0, self.days, 0))
+        updated_at = min(now, created_at + timedelta(hours=rng.expovariate(1 / 36)))
+        if status == TicketStatus.OPEN.value:
+            assigned_to = rng.choice(assignees) if rng.random() < 0.3 else None
+        else:
+            assigned_to = rng.choice(assignees)
+        subject = rng.choice(SUBJECTS)
+        return Ticket(
+            title=f'{subject} {rng.choice(PROBLEMS)} (#{number})',
+            description=' '.join(rng.sample(DETAILS, k=rng.randint(1, 4))),
+            priority=rng.choices(PRIORITIES, cum_weights=PRIORITY_CUM_WEIGHTS)[0],
+            # Mostly the creator's own department
+            department=(
+                creator.department if creator.department and rng.random() < 0.8
+                else rng.choices(DEPARTMENTS, cum_weights=DEPARTMENT_CUM_WEIGHTS)[0]
+            ),
+            status=status,
+            created_by=creator,
+            assigned_to=assigned_to,
+            created_at=created_at,
+            updated_at=updated_at,
+            deleted_at=updated_at if rng.random() < self.deleted_ratio else None,
+        )
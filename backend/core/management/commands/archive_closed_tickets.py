@@ -0,0 +1,43 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Ticket, TicketArchive, TicketStatus
+
+
+class Command(BaseCommand):
+    help = 'Moves resolved/cancelled tickets closed more than N days ago into the archive table, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'TICKET_ARCHIVE_CLOSED_AFTER_DAYS', 180),
+            help='Archive closed tickets not changed for at least this many days',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the tickets that would be archived')
+
+    def handle(self, *args, **options):
+        # Imported here so the command does not load the services stack at startup
+        from services.archive_service import TicketArchiveService
+
+        if options['days'] < 0 or options['batch_size'] <= 0:
+            raise CommandError('--days must be >= 0 and --batch-size > 0')
+
+        # Closed tickets never change again, so updated_at is when they were closed
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        queryset = Ticket.objects.filter(status__in=TicketStatus.get_non_editable_statuses(), updated_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} ticket(s) closed before {cutoff:%Y-%m-%d %H:%M} would be archived.')
+            return
+
+        moved = TicketArchiveService.archive(
+            queryset,
+            TicketArchive.REASON_CLOSED,
+            batch_size=options['batch_size'],
+            progress=lambda total: self.stdout.write(f'  {total} archived...'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{moved} ticket(s) archived.'))
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from core.models import Ticket, TicketArchive
+
+
+class Command(BaseCommand):
+    help = 'Moves tickets soft-deleted more than N days ago into the archive table, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=getattr(settings, 'TICKET_ARCHIVE_DELETED_AFTER_DAYS', 30),
+            help='Archive tickets deleted at least this many days ago',
+        )
+        parser.add_argument('--batch-size', type=int, default=1000, help='Rows moved per transaction')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the tickets that would be archived')
+
+    def handle(self, *args, **options):
+        # Imported here so the command does not load the services stack at startup
+        from services.archive_service import TicketArchiveService
+
+        if options['days'] < 0 or options['batch_size'] <= 0:
+            raise CommandError('--days must be >= 0 and --batch-size > 0')
+
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        queryset = Ticket.all_objects.filter(deleted_at__lt=cutoff)
+        if options['dry_run']:
+            self.stdout.write(f'{queryset.count()} ticket(s) deleted before {cutoff:%Y-%m-%d %H:%M} would be archived.')
+            return
+
+        moved = TicketArchiveService.archive(
+            queryset,
+            TicketArchive.REASON_DELETED,
+            batch_size=options['batch_size'],
+            progress=lambda total: self.stdout.write(f'  {total} archived...'),
+        )
+        self.stdout.write(self.style.SUCCESS(f'{moved} ticket(s) archived.'))
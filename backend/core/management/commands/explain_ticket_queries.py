@@ -0,0 +1,76 @@
+from itertools import combinations
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from core.models import Ticket, TicketStatus
+
+# Plan fragments that mean "full table scan" per backend
+FULL_SCAN_MARKERS = {
+    'sqlite': ('SCAN core_ticket\n',),
+    'postgresql': ('Seq Scan on core_ticket',),
+}
+
+
+class Command(BaseCommand):
+    help = 'Prints EXPLAIN plans for the filter/ordering combinations used by the ticket endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--ordering', action='append', help='Only explain these orderings (e.g. -created_at)')
+        parser.add_argument('--fail-on-scan', action='store_true', help='Exit with an error if any plan does a full table scan')
+        parser.add_argument('--quiet', action='store_true', help='Only print the plans that were flagged')
+
+    def handle(self, *args, **options):
+        # Imported here so the command does not load the API stack at startup
+        from api.v1.views import TicketViewSet
+
+        sample = {
+            'status': TicketStatus.OPEN.value,
+            'priority': Ticket.PRIORITY_CHOICES[-1][0],
+            'department': Ticket.objects.values_list('department', flat=True).first() or 'TI',
+        }
+        orderings = options['ordering'] or [
+            prefix + field for field in TicketViewSet.ordering_fields for prefix in ('-', '')
+        ]
+        page_size = settings.TICKET_PAGINATION['PAGE_SIZE']
+        markers = FULL_SCAN_MARKERS.get(connection.vendor, ())
+
+        flagged = []
+        for label, queryset in self._shapes(TicketViewSet.filterset_fields, sample, orderings):
+            plan = queryset[:page_size].explain()
+            warnings = [marker.strip() for marker in markers if marker in f'{plan}\n']
+            if warnings:
+                flagged.append(label)
+            if warnings or not options['quiet']:
+                style = self.style.WARNING if warnings else self.style.SUCCESS
+                self.stdout.write(style(f'== {label}' + (f'  [{", ".join(warnings)}]' if warnings else '')))
+                self.stdout.write(plan)
+                self.stdout.write('')
+
+        self.stdout.write(f'{len(flagged)} plan(s) flagged on {connection.vendor}.')
+        if flagged and options['fail_on_scan']:
+            raise CommandError('Full table scans found in: ' + '; '.join(flagged))
+
+    def _shapes(self, filter_fields, sample, orderings):
+        """Yields (label, queryset) for every filter subset x ordering, plus the per-user lookups"""
+        base = Ticket.objects.select_related('created_by', 'assigned_to')
+        for size in range(len(filter_fields) + 1):
+            for fields in combinations(filter_fields, size):
+                filters = {field: sample[field] for field in fields}
+                for ordering in orderings:
+                    id_ordering = '-id' if ordering.startswith('-') else 'id'
+                    label = f'filter({", ".join(fields) or "-"}) order_by({ordering}, {id_ordering})'
+                    yield label, base.filter(**filters).order_by(ordering, id_ordering)
+
+        user_id = Ticket.objects.values_list('created_by_id', flat=True).first() or 0
+        for field in ('created_by', 'assigned_to'):
+            yield (
+                f'filter({field}, status) order_by(-created_at)',
+                base.filter(**{field: user_id, 'status': sample['status']}).order_by('-created_at'),
+            )
+        yield (
+            'open live tickets order_by(-created_at, -id)',
+            base.filter(deleted_at__isnull=True, status__in=[TicketStatus.OPEN.value, TicketStatus.IN_PROGRESS.value])
+            .order_by('-created_at', '-id'),
+        )
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from core.load_data import DEFAULT_PASSWORD, USERNAME_PREFIX, LoadDataGenerator
+
+
+class Command(BaseCommand):
+    help = 'Generates deterministic, realistically skewed users and tickets for load tests and benchmarks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--tickets', type=int, default=10000, help='Tickets to add')
+        parser.add_argument('--users', type=int, default=50, help='Load users to have (existing ones are reused)')
+        parser.add_argument('--seed', type=int, default=42, help='Random seed (same seed, same data)')
+        parser.add_argument('--days', type=int, default=365, help='Spread created_at over this many days')
+        parser.add_argument('--deleted-ratio', type=float, default=0.01, help='Fraction of soft-deleted tickets')
+        parser.add_argument('--batch-size', type=int, default=5000, help='Rows per bulk_create/transaction')
+
+    def handle(self, *args, **options):
+        # Imported here so the command does not load the services stack at startup
+        from services import TicketVersionService, stats_service
+
+        if options['tickets'] < 0 or options['users'] <= 0 or options['batch_size'] <= 0:
+            raise CommandError('--tickets must be >= 0, --users and --batch-size > 0')
+
+        generator = LoadDataGenerator(
+            seed=options['seed'],
+            days=options['days'],
+            deleted_ratio=options['deleted_ratio'],
+            batch_size=options['batch_size'],
+        )
+        started = time.perf_counter()
+
+        def progress(inserted):
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f'  {inserted}/{options["tickets"]} tickets ({inserted / elapsed:,.0f}/s)')
+
+        inserted = generator.generate(options['tickets'], users=options['users'], progress=progress)
+        # bulk_create skips signals: refresh the derived caches once
+        TicketVersionService.bump(TicketVersionService.TICKETS)
+        TicketVersionService.bump(TicketVersionService.USERS)
+        stats_service.invalidate()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{inserted} ticket(s) generated in {time.perf_counter() - started:.1f}s. '
+            f'Users: {USERNAME_PREFIX}0..{USERNAME_PREFIX}{options["users"] - 1}@example.com '
+            f'(password "{DEFAULT_PASSWORD}").'
+        ))
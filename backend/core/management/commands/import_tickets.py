@@ -0,0 +1,51 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+
+class Command(BaseCommand):
+    help = 'Bulk imports tickets from a CSV or NDJSON file (same columns as the export endpoint)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='File to import, or - for stdin')
+        parser.add_argument('--format', choices=['csv', 'ndjson'], help='Defaults to the file extension')
+        parser.add_argument('--batch-size', type=int, help='Tickets per bulk_create/transaction')
+        parser.add_argument('--created-by', help='Email of the creator for rows without created_by_email')
+        parser.add_argument('--dry-run', action='store_true', help='Only validate the rows')
+
+    def handle(self, *args, **options):
+        # Imported here so the command does not load the services stack at startup
+        from core.models import CustomUser
+        from services.import_service import TicketImportService
+
+        path = options['path']
+        file_format = options['format'] or ('ndjson' if path.endswith(('.ndjson', '.jsonl')) else 'csv')
+        default_user = None
+        if options['created_by']:
+            default_user = CustomUser.objects.filter(email=options['created_by']).first()
+            if default_user is None:
+                raise CommandError(f'Unknown user {options["created_by"]}')
+
+        def progress(result):
+            self.stdout.write(f'  {result.imported} imported, {result.skipped} skipped...')
+
+        stream = sys.stdin if path == '-' else open(path, encoding='utf-8', newline='')
+        try:
+            result = TicketImportService.run(
+                stream,
+                file_format,
+                default_user=default_user,
+                batch_size=options['batch_size'],
+                dry_run=options['dry_run'],
+                progress=progress,
+            )
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result.errors:
+            self.stderr.write(f'line {error["line"]}: {error["errors"]}')
+        verb = 'validated' if options['dry_run'] else 'imported'
+        if result.error:
+            raise CommandError(f'{result.error} {result.imported} ticket(s) {verb}, {result.skipped} skipped.')
+        self.stdout.write(self.style.SUCCESS(f'{result.imported} ticket(s) {verb}, {result.skipped} skipped.'))
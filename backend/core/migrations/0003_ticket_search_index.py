@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def install_search_index(apps, schema_editor):
+    from services.search_service import TicketSearchService
+
+    TicketSearchService.install(schema_editor.connection)
+
+
+def uninstall_search_index(apps, schema_editor):
+    from services.search_service import TicketSearchService
+
+    TicketSearchService.get_backend(schema_editor.connection).uninstall(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_ticket_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(install_search_index, uninstall_search_index),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:19
+
+from django.db import migrations, models
+
+
+def seed_change_sequence(apps, schema_editor):
+    """Existing tickets get their id as sequence, the counter starts after them"""
+    Ticket = apps.get_model('core', 'Ticket')
+    TicketChangeCounter = apps.get_model('core', 'TicketChangeCounter')
+    Ticket.objects.update(change_seq=models.F('id'))
+    current = Ticket.objects.aggregate(models.Max('change_seq'))['change_seq__max']
+    TicketChangeCounter.objects.create(pk=1, value=current or 0)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_ticket_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketChangeCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('value', models.BigIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='ticket',
+            name='change_seq',
+            field=models.BigIntegerField(default=0, editable=False, verbose_name='Change Sequence'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(fields=['change_seq', 'id'], name='ticket_change_seq_idx'),
+        ),
+        migrations.RunPython(seed_change_sequence, migrations.RunPython.noop),
+    ]
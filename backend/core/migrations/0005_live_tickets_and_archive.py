@@ -0,0 +1,61 @@
+# Generated by Django 5.2.6 on 2026-10-18 10:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_ticket_change_seq'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TicketArchive',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('title', models.CharField(max_length=200)),
+                ('description', models.TextField()),
+                ('priority', models.CharField(choices=[('low', 'Baixa'), ('medium', 'Média'), ('high', 'Alta'), ('urgent', 'Urgente')], max_length=10)),
+                ('department', models.CharField(max_length=20)),
+                ('status', models.CharField(choices=[('open', 'Open'), ('in_progress', 'In Progress'), ('resolved', 'Resolved'), ('cancelled', 'Cancelled')], max_length=20)),
+                ('created_by_id', models.BigIntegerField()),
+                ('assigned_to_id', models.BigIntegerField(blank=True, null=True)),
+                ('updated_by_id', models.BigIntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField()),
+                ('updated_at', models.DateTimeField()),
+                ('deleted_at', models.DateTimeField(blank=True, null=True)),
+                ('change_seq', models.BigIntegerField(default=0)),
+                ('reason', models.CharField(choices=[('deleted', 'Soft deleted')], max_length=20)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Archived ticket',
+                'verbose_name_plural': 'Archived tickets',
+            },
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_created_id_idx',
+        ),
+        migrations.RemoveIndex(
+            model_name='ticket',
+            name='ticket_updated_id_idx',
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['created_at', 'id'], name='ticket_live_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['updated_at', 'id'], name='ticket_live_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', False)), fields=['deleted_at'], name='ticket_deleted_at_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='ticketarchive',
+            index=models.Index(fields=['created_at', 'id'], name='ticket_archive_created_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_live_tickets_and_archive'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        # The user id columns become unconstrained foreign keys (same column names), so
+        # archived rows can be joined like live tickets without touching the data
+        migrations.SeparateDatabaseAndState(
+            database_operations=[
+                migrations.AlterField(
+                    model_name='ticketarchive',
+                    name='created_by_id',
+                    field=models.BigIntegerField(null=True),
+                ),
+            ],
+            state_operations=[
+                migrations.RemoveField(
+                    model_name='ticketarchive',
+                    name='assigned_to_id',
+                ),
+                migrations.RemoveField(
+                    model_name='ticketarchive',
+                    name='created_by_id',
+                ),
+                migrations.AddField(
+                    model_name='ticketarchive',
+                    name='assigned_to',
+                    field=models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+                ),
+                migrations.AddField(
+                    model_name='ticketarchive',
+                    name='created_by',
+                    field=models.ForeignKey(db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name='+', to=settings.AUTH_USER_MODEL),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name='ticketarchive',
+            name='reason',
+            field=models.CharField(choices=[('deleted', 'Soft deleted'), ('closed', 'Closed')], max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='ticketarchive',
+            index=models.Index(fields=['status', 'created_at', 'id'], name='ticket_archive_status_idx'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.6 on 2026-10-18 11:57
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_archive_closed_tickets'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='ticket',
+            index=models.Index(condition=models.Q(('deleted_at__isnull', True)), fields=['priority', 'id'], name='ticket_live_priority_idx'),
+        ),
+    ]
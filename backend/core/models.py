@@ -1,4 +1,4 @@
-from django.db import models
+from django.db import models, router, transaction
 from django.contrib.auth.models import AbstractUser
 from enum import Enum
 from django.utils.translation import gettext_lazy as _
@@ -83,6 +83,42 @@ class BaseModel(models.Model):
         abstract = True
 
 
+class TicketChangeCounter(models.Model):
+    """Single-row counter that hands out ``Ticket.change_seq`` values"""
+
+    value = models.BigIntegerField(default=0)
+
+    @classmethod
+    def next_value(cls, using=None):
+        """
+        Reserves the next change sequence number.
+
+        Call it inside the transaction that writes the ticket: the counter row
+        stays locked until commit, so sequence order matches commit order and a
+        reader holding a cursor never misses a later-committed lower value.
+        """
+        manager = cls.objects.db_manager(using)
+        if not manager.filter(pk=1).update(value=models.F('value') + 1):
+            current = Ticket.all_objects.db_manager(using).aggregate(models.Max('change_seq'))['change_seq__max']
+            manager.create(pk=1, value=(current or 0) + 1)
+        return manager.values_list('value', flat=True).get(pk=1)
+
+
+class LiveTicketQuerySet(models.QuerySet):
+    def live(self):
+        return self.filter(deleted_at__isnull=True)
+
+    def deleted(self):
+        return self.filter(deleted_at__isnull=False)
+
+
+class LiveTicketManager(models.Manager.from_queryset(LiveTicketQuerySet)):
+    """Default ticket manager: hides soft-deleted rows (served by the ``deleted_at IS NULL`` partial indexes)"""
+
+    def get_queryset(self):
+        return super().get_queryset().live()
+
+
 class Ticket(BaseModel):
     PRIORITY_CHOICES = [
         ('low', _('Baixa')),
@@ -109,8 +145,113 @@ class Ticket(BaseModel):
         related_name='assigned_tickets',
         verbose_name='Assigned To',
     )
+    # Bumped on every write (create, update, resolve, soft delete); drives the changes feed
+    change_seq = models.BigIntegerField(default=0, editable=False, verbose_name='Change Sequence')
+
+    # ``objects`` skips soft-deleted tickets; ``all_objects`` sees every row (changes feed, archival)
+    objects = LiveTicketManager()
+    all_objects = LiveTicketQuerySet.as_manager()
 
     class Meta:
         ordering = ['-created_at']
         verbose_name = 'Ticket'
         verbose_name_plural = 'Tickets'
+        indexes = [
+            # Keyset pagination keys for every ordering exposed by the API (live rows only)
+            models.Index(
+                fields=['created_at', 'id'], name='ticket_live_created_idx', condition=models.Q(deleted_at__isnull=True)
+            ),
+            models.Index(
+                fields=['updated_at', 'id'], name='ticket_live_updated_idx', condition=models.Q(deleted_at__isnull=True)
+            ),
+            models.Index(
+                fields=['priority', 'id'], name='ticket_live_priority_idx', condition=models.Q(deleted_at__isnull=True)
+            ),
+            models.Index(fields=['change_seq', 'id'], name='ticket_change_seq_idx'),
+            # Filter + default ordering access paths
+            models.Index(fields=['status', '-created_at'], name='ticket_status_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='ticket_priority_created_idx'),
+            models.Index(fields=['department', 'status'], name='ticket_dept_status_idx'),
+            models.Index(fields=['assigned_to', 'status'], name='ticket_assignee_status_idx'),
+            models.Index(fields=['created_by', 'status'], name='ticket_creator_status_idx'),
+            # Working set: open, not soft-deleted tickets
+            models.Index(
+                fields=['created_at', 'id'],
+                name='ticket_open_live_idx',
+                condition=models.Q(deleted_at__isnull=True, status__in=['open', 'in_progress']),
+            ),
+            models.Index(
+                fields=['status', 'priority'],
+                name='ticket_live_status_prio_idx',
+                condition=models.Q(deleted_at__isnull=True),
+            ),
+            # Soft-deleted rows waiting for archival
+            models.Index(
+                fields=['deleted_at'], name='ticket_deleted_at_idx', condition=models.Q(deleted_at__isnull=False)
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Routing columns as loaded, so an update also notifies the groups the ticket leaves
+        instance.loaded_routing = (instance.__dict__.get('department'), instance.__dict__.get('assigned_to_id'))
+        return instance
+
+    def save(self, *args, **kwargs):
+        using = kwargs.get('using') or router.db_for_write(type(self), instance=self)
+        with transaction.atomic(using=using):
+            self.change_seq = TicketChangeCounter.next_value(using)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'change_seq'}
+            super().save(*args, **kwargs)
+
+
+class TicketArchive(models.Model):
+    """
+    Cold storage for tickets moved out of ``core_ticket``.
+
+    Keeps the original id and columns. The user columns are foreign keys
+    without database constraints: archived rows can be joined and rendered like
+    live tickets but never block (or follow) a user deletion. Filled in
+    batches by the archival management commands.
+    """
+
+    REASON_DELETED = 'deleted'
+    REASON_CLOSED = 'closed'
+    REASON_CHOICES = [(REASON_DELETED, 'Soft deleted'), (REASON_CLOSED, 'Closed')]
+
+    id = models.BigIntegerField(primary_key=True)
+    title = models.CharField(max_length=200)
+    description = models.TextField()
+    priority = models.CharField(max_length=10, choices=Ticket.PRIORITY_CHOICES)
+    department = models.CharField(max_length=20)
+    status = models.CharField(max_length=20, choices=TicketStatus.get_choices())
+    created_by = models.ForeignKey(
+        CustomUser, on_delete=models.DO_NOTHING, null=True, db_constraint=False, db_index=False, related_name='+'
+    )
+    assigned_to = models.ForeignKey(
+        CustomUser, on_delete=models.DO_NOTHING, null=True, blank=True, db_constraint=False, db_index=False,
+        related_name='+',
+    )
+    updated_by_id = models.BigIntegerField(null=True, blank=True)
+    created_at = models.DateTimeField()
+    updated_at = models.DateTimeField()
+    deleted_at = models.DateTimeField(null=True, blank=True)
+    change_seq = models.BigIntegerField(default=0)
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        verbose_name = 'Archived ticket'
+        verbose_name_plural = 'Archived tickets'
+        indexes = [
+            models.Index(fields=['created_at', 'id'], name='ticket_archive_created_idx'),
+            models.Index(fields=['status', 'created_at', 'id'], name='ticket_archive_status_idx'),
+        ]
+
+    # Columns copied verbatim from ``Ticket``
+    COPIED_FIELDS = (
+        'id', 'title', 'description', 'priority', 'department', 'status', 'created_by_id', 'assigned_to_id',
+        'updated_by_id', 'created_at', 'updated_at', 'deleted_at', 'change_seq',
+    )
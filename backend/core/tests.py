@@ -1,3 +1,65 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
 from django.test import TestCase
+from django.utils import timezone
+
+from core.models import CustomUser, Ticket, TicketArchive
+
+
+class SoftDeleteTests(TestCase):
+    def setUp(self):
+        self.agent = CustomUser.objects.create_user(
+            username='agent', email='agent@example.com', password='123', role='agent', department='TI'
+        )
+        self.tickets = [
+            Ticket.objects.create(title=f'Ticket {i}', description='...', department='TI', created_by=self.agent)
+            for i in range(4)
+        ]
+
+    def test_default_manager_hides_soft_deleted_tickets(self):
+        Ticket.objects.filter(pk=self.tickets[0].pk).update(deleted_at=timezone.now())
+        self.assertEqual(Ticket.objects.count(), 3)
+        self.assertEqual(Ticket.all_objects.count(), 4)
+        self.assertEqual(list(Ticket.all_objects.deleted()), [self.tickets[0]])
+        self.assertFalse(Ticket.objects.filter(pk=self.tickets[0].pk).exists())
+
+    def test_archive_command_moves_old_deleted_rows_in_batches(self):
+        Ticket.objects.filter(pk__in=[ticket.pk for ticket in self.tickets[:3]]).update(deleted_at=timezone.now())
+        old = timezone.now() - timedelta(days=40)
+        Ticket.all_objects.filter(pk__in=[self.tickets[0].pk, self.tickets[1].pk]).update(deleted_at=old)
+
+        out = StringIO()
+        call_command('archive_deleted_tickets', '--days', '30', '--batch-size', '1', stdout=out)
+        self.assertIn('2 ticket(s) archived', out.getvalue())
+        self.assertEqual(
+            sorted(TicketArchive.objects.values_list('id', flat=True)), [self.tickets[0].pk, self.tickets[1].pk]
+        )
+        archived = TicketArchive.objects.get(pk=self.tickets[0].pk)
+        self.assertEqual((archived.title, archived.reason), ('Ticket 0', TicketArchive.REASON_DELETED))
+        # Recently deleted and live tickets stay in the main table
+        self.assertEqual(Ticket.all_objects.count(), 2)
+        self.assertEqual(Ticket.objects.count(), 1)
+
+
+class GenerateLoadDataTests(TestCase):
+    def snapshot(self):
+        return list(
+            Ticket.all_objects.order_by('id').values_list(
+                'title', 'priority', 'status', 'department', 'created_by__username', 'assigned_to__username'
+            )
+        )
+
+    def test_same_seed_generates_the_same_data(self):
+        call_command('generate_load_data', '--tickets', '60', '--users', '8', '--batch-size', '25', stdout=StringIO())
+        first = self.snapshot()
+        self.assertEqual(len(first), 60)
+        self.assertEqual(CustomUser.objects.filter(username__startswith='load').count(), 8)
+        self.assertTrue(CustomUser.objects.get(username='load0').check_password('loadtest'))
 
-# Create your tests here.
+        Ticket.all_objects.all().delete()
+        call_command('generate_load_data', '--tickets', '60', '--users', '8', stdout=StringIO())
+        self.assertEqual(self.snapshot(), first)
+        # Explicit timestamps survive bulk_create
+        self.assertGreater(Ticket.all_objects.dates('created_at', 'day').count(), 1)
@@ -3,11 +3,14 @@ import logging
 from django.shortcuts import render, redirect
 from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
+from django.conf import settings
 from django.contrib import messages
 from django.core.paginator import Paginator
+from django.utils import translation
 from django.utils.translation import gettext as _
 
-from services import websocket_service
+from services import TicketVersionService, archive_service, search_service, stats_service, websocket_service
+from services.conditional_service import make_etag, not_modified, set_validators
 from services.permissions import require_roles_or_redirect, require_roles_view
 from services.roles import AGENT_ROLES
 from core.models import Ticket, TicketStatus
@@ -63,14 +66,13 @@ def dashboard_view(request):
     if priority_filter:
         tickets = tickets.filter(priority=priority_filter)
     if search_query:
-        # Busca por título ou ID
-        from django.db.models import Q
-        tickets = tickets.filter(
-            Q(title__icontains=search_query) | 
-            Q(id__icontains=search_query)
-        )
+        # Busca full-text por título/descrição (ou ID exato), ordenada por relevância
+        tickets = search_service.search(tickets, search_query)
+    else:
+        # The id tie breaker keeps offset pages stable for equal created_at
+        tickets = tickets.order_by('-created_at', '-id')
     # Pagination
-    paginator = Paginator(tickets, 10)  # 10 tickets per page
+    paginator = Paginator(tickets, settings.TICKET_PAGINATION['DASHBOARD_PAGE_SIZE'])
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
     # Get choices for filters
@@ -99,13 +101,29 @@ def ticket_detail_view(request, ticket_id):
     try:
         ticket = Ticket.objects.get(id=ticket_id)
     except Ticket.DoesNotExist:
-        messages.error(request, 'Ticket not found.')
-        return redirect('front:dashboard')
+        # Closed tickets moved to the archive tier are still shown (read only)
+        ticket = archive_service.get_closed(ticket_id)
+        if ticket is None:
+            messages.error(request, 'Ticket not found.')
+            return redirect('front:dashboard')
+
+    # The page also depends on the viewer (layout, CSRF token); pending flash messages always render
+    user_token, user_modified = TicketVersionService.get(TicketVersionService.USERS)
+    etag = make_etag(
+        'ticket-page', ticket.pk, ticket.updated_at, user_token, request.user.pk,
+        translation.get_language(), request.COOKIES.get(settings.CSRF_COOKIE_NAME, ''),
+    )
+    last_modified = max(ticket.updated_at, user_modified)
+    if not messages.get_messages(request):
+        response = not_modified(request, etag, last_modified)
+        if response is not None:
+            return response
+
     context = {
         'ticket': ticket,
         'non_editable_statuses': TicketStatus.get_non_editable_statuses(),
     }
-    return render(request, 'front/ticket_detail.html', context)
+    return set_validators(render(request, 'front/ticket_detail.html', context), etag, last_modified)
 
 
 @login_required
@@ -137,6 +155,7 @@ def create_ticket_view(request):
                 department=department,
                 created_by=request.user,
             )
+            stats_service.record_created(ticket)
             websocket_service.send_ticket_created(ticket)
             messages.success(request, f'Ticket #{ticket.id} created successfully!')
             return redirect('front:ticket_detail', ticket_id=ticket.id)
@@ -190,6 +209,7 @@ def edit_ticket_view(request, ticket_id):
 
         try:
             # Update ticket
+            before = stats_service.snapshot(ticket)
             ticket.title = title
             ticket.description = description
             ticket.priority = priority
@@ -197,6 +217,7 @@ def edit_ticket_view(request, ticket_id):
             ticket.department = department
             ticket.updated_by = request.user
             ticket.save()
+            stats_service.record_changed(before, ticket)
 
             messages.success(request, _('Ticket #%(id)s updated successfully!') % {'id': ticket.id})
             return redirect('front:ticket_detail', ticket_id=ticket.id)
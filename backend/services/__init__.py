@@ -1,13 +1,51 @@
+from .archive_service import TicketArchiveService
+from .changes_service import InvalidChangeCursor, TicketChangesService
+from .conditional_service import TicketVersionService
+from .payload_cache import TicketPayloadCache, payload_cache
+from .notification_dispatcher import NotificationDispatcher, dispatcher as notification_dispatcher
 from .websocket_service import WebSocketNotificationService
 from .notification_service import NotificationService
+from .import_service import TicketImportResult, TicketImportService
+from .search_service import TicketSearchService
+from .stats_service import TicketStatsService
+from .ticket_bulk_service import TicketBulkError, TicketBulkService
+from .user_cache import AuthUserCache, auth_user_cache
 
 # Instâncias globais dos serviços
 websocket_service = WebSocketNotificationService()
 notification_service = NotificationService()
+stats_service = TicketStatsService()
+search_service = TicketSearchService()
+bulk_service = TicketBulkService()
+changes_service = TicketChangesService()
+archive_service = TicketArchiveService()
+import_service = TicketImportService()
 
 __all__ = [
+    'InvalidChangeCursor',
+    'TicketArchiveService',
+    'NotificationDispatcher',
+    'TicketChangesService',
+    'TicketVersionService',
+    'TicketPayloadCache',
+    'payload_cache',
+    'AuthUserCache',
+    'auth_user_cache',
+    'notification_dispatcher',
     'WebSocketNotificationService',
     'NotificationService',
+    'TicketStatsService',
+    'TicketSearchService',
+    'TicketImportResult',
+    'TicketImportService',
+    'TicketBulkError',
+    'TicketBulkService',
     'websocket_service',
-    'notification_service'
+    'notification_service',
+    'stats_service',
+    'search_service',
+    'bulk_service',
+    'changes_service',
+    'archive_service',
+    'import_service',
 ]
@@ -0,0 +1,62 @@
+from django.db import transaction
+
+from core.models import Ticket, TicketArchive, TicketStatus
+
+
+class TicketArchiveService:
+    """
+    Serviço de arquivamento de tickets.
+
+    Dois níveis: ``core_ticket`` (quente) e ``TicketArchive`` (frio), que
+    recebe tickets apagados há muito tempo e tickets fechados (resolvidos ou
+    cancelados, que nunca mais mudam) antigos. Move linhas de ``core_ticket``
+    para ``TicketArchive`` em lotes: cada lote copia as colunas com
+    ``bulk_create`` e remove os originais na mesma transação, então a tabela
+    principal (e seus índices) só guarda o que as telas ainda consultam.
+    Transações curtas por lote evitam travar a tabela.
+    """
+
+    @classmethod
+    def archive(cls, queryset, reason, batch_size=1000, progress=None):
+        """
+        Arquiva todas as linhas de ``queryset`` (um queryset de ``Ticket.all_objects``)
+
+        Args:
+            queryset: Tickets a arquivar (avaliado de novo a cada lote)
+            reason (str): Motivo gravado no arquivo (``TicketArchive.REASON_*``)
+            batch_size (int): Linhas por transação
+            progress (callable): Opcional, chamado com o total movido após cada lote
+
+        Returns:
+            int: Quantidade de tickets arquivados
+        """
+        moved = 0
+        while True:
+            with transaction.atomic():
+                rows = list(queryset.order_by('id').values(*TicketArchive.COPIED_FIELDS)[:batch_size])
+                if not rows:
+                    break
+                TicketArchive.objects.bulk_create(TicketArchive(reason=reason, **row) for row in rows)
+                Ticket.all_objects.filter(pk__in=[row['id'] for row in rows]).delete()
+            moved += len(rows)
+            if progress is not None:
+                progress(moved)
+        return moved
+
+    @staticmethod
+    def closed_queryset():
+        """Tickets fechados que ainda podem ser lidos pela API (no arquivo)"""
+        return TicketArchive.objects.filter(reason=TicketArchive.REASON_CLOSED)
+
+    @classmethod
+    def get_closed(cls, pk):
+        """Ticket fechado arquivado com ``pk`` (com os usuários já carregados) ou None"""
+        try:
+            return cls.closed_queryset().select_related('created_by', 'assigned_to').filter(pk=pk).first()
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def wants_closed(status):
+        """True quando o filtro de status pede explicitamente tickets fechados"""
+        return status in TicketStatus.get_non_editable_statuses()
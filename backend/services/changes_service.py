@@ -0,0 +1,58 @@
+import re
+
+from django.db.models import Q
+
+from core.models import Ticket
+
+
+class InvalidChangeCursor(ValueError):
+    """Cursor do feed de alterações malformado"""
+
+
+class TicketChangesService:
+    """
+    Feed incremental de alterações de tickets.
+
+    Toda escrita grava ``Ticket.change_seq`` (ver ``TicketChangeCounter``); o
+    feed devolve as linhas com ``(change_seq, id)`` maior que o cursor, em
+    ordem, usando o índice ``ticket_change_seq_idx``. Tickets com
+    ``deleted_at`` preenchido entram como tombstones. O cursor é
+    ``"<change_seq>.<id>"``; ``latest`` aponta para o estado atual sem
+    devolver linhas (para quem acabou de carregar a lista completa).
+    """
+
+    LATEST = 'latest'
+    CURSOR_RE = re.compile(r'^(\d+)\.(\d+)$')
+
+    @classmethod
+    def encode_cursor(cls, change_seq, ticket_id):
+        return f'{change_seq}.{ticket_id}'
+
+    @classmethod
+    def decode_cursor(cls, cursor):
+        """Retorna ``(change_seq, id)``; sem cursor, o feed começa do início"""
+        if not cursor:
+            return (-1, 0)
+        match = cls.CURSOR_RE.match(cursor)
+        if match is None:
+            raise InvalidChangeCursor(cursor)
+        return int(match.group(1)), int(match.group(2))
+
+    @classmethod
+    def latest_cursor(cls):
+        position = Ticket.all_objects.order_by('-change_seq', '-id').values_list('change_seq', 'id').first()
+        return cls.encode_cursor(*(position or (0, 0)))
+
+    @classmethod
+    async def alatest_cursor(cls):
+        """``latest_cursor`` com o ORM async"""
+        position = await Ticket.all_objects.order_by('-change_seq', '-id').values_list('change_seq', 'id').afirst()
+        return cls.encode_cursor(*(position or (0, 0)))
+
+    @classmethod
+    def changed_since(cls, queryset, cursor):
+        """Filtra ``queryset`` para linhas alteradas depois de ``cursor``, em ordem de alteração"""
+        change_seq, ticket_id = cls.decode_cursor(cursor)
+        return queryset.filter(
+            Q(change_seq__gt=change_seq) | Q(change_seq=change_seq, id__gt=ticket_id)
+        ).order_by('change_seq', 'id')
@@ -0,0 +1,85 @@
+import hashlib
+import uuid
+from functools import partial
+
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+class TicketVersionService:
+    """
+    Versões de tabela para requisições condicionais (ETag/Last-Modified).
+
+    Cada escopo ('tickets', 'users') guarda no cache um token aleatório e o
+    instante da última alteração. Toda escrita troca o token (signals em
+    ``core.apps`` e os serviços de lote e de importação), então um token
+    antigo nunca volta a valer; se o cache perder a chave, um token novo é
+    gerado e os clientes apenas baixam o conteúdo de novo.
+
+    Os tokens só valem entre processos (workers, comandos de gerenciamento)
+    com um cache compartilhado (``CACHE_REDIS_URL``); o check ``core.W001``
+    avisa quando o cache é local ao processo.
+    """
+
+    CACHE_KEY = 'ticket_versions:v1:{scope}'
+    TICKETS = 'tickets'
+    USERS = 'users'
+
+    @classmethod
+    def bump(cls, scope=TICKETS, using=None):
+        """
+        Marca ``scope`` como alterado quando a transação atual for confirmada
+
+        Trocar o token antes do commit deixaria um leitor concorrente guardar
+        as linhas antigas sob o token novo. Fora de transação vale na hora.
+        """
+        transaction.on_commit(partial(cls._bump, scope), using=using)
+
+    @classmethod
+    def _bump(cls, scope):
+        cache.set(cls.CACHE_KEY.format(scope=scope), (uuid.uuid4().hex, timezone.now()), None)
+
+    @classmethod
+    def get(cls, scope=TICKETS):
+        """Retorna ``(token, modificado_em)`` de ``scope``"""
+        key = cls.CACHE_KEY.format(scope=scope)
+        version = cache.get(key)
+        if version is None:
+            version = (uuid.uuid4().hex, timezone.now())
+            # add() para não sobrescrever um bump concorrente
+            if not cache.add(key, version, None):
+                version = cache.get(key, version)
+        return version
+
+    @classmethod
+    def combined(cls, *scopes):
+        """Tokens e a alteração mais recente de vários escopos"""
+        versions = [cls.get(scope) for scope in scopes]
+        return [token for token, _modified in versions], max(modified for _token, modified in versions)
+
+
+def make_etag(*parts):
+    """ETag forte (entre aspas) a partir de partes quaisquer"""
+    digest = hashlib.sha1('|'.join(str(part) for part in parts).encode('utf-8')).hexdigest()
+    return f'"{digest}"'
+
+
+def not_modified(request, etag, last_modified=None):
+    """Resposta 304 quando ``If-None-Match``/``If-Modified-Since`` ainda valem, senão ``None``"""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None:
+        set_validators(response, etag, last_modified)
+    return response
+
+
+def set_validators(response, etag, last_modified=None):
+    """Adiciona ETag/Last-Modified e exige revalidação do cliente a cada uso"""
+    response['ETag'] = etag
+    if last_modified:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
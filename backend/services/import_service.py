@@ -0,0 +1,190 @@
+import csv
+import json
+
+from django.conf import settings
+from django.db import transaction
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+
+from core.models import CustomUser, Ticket, TicketChangeCounter, TicketStatus
+from .conditional_service import TicketVersionService
+from .stats_service import TicketStatsService
+from .websocket_service import WebSocketNotificationService
+
+# Quantos erros de linha são guardados no resumo
+MAX_REPORTED_ERRORS = 100
+
+
+class TicketImportResult:
+    """Resumo de uma importação"""
+
+    def __init__(self):
+        self.imported = 0
+        self.skipped = 0
+        self.errors = []
+        # Motivo quando a leitura parou antes do fim do arquivo
+        self.error = None
+
+    def add_error(self, line, detail):
+        self.skipped += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': detail})
+
+    def fail(self, message):
+        self.error = message
+
+    def as_dict(self):
+        data = {'imported': self.imported, 'skipped': self.skipped, 'errors': self.errors}
+        if self.error:
+            data['error'] = self.error
+        return data
+
+
+class TicketImportService:
+    """
+    Serviço de importação em massa de tickets (CSV ou NDJSON).
+
+    As linhas são lidas em streaming e validadas com os mesmos campos de
+    ``TicketCreateSerializer`` (sem instanciar um serializer por linha). Os
+    usuários são resolvidos por e-mail em um mapa carregado uma única vez e os
+    tickets entram com ``bulk_create`` em lotes, uma transação por lote.
+    Ao final (mesmo se a leitura falhar no meio, pois os lotes já gravados
+    ficam) os caches derivados são invalidados e um único evento WebSocket
+    resume a importação. Um arquivo que não é UTF-8 válido para a leitura no
+    primeiro byte inválido e o motivo fica em ``TicketImportResult.error``.
+    Aceita as colunas do export
+    (``created_by_email``, ``assigned_to_email``, ``status``); ``id`` e datas
+    são ignorados.
+    """
+
+    formats = ('csv', 'ndjson')
+
+    @classmethod
+    def _batch_size(cls):
+        return getattr(settings, 'TICKET_IMPORT_BATCH_SIZE', 1000)
+
+    @staticmethod
+    def read_rows(stream, file_format):
+        """Gera ``(número da linha, dict)`` a partir de um arquivo texto"""
+        if file_format == 'csv':
+            reader = csv.DictReader(stream)
+            for row in reader:
+                yield reader.line_num, row
+            return
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError:
+                row = None
+            yield line_number, row if isinstance(row, dict) else None
+
+    @classmethod
+    def _decoded_rows(cls, stream, file_format, result):
+        """``read_rows`` que encerra no primeiro erro de decodificação, registrando-o em ``result``"""
+        line_number = 0
+        try:
+            for line_number, row in cls.read_rows(stream, file_format):
+                yield line_number, row
+        except UnicodeDecodeError:
+            result.fail(f'The file is not valid UTF-8 (after line {line_number}); the rest was not read.')
+
+    @classmethod
+    def run(cls, stream, file_format, default_user=None, batch_size=None, dry_run=False, progress=None):
+        """
+        Importa os tickets de ``stream``
+
+        Args:
+            stream: Arquivo texto (CSV com cabeçalho ou um objeto JSON por linha)
+            file_format (str): 'csv' ou 'ndjson'
+            default_user (CustomUser): Criador quando a linha não tem ``created_by_email``
+            batch_size (int): Tickets por ``bulk_create``/transação
+            dry_run (bool): Apenas valida, sem gravar
+            progress (callable): Chamado com o ``TicketImportResult`` após cada lote
+
+        Returns:
+            TicketImportResult
+        """
+        batch_size = batch_size or cls._batch_size()
+        fields = TicketCreateFields()
+        users = dict(CustomUser.objects.values_list('email', 'id'))
+        result = TicketImportResult()
+        batch = []
+
+        try:
+            for line_number, row in cls._decoded_rows(stream, file_format, result):
+                if row is None:
+                    result.add_error(line_number, {'non_field_errors': ['Invalid JSON object.']})
+                    continue
+                ticket, errors = fields.build(row, users, default_user)
+                if errors:
+                    result.add_error(line_number, errors)
+                    continue
+                batch.append(ticket)
+                if len(batch) >= batch_size:
+                    cls._flush(batch, result, dry_run, progress)
+                    batch = []
+            if batch:
+                cls._flush(batch, result, dry_run, progress)
+        finally:
+            # Lotes já confirmados continuam no banco mesmo se algo falhou depois
+            if result.imported and not dry_run:
+                TicketVersionService.bump(TicketVersionService.TICKETS)
+                TicketStatsService.invalidate()
+                WebSocketNotificationService.send_tickets_imported(result.imported)
+        return result
+
+    @staticmethod
+    def _flush(batch, result, dry_run, progress):
+        if not dry_run:
+            with transaction.atomic():
+                # O lote inteiro compartilha um número de sequência (o feed desempata por id)
+                change_seq = TicketChangeCounter.next_value()
+                for ticket in batch:
+                    ticket.change_seq = change_seq
+                Ticket.objects.bulk_create(batch)
+        result.imported += len(batch)
+        if progress is not None:
+            progress(result)
+
+
+class TicketCreateFields:
+    """Valida uma linha com os campos de ``TicketCreateSerializer`` e monta o ``Ticket``"""
+
+    def __init__(self):
+        # Importado aqui: services não depende da API no carregamento
+        from api.v1.serializers import TicketCreateSerializer
+
+        self.fields = TicketCreateSerializer().fields
+        self.statuses = {value for value, _label in TicketStatus.get_choices()}
+
+    def build(self, row, users, default_user=None):
+        """Retorna ``(ticket, None)`` ou ``(None, erros)``"""
+        values, errors = {}, {}
+        for name, serializer_field in self.fields.items():
+            try:
+                values[name] = serializer_field.run_validation(row.get(name, serializers.empty))
+            except SkipField:
+                # Campo opcional ausente: vale o default do modelo
+                continue
+            except serializers.ValidationError as error:
+                errors[name] = error.detail
+
+        email = str(row.get('created_by_email') or '').strip()
+        created_by_id = users.get(email) if email else getattr(default_user, 'pk', None)
+        if created_by_id is None:
+            errors['created_by_email'] = [f'Unknown user "{email}".' if email else 'This field is required.']
+
+        assigned_email = str(row.get('assigned_to_email') or '').strip()
+        assigned_to_id = users.get(assigned_email) if assigned_email else None
+        if assigned_email and assigned_to_id is None:
+            errors['assigned_to_email'] = [f'Unknown user "{assigned_email}".']
+
+        status = str(row.get('status') or TicketStatus.OPEN.value).strip()
+        if status not in self.statuses:
+            errors['status'] = [f'"{status}" is not a valid choice.']
+
+        if errors:
+            return None, errors
+        return Ticket(**values, status=status, created_by_id=created_by_id, assigned_to_id=assigned_to_id), None
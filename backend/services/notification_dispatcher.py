@@ -0,0 +1,218 @@
+import asyncio
+import atexit
+import itertools
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from asgiref.sync import async_to_sync
+from django.conf import settings
+from django.db import close_old_connections
+
+logger = logging.getLogger(__name__)
+
+# Ao unir eventos do mesmo ticket, prevalece o tipo de maior precedência
+EVENT_PRECEDENCE = {'ticket_updated': 0, 'ticket_resolved': 1, 'ticket_created': 2}
+
+# Tempo máximo esperando o loop do servidor publicar uma mensagem
+SEND_TIMEOUT = 10.0
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _dispatcher_setting(name, default):
+    return getattr(settings, 'TICKET_NOTIFICATIONS', {}).get(name, default)
+
+
+class PendingEvent:
+    """Evento aguardando envio (``deliver`` serializa e publica no channel layer)"""
+
+    __slots__ = ('key', 'event_type', 'deliver', 'first_at', 'merged')
+
+    def __init__(self, key, event_type, deliver):
+        self.key = key
+        self.event_type = event_type
+        self.deliver = deliver
+        self.first_at = time.monotonic()
+        self.merged = 0
+
+
+class NotificationDispatcher:
+    """
+    Outbox de notificações WebSocket processado fora da thread da requisição.
+
+    Os eventos entram na fila após o commit da transação e são enviados por
+    uma thread de background depois de ``COALESCE_WINDOW`` segundos; eventos
+    do mesmo ticket dentro da janela viram um só. Com ``ASYNC = False`` o envio
+    é imediato e síncrono (útil em testes e scripts).
+
+    A publicação no channel layer roda no event loop do servidor ASGI
+    (registrado pelo consumer com ``bind_loop``): o ``InMemoryChannelLayer``
+    entrega em filas asyncio desse loop, e um ``async_to_sync`` na thread do
+    dispatcher usaria um loop novo, sem acordar os consumers que esperam.
+    """
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = OrderedDict()
+        self._thread = None
+        self._loop = None
+        self._in_flight = 0
+        self._flushing = False
+        self._sequence = itertools.count()
+        self._stats = {
+            'submitted': 0,
+            'coalesced': 0,
+            'delivered': 0,
+            'failed': 0,
+            'last_lag_seconds': 0.0,
+            'max_lag_seconds': 0.0,
+        }
+
+    @property
+    def window(self):
+        return _dispatcher_setting('COALESCE_WINDOW', 0.25)
+
+    @property
+    def asynchronous(self):
+        return _dispatcher_setting('ASYNC', True)
+
+    def submit(self, event_type, deliver, key=None):
+        """
+        Agenda ``deliver()``. Eventos com a mesma ``key`` ainda pendentes são unidos.
+
+        Args:
+            event_type (str): Tipo do evento ('ticket_created', 'custom_notification', ...)
+            deliver (callable): Função sem argumentos que monta e envia a mensagem
+            key: Chave de coalescência (ex.: ``('ticket', id)``); ``None`` nunca une
+        """
+        if not self.asynchronous:
+            self._stats['submitted'] += 1
+            self._deliver(PendingEvent(key, event_type, deliver))
+            return
+
+        if key is None:
+            key = ('unique', next(self._sequence))
+        with self._cond:
+            self._stats['submitted'] += 1
+            pending = self._pending.get(key)
+            if pending is not None:
+                pending.merged += 1
+                self._stats['coalesced'] += 1
+                if EVENT_PRECEDENCE.get(event_type, 0) >= EVENT_PRECEDENCE.get(pending.event_type, 0):
+                    pending.event_type = event_type
+                    pending.deliver = deliver
+            else:
+                self._pending[key] = PendingEvent(key, event_type, deliver)
+            self._ensure_worker()
+            self._cond.notify()
+
+    def bind_loop(self, loop):
+        """Registra o event loop do servidor ASGI (o último que abriu um WebSocket)"""
+        self._loop = loop
+
+    def run_coroutine(self, function, *args):
+        """
+        Executa ``function(*args)`` no loop registrado, se ainda estiver rodando
+
+        Sem loop do servidor (scripts, comandos, WSGI) cai no ``async_to_sync``;
+        dentro do próprio loop esperar o resultado travaria, então idem.
+        """
+        loop = self._loop
+        if loop is None or not loop.is_running() or _running_loop() is loop:
+            return async_to_sync(function)(*args)
+        return asyncio.run_coroutine_threadsafe(function(*args), loop).result(SEND_TIMEOUT)
+
+    def flush(self, timeout=5.0):
+        """Envia tudo que estiver pendente sem esperar a janela; retorna True se esvaziou"""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            self._flushing = True
+            self._cond.notify_all()
+            try:
+                while self._pending or self._in_flight:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        return False
+                    self._cond.wait(remaining)
+                return True
+            finally:
+                self._flushing = False
+
+    def metrics(self):
+        """Retorna profundidade da fila, atraso do evento mais antigo e contadores"""
+        with self._cond:
+            oldest = next(iter(self._pending.values()), None)
+            return {
+                'queue_depth': len(self._pending),
+                'in_flight': self._in_flight,
+                'oldest_lag_seconds': round(time.monotonic() - oldest.first_at, 4) if oldest else 0.0,
+                'coalesce_window_seconds': self.window,
+                'asynchronous': self.asynchronous,
+                'worker_alive': bool(self._thread and self._thread.is_alive()),
+                **self._stats,
+            }
+
+    # ----- Worker -----
+    def _ensure_worker(self):
+        if self._thread is None or not self._thread.is_alive():
+            if self._thread is None:
+                # Tenta esvaziar a fila quando o processo encerra
+                atexit.register(self.flush, 2.0)
+            self._thread = threading.Thread(target=self._run, name='ticket-notification-dispatcher', daemon=True)
+            self._thread.start()
+
+    def _take_due(self):
+        """Remove e retorna os eventos cuja janela expirou (chamar com o lock)"""
+        now = time.monotonic()
+        batch = []
+        while self._pending:
+            event = next(iter(self._pending.values()))
+            if not self._flushing and event.first_at + self.window > now:
+                break
+            batch.append(self._pending.popitem(last=False)[1])
+        return batch
+
+    def _run(self):
+        while True:
+            with self._cond:
+                batch = self._take_due()
+                while not batch:
+                    if self._pending:
+                        oldest = next(iter(self._pending.values()))
+                        self._cond.wait(max(oldest.first_at + self.window - time.monotonic(), 0.001))
+                    else:
+                        self._cond.wait()
+                    batch = self._take_due()
+                self._in_flight = len(batch)
+
+            try:
+                for event in batch:
+                    self._deliver(event)
+            finally:
+                close_old_connections()
+                with self._cond:
+                    self._in_flight = 0
+                    self._cond.notify_all()
+
+    def _deliver(self, event):
+        try:
+            event.deliver()
+        except Exception:
+            self._stats['failed'] += 1
+            logger.exception('Falha ao enviar notificação %s', event.event_type)
+            return
+        lag = time.monotonic() - event.first_at
+        self._stats['delivered'] += 1
+        self._stats['last_lag_seconds'] = round(lag, 4)
+        self._stats['max_lag_seconds'] = max(self._stats['max_lag_seconds'], round(lag, 4))
+
+
+# Instância global (uma por processo)
+dispatcher = NotificationDispatcher()
@@ -0,0 +1,71 @@
+import threading
+from collections import OrderedDict
+
+from django.conf import settings
+from django.utils.translation import get_language
+from rest_framework.renderers import JSONRenderer
+from api.v1.serializers import TicketSerializer
+
+
+class TicketPayloadCache:
+    """
+    Cache em memória do JSON já renderizado de cada ticket.
+
+    A chave é ``(id, updated_at, idioma)``: qualquer save muda ``updated_at``,
+    então uma entrada antiga nunca é servida, mesmo que outro processo tenha
+    alterado o ticket. Os signals em ``core.apps`` ainda removem a entrada no
+    save/delete do ticket e limpam tudo quando um usuário muda (dados aninhados).
+    Usado tanto nas respostas da API quanto nos eventos WebSocket.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'TICKET_PAYLOAD_CACHE_SIZE', 5000)
+
+    @staticmethod
+    def version(ticket):
+        return (ticket.updated_at.isoformat() if ticket.updated_at else '', get_language() or '')
+
+    def get_json(self, ticket):
+        """Retorna os bytes JSON de ``TicketSerializer(ticket).data``, serializando só em cache miss"""
+        version = self.version(ticket)
+        with self._lock:
+            entry = self._entries.get(ticket.pk)
+            if entry is not None and version in entry:
+                self._entries.move_to_end(ticket.pk)
+                self.hits += 1
+                return entry[version]
+
+        payload = JSONRenderer().render(TicketSerializer(ticket).data)
+        with self._lock:
+            self.misses += 1
+            entry = self._entries.get(ticket.pk)
+            if entry is None or any(key[0] != version[0] for key in entry):
+                entry = self._entries[ticket.pk] = {}
+            entry[version] = payload
+            self._entries.move_to_end(ticket.pk)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return payload
+
+    def invalidate(self, ticket_id):
+        with self._lock:
+            self._entries.pop(ticket_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def render_event(self, notification_type, ticket):
+        """Frame WebSocket completo (texto) de um evento de ticket, montado uma única vez"""
+        return '{"type":"%s","ticket":%s}' % (notification_type, self.get_json(ticket).decode('utf-8'))
+
+
+# Instância global (uma por processo)
+payload_cache = TicketPayloadCache()
@@ -2,15 +2,15 @@ from typing import Iterable
 from functools import wraps
 from django.shortcuts import redirect
 from rest_framework.exceptions import PermissionDenied
-from .roles import UserRole
+from .roles import role_set
 
 
 def has_roles(user, roles: Iterable[str]) -> bool:
-    """Retorna True se o usuário for superuser ou possuir uma role permitida."""
-    user_role = getattr(user, 'role', None)
-    # Aceita comparar tanto com strings quanto com UserRole
-    role_values = {r.value if isinstance(r, UserRole) else r for r in roles}
-    return user_role in role_values
+    """Retorna True se o usuário possuir uma role permitida."""
+    # Os grupos de ``services.roles`` já são frozensets de str; outros iteráveis (strings ou UserRole) são normalizados
+    if not isinstance(roles, frozenset):
+        roles = role_set(*roles)
+    return getattr(user, 'role', None) in roles
 
 
 def require_roles(user, roles: Iterable[str]) -> None:
@@ -7,9 +7,14 @@ class UserRole(str, Enum):
     AGENT = 'agent'
 
 
+def role_set(*roles):
+    """frozenset com os valores (str) das roles; ``has_roles`` o usa direto, sem normalizar"""
+    return frozenset(role.value if isinstance(role, UserRole) else role for role in roles)
+
+
 # Grupos de roles úteis
-SUPPORT_UPDATE_ROLES = {UserRole.ADMIN, UserRole.TECHNICIAN}
-SUPPORT_READ_ROLES = {UserRole.ADMIN, UserRole.TECHNICIAN}
+SUPPORT_UPDATE_ROLES = role_set(UserRole.ADMIN, UserRole.TECHNICIAN)
+SUPPORT_READ_ROLES = role_set(UserRole.ADMIN, UserRole.TECHNICIAN)
 
-AGENT_ROLES = {UserRole.AGENT}
+AGENT_ROLES = role_set(UserRole.AGENT)
 
@@ -0,0 +1,178 @@
+import re
+
+from django.conf import settings
+from django.db import connection
+from django.db.models import BooleanField, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.utils.module_loading import import_string
+
+# Dicionário de texto do PostgreSQL usado no índice e nas consultas (precisam ser idênticos)
+PG_SEARCH_CONFIG = 'portuguese'
+PG_DOCUMENT = (
+    f"to_tsvector('{PG_SEARCH_CONFIG}', coalesce(core_ticket.title, '') || ' ' || coalesce(core_ticket.description, ''))"
+)
+
+WORD_RE = re.compile(r'\w+', re.UNICODE)
+
+
+class TicketSearchBackend:
+    """Backend base: filtra e anota ``search_rank`` em um queryset de tickets"""
+
+    # Ordem que coloca os resultados mais relevantes primeiro
+    rank_ordering = '-search_rank'
+
+    def filter(self, queryset, query):
+        raise NotImplementedError
+
+    def install(self, conn):
+        """Cria (de forma idempotente) as estruturas de índice do backend"""
+
+    def uninstall(self, conn):
+        """Remove as estruturas de índice do backend"""
+
+
+class IContainsSearchBackend(TicketSearchBackend):
+    """Fallback sem índice: ``LIKE '%...%'`` em título e descrição"""
+
+    def filter(self, queryset, query):
+        return queryset.filter(Q(title__icontains=query) | Q(description__icontains=query)).annotate(
+            search_rank=Value(0.0, output_field=FloatField())
+        )
+
+
+class SQLiteFTSSearchBackend(TicketSearchBackend):
+    """
+    Busca com tabela virtual FTS5 (``core_ticket_fts``) em modo external content.
+
+    Triggers mantêm o índice sincronizado em qualquer escrita, inclusive
+    ``bulk_create`` e ``QuerySet.update``. O ranking usa ``bm25`` (menor é melhor).
+    """
+
+    rank_ordering = 'search_rank'
+    table = 'core_ticket_fts'
+    triggers = {
+        'core_ticket_fts_ai': (
+            'AFTER INSERT ON core_ticket BEGIN '
+            'INSERT INTO core_ticket_fts(rowid, title, description) VALUES (new.id, new.title, new.description); '
+            'END'
+        ),
+        'core_ticket_fts_ad': (
+            'AFTER DELETE ON core_ticket BEGIN '
+            "INSERT INTO core_ticket_fts(core_ticket_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            'END'
+        ),
+        'core_ticket_fts_au': (
+            'AFTER UPDATE OF title, description ON core_ticket BEGIN '
+            "INSERT INTO core_ticket_fts(core_ticket_fts, rowid, title, description) "
+            "VALUES ('delete', old.id, old.title, old.description); "
+            'INSERT INTO core_ticket_fts(rowid, title, description) VALUES (new.id, new.title, new.description); '
+            'END'
+        ),
+    }
+
+    @staticmethod
+    def match_expression(query):
+        """Converte texto livre em uma expressão MATCH segura (AND de prefixos)"""
+        return ' '.join(f'"{word}"*' for word in WORD_RE.findall(query))
+
+    def filter(self, queryset, query):
+        match = self.match_expression(query)
+        if not match:
+            return queryset.none()
+        rank = RawSQL(
+            f'SELECT bm25({self.table}) FROM {self.table} WHERE {self.table} MATCH %s AND rowid = core_ticket.id',
+            [match],
+            output_field=FloatField(),
+        )
+        matches = RawSQL(f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s', [match])
+        return queryset.filter(id__in=matches).annotate(search_rank=rank)
+
+    def install(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+                % ', '.join(f"'{name}'" for name in self.triggers)
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            if existing == set(self.triggers):
+                return
+            cursor.execute(
+                f'CREATE VIRTUAL TABLE IF NOT EXISTS {self.table} USING fts5('
+                "title, description, content='core_ticket', content_rowid='id', "
+                "tokenize='unicode61 remove_diacritics 2')"
+            )
+            for name, body in self.triggers.items():
+                cursor.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            # Triggers ausentes (ex.: tabela recriada por uma migração): reindexa tudo
+            cursor.execute(f"INSERT INTO {self.table}({self.table}) VALUES ('rebuild')")
+
+    def uninstall(self, conn):
+        with conn.cursor() as cursor:
+            for name in self.triggers:
+                cursor.execute(f'DROP TRIGGER IF EXISTS {name}')
+            cursor.execute(f'DROP TABLE IF EXISTS {self.table}')
+
+
+class PostgresFTSSearchBackend(TicketSearchBackend):
+    """Busca com ``tsvector`` calculado sobre título e descrição e índice GIN de expressão"""
+
+    index_name = 'core_ticket_search_gin'
+
+    def filter(self, queryset, query):
+        tsquery = f"websearch_to_tsquery('{PG_SEARCH_CONFIG}', %s)"
+        matches = RawSQL(f'{PG_DOCUMENT} @@ {tsquery}', [query], output_field=BooleanField())
+        rank = RawSQL(f'ts_rank({PG_DOCUMENT}, {tsquery})', [query], output_field=FloatField())
+        return queryset.filter(matches).annotate(search_rank=rank)
+
+    def install(self, conn):
+        document = PG_DOCUMENT.replace('core_ticket.', '')
+        with conn.cursor() as cursor:
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {self.index_name} ON core_ticket USING GIN (({document}))')
+
+    def uninstall(self, conn):
+        with conn.cursor() as cursor:
+            cursor.execute(f'DROP INDEX IF EXISTS {self.index_name}')
+
+
+VENDOR_BACKENDS = {
+    'sqlite': SQLiteFTSSearchBackend,
+    'postgresql': PostgresFTSSearchBackend,
+}
+
+
+class TicketSearchService:
+    """Serviço de busca de tickets com backend plugável (``TICKET_SEARCH_BACKEND``)"""
+
+    @classmethod
+    def get_backend(cls, conn=None):
+        """Retorna o backend configurado ou, em ``'auto'``, o do banco em uso"""
+        path = getattr(settings, 'TICKET_SEARCH_BACKEND', 'auto')
+        if path != 'auto':
+            return import_string(path)()
+        vendor = (conn or connection).vendor
+        return VENDOR_BACKENDS.get(vendor, IContainsSearchBackend)()
+
+    @classmethod
+    def search(cls, queryset, query):
+        """
+        Filtra ``queryset`` por ``query`` e ordena por relevância.
+
+        Consultas puramente numéricas viram busca exata por ID (usa a PK).
+        """
+        query = (query or '').strip()
+        if not query:
+            return queryset
+        # isdigit() também aceita '²' e outros dígitos que int() recusa
+        if query.isascii() and query.isdigit():
+            return queryset.filter(pk=int(query)).annotate(search_rank=Value(0.0, output_field=FloatField()))
+        # Os índices de texto só existem em core_ticket (o arquivo usa o fallback)
+        backend = cls.get_backend() if queryset.model._meta.db_table == 'core_ticket' else IContainsSearchBackend()
+        id_ordering = '-id' if backend.rank_ordering.startswith('-') else 'id'
+        return backend.filter(queryset, query).order_by(backend.rank_ordering, id_ordering)
+
+    @classmethod
+    def install(cls, conn=None, **kwargs):
+        """Garante que o índice de busca exista (usado na migração e no post_migrate)"""
+        conn = conn or connection
+        cls.get_backend(conn).install(conn)
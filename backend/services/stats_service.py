@@ -0,0 +1,245 @@
+import uuid
+from collections import Counter
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count
+from django.utils import timezone
+
+from core.models import Ticket, TicketArchive, TicketStatus
+
+
+class TicketStatsService:
+    """
+    Serviço de estatísticas de tickets.
+
+    Todas as contagens (status, prioridade e departamento) saem de uma única
+    consulta agrupada e ficam em cache. As escritas atualizam o cache de forma
+    incremental, então a leitura em regime normal não toca o banco; o cache
+    expira após ``TICKET_STATS_CACHE_TIMEOUT`` segundos para limitar desvios.
+
+    O cálculo completo é a base de uma geração; as escritas não regravam essa
+    base, só somam em contadores por contagem (``cache.incr``), que a leitura
+    junta à base. Um novo cálculo inicia outra geração e os contadores antigos
+    apenas expiram.
+    """
+
+    CACHE_KEY = 'ticket_stats:v2'
+
+    @classmethod
+    def _timeout(cls):
+        return getattr(settings, 'TICKET_STATS_CACHE_TIMEOUT', 300)
+
+    @staticmethod
+    def snapshot(ticket):
+        """Retorna as dimensões contadas de um ticket (usar antes de alterá-lo)"""
+        return (ticket.status, ticket.priority, ticket.department)
+
+    @staticmethod
+    def _counts():
+        """Uma única consulta: GROUP BY dos tickets unido ao dos fechados arquivados"""
+        columns = ('status', 'priority', 'department')
+        live = Ticket.objects.order_by().values_list(*columns).annotate(n=Count('id'))
+        archived = (
+            TicketArchive.objects.filter(reason=TicketArchive.REASON_CLOSED)
+            .order_by()
+            .values_list(*columns)
+            .annotate(n=Count('id'))
+        )
+        return live.union(archived, all=True)
+
+    @classmethod
+    def compute(cls):
+        """Calcula as estatísticas com uma única consulta (GROUP BY dos tickets e dos fechados arquivados)"""
+        return cls._build(cls._counts())
+
+    @classmethod
+    async def acompute(cls):
+        """``compute`` com o ORM async"""
+        return cls._build([row async for row in cls._counts()])
+
+    @classmethod
+    def _build(cls, rows):
+        now = timezone.now().isoformat()
+        stats = {
+            'total': 0,
+            'by_status': {status.value: 0 for status in TicketStatus},
+            'by_priority': {value: 0 for value, _label in Ticket.PRIORITY_CHOICES},
+            'by_department': {},
+            'computed_at': now,
+            'updated_at': now,
+        }
+        for status, priority, department, count in rows:
+            cls._apply(stats, (status, priority, department), count)
+        return stats
+
+    @classmethod
+    def get_stats(cls):
+        """Retorna as estatísticas do cache, recalculando apenas quando ausentes"""
+        stats = cache.get(cls.CACHE_KEY)
+        source = 'cache'
+        if stats is None:
+            stats = cls._store(cls.compute())
+            source = 'database'
+        return cls._render(cls._with_deltas(stats), source)
+
+    @classmethod
+    async def aget_stats(cls):
+        """``get_stats`` para views async: só o recálculo (cache ausente) vai ao banco, pelo ORM async"""
+        stats = cache.get(cls.CACHE_KEY)
+        source = 'cache'
+        if stats is None:
+            stats = cls._store(await cls.acompute())
+            source = 'database'
+        return cls._render(cls._with_deltas(stats), source)
+
+    @classmethod
+    def record_created(cls, ticket):
+        """Soma um ticket recém-criado às contagens em cache"""
+        cls._record([(cls.snapshot(ticket), 1)])
+
+    @classmethod
+    def record_changed(cls, before, ticket):
+        """Move um ticket entre contagens; ``before`` vem de ``snapshot`` antes do save"""
+        cls.record_bulk_changed([(before, cls.snapshot(ticket))])
+
+    @classmethod
+    def record_bulk_changed(cls, changes):
+        """Aplica vários ``(before, after)`` (tuplas de ``snapshot``) de uma vez"""
+        changes = [(before, after) for before, after in changes if before != after]
+        cls._record([(before, -1) for before, _after in changes] + [(after, 1) for _before, after in changes])
+
+    @classmethod
+    def invalidate(cls):
+        """Descarta o cache; a próxima leitura recalcula a partir do banco"""
+        cache.delete(cls.CACHE_KEY)
+
+    # ----- Helpers -----
+    @classmethod
+    def _store(cls, stats):
+        """Guarda um cálculo completo como base de uma nova geração de contadores"""
+        stats['generation'] = uuid.uuid4().hex
+        cache.set(cls.CACHE_KEY, stats, cls._timeout())
+        return stats
+
+    @classmethod
+    def _prefix(cls, stats):
+        return f'{cls.CACHE_KEY}:{stats["generation"]}'
+
+    @staticmethod
+    def _counter_key(prefix, bucket, value=''):
+        return f'{prefix}:{bucket}:{quote(str(value))}'
+
+    @classmethod
+    def _record(cls, changes):
+        """
+        Soma ``delta`` de cada ``(snapshot, delta)`` aos contadores da geração atual
+
+        Cada contagem é uma chave própria alterada com ``cache.incr`` (atômico
+        no Redis e no LocMem), então escritas concorrentes não se sobrescrevem
+        como num ler-alterar-gravar do dicionário inteiro.
+        """
+        if not changes:
+            return
+        stats = cache.get(cls.CACHE_KEY)
+        if stats is None:
+            # Nada em cache: a próxima leitura já vai recalcular
+            return
+        deltas = Counter()
+        for (status, priority, department), delta in changes:
+            deltas['total', ''] += delta
+            deltas['by_status', status] += delta
+            deltas['by_priority', priority] += delta
+            deltas['by_department', department] += delta
+
+        prefix = cls._prefix(stats)
+        for (bucket, value), delta in deltas.items():
+            if not delta:
+                continue
+            if bucket == 'by_department' and value not in stats['by_department']:
+                cls._add_department(prefix, value)
+            cls._incr(cls._counter_key(prefix, bucket, value), delta)
+        cache.set(cls._counter_key(prefix, 'updated_at'), timezone.now().isoformat(), cls._timeout())
+
+    @classmethod
+    def _incr(cls, key, delta):
+        try:
+            return cache.incr(key, delta)
+        except ValueError:
+            # Primeira alteração desta contagem na geração
+            cache.add(key, 0, cls._timeout())
+            return cache.incr(key, delta)
+
+    @classmethod
+    def _add_department(cls, prefix, department):
+        """Registra um departamento que não existia no cálculo base (uma vez por geração)"""
+        if cache.add(cls._counter_key(prefix, 'department_seen', department), True, cls._timeout()):
+            slot = cls._incr(cls._counter_key(prefix, 'departments'), 1)
+            cache.set(cls._counter_key(prefix, 'department', slot), department, cls._timeout())
+
+    @classmethod
+    def _with_deltas(cls, stats):
+        """O cálculo base somado aos contadores gravados desde então"""
+        prefix = cls._prefix(stats)
+        added = cache.get(cls._counter_key(prefix, 'departments')) or 0
+        new_departments = cache.get_many(
+            [cls._counter_key(prefix, 'department', slot) for slot in range(1, added + 1)]
+        ).values()
+
+        result = {
+            'total': stats['total'],
+            'by_status': dict(stats['by_status']),
+            'by_priority': dict(stats['by_priority']),
+            'by_department': dict(stats['by_department']),
+            'computed_at': stats['computed_at'],
+            'updated_at': stats['updated_at'],
+        }
+        for department in new_departments:
+            result['by_department'].setdefault(department, 0)
+        keys = {cls._counter_key(prefix, 'total'): ('total', None)}
+        for bucket in ('by_status', 'by_priority', 'by_department'):
+            for value in result[bucket]:
+                keys[cls._counter_key(prefix, bucket, value)] = (bucket, value)
+        updated_key = cls._counter_key(prefix, 'updated_at')
+        values = cache.get_many([*keys, updated_key])
+
+        for key, delta in values.items():
+            if key == updated_key:
+                result['updated_at'] = delta
+                continue
+            bucket, value = keys[key]
+            if bucket == 'total':
+                result['total'] += delta
+            else:
+                result[bucket][value] += delta
+        result['by_department'] = {name: count for name, count in result['by_department'].items() if count > 0}
+        return result
+
+    @staticmethod
+    def _apply(stats, key, delta):
+        status, priority, department = key
+        stats['total'] += delta
+        for bucket, value in (('by_status', status), ('by_priority', priority), ('by_department', department)):
+            counts = stats[bucket]
+            counts[value] = counts.get(value, 0) + delta
+            if bucket == 'by_department' and counts[value] <= 0:
+                del counts[value]
+
+    @staticmethod
+    def _render(stats, source):
+        by_status = stats['by_status']
+        return {
+            'total': stats['total'],
+            'open': by_status.get(TicketStatus.OPEN.value, 0),
+            'in_progress': by_status.get(TicketStatus.IN_PROGRESS.value, 0),
+            'resolved': by_status.get(TicketStatus.RESOLVED.value, 0),
+            'cancelled': by_status.get(TicketStatus.CANCELLED.value, 0),
+            'by_priority': dict(stats['by_priority']),
+            'by_department': dict(stats['by_department']),
+            'meta': {
+                'source': source,
+                'computed_at': stats['computed_at'],
+                'updated_at': stats['updated_at'],
+            },
+        }
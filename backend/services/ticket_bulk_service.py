@@ -0,0 +1,97 @@
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import Ticket, TicketChangeCounter, TicketStatus
+from .conditional_service import TicketVersionService
+from .stats_service import TicketStatsService
+from .websocket_service import WebSocketNotificationService
+
+
+class TicketBulkError(Exception):
+    """Lote rejeitado; ``detail`` vai no corpo da resposta com ``status_code``"""
+
+    def __init__(self, detail, status_code=400):
+        super().__init__(detail['error'])
+        self.detail = detail
+        self.status_code = status_code
+
+
+class TicketBulkService:
+    """
+    Serviço de alterações em lote de tickets.
+
+    Uma única consulta carrega o estado atual dos tickets (existência, status
+    não editáveis e contagens para as estatísticas) e um único UPDATE aplica as
+    mudanças. Como ``QuerySet.update`` não dispara ``save``/signals, o
+    ``updated_at`` é definido explicitamente (o cache de payloads usa essa
+    coluna como versão) e as estatísticas são ajustadas com uma só escrita.
+    Os clientes WebSocket recebem um único evento agregado.
+    """
+
+    # Campos retornados pela consulta de estado atual
+    STATE_FIELDS = ('id', 'status', 'priority', 'department', 'created_by_id', 'assigned_to_id')
+
+    @classmethod
+    def load_state(cls, ticket_ids):
+        """Retorna ``{id: linha}`` dos tickets pedidos; 404 se algum não existir"""
+        rows = {
+            row['id']: row for row in Ticket.objects.filter(pk__in=ticket_ids).order_by().values(*cls.STATE_FIELDS)
+        }
+        missing = sorted(set(ticket_ids) - rows.keys())
+        if missing:
+            raise TicketBulkError({'error': 'Tickets not found.', 'ids': missing}, status_code=404)
+        return rows
+
+    @classmethod
+    def update(cls, ticket_ids, changes, user, notification_type='tickets_bulk_updated'):
+        """
+        Aplica ``changes`` (campo -> valor já validado) a todos os ``ticket_ids``
+
+        Tudo ou nada: se algum ticket não existir ou estiver fechado/cancelado,
+        nenhum é alterado e ``TicketBulkError`` é levantado.
+
+        Returns:
+            list[int]: IDs alterados, em ordem crescente
+        """
+        ticket_ids = sorted(set(ticket_ids))
+        non_editable = TicketStatus.get_non_editable_statuses()
+        with transaction.atomic():
+            rows = cls.load_state(ticket_ids)
+            locked = sorted(pk for pk, row in rows.items() if row['status'] in non_editable)
+            if locked:
+                raise TicketBulkError({'error': 'Cannot edit closed or cancelled tickets.', 'ids': locked})
+
+            # O filtro de status repete a validação no próprio UPDATE (corrida com outra escrita)
+            updated = (
+                Ticket.objects.filter(pk__in=ticket_ids)
+                .exclude(status__in=non_editable)
+                .update(
+                    **changes,
+                    updated_by=user,
+                    updated_at=timezone.now(),
+                    # Todo o lote compartilha um número de sequência (o feed desempata por id)
+                    change_seq=TicketChangeCounter.next_value(),
+                )
+            )
+            if updated != len(ticket_ids):
+                raise TicketBulkError({'error': 'Tickets changed concurrently, try again.'}, status_code=409)
+
+            TicketVersionService.bump(TicketVersionService.TICKETS)
+            TicketStatsService.record_bulk_changed(
+                (cls._snapshot(row), cls._snapshot({**row, **changes})) for row in rows.values()
+            )
+            WebSocketNotificationService.send_tickets_bulk_notification(
+                notification_type, list(rows.values()), changes
+            )
+        return ticket_ids
+
+    @classmethod
+    def resolve(cls, ticket_ids, user):
+        """Marca todos os ``ticket_ids`` como resolvidos"""
+        return cls.update(
+            ticket_ids, {'status': TicketStatus.RESOLVED.value}, user, notification_type='tickets_bulk_resolved'
+        )
+
+    @staticmethod
+    def _snapshot(row):
+        return (row['status'], row['priority'], row['department'])
@@ -0,0 +1,73 @@
+from django.db.models import Q
+from django.utils.text import slugify
+
+from core.models import Ticket
+from .permissions import has_roles
+from .roles import SUPPORT_READ_ROLES
+
+# Mensagens para todos os sockets (notificações customizadas)
+BROADCAST_GROUP = 'ticket_notifications'
+# Todos os eventos de ticket (roles de suporte)
+ALL_TICKETS_GROUP = 'tickets.all'
+
+
+def department_group(department):
+    """Grupo dos usuários de um departamento (nomes de grupo só aceitam ASCII)"""
+    return f'tickets.department.{slugify(department)[:60] or "none"}'
+
+
+def user_group(user_id):
+    """Grupo dos tickets criados por ou atribuídos a um usuário"""
+    return f'tickets.user.{user_id}'
+
+
+def ticket_group(ticket_id):
+    """Grupo de quem assinou explicitamente um ticket"""
+    return f'tickets.ticket.{ticket_id}'
+
+
+def groups_for_user(user):
+    """Grupos em que o socket de ``user`` entra ao conectar"""
+    groups = [BROADCAST_GROUP]
+    if not user or not user.is_authenticated:
+        return groups
+    if has_roles(user, SUPPORT_READ_ROLES):
+        groups.append(ALL_TICKETS_GROUP)
+        return groups
+    groups.append(user_group(user.pk))
+    if user.department:
+        groups.append(department_group(user.department))
+    return groups
+
+
+def visible_ticket_ids(user, ticket_ids):
+    """
+    IDs de ``ticket_ids`` cujos eventos ``user`` pode receber
+
+    Mesmas regras de ``groups_for_user``/``groups_for_ticket``: roles de
+    suporte veem todos; os demais só tickets criados por eles, atribuídos a
+    eles ou do seu departamento.
+    """
+    if not user or not user.is_authenticated:
+        return set()
+    if has_roles(user, SUPPORT_READ_ROLES):
+        return set(ticket_ids)
+    rules = Q(created_by_id=user.pk) | Q(assigned_to_id=user.pk)
+    if user.department:
+        rules |= Q(department=user.department)
+    return set(Ticket.objects.filter(rules, pk__in=ticket_ids).values_list('pk', flat=True))
+
+
+def groups_for_ticket(ticket):
+    """Grupos interessados em um evento de ``ticket``"""
+    return groups_for_ticket_values(ticket.pk, ticket.created_by_id, ticket.assigned_to_id, ticket.department)
+
+
+def groups_for_ticket_values(ticket_id, created_by_id, assigned_to_id, department):
+    """Como ``groups_for_ticket``, a partir das colunas (ex.: linhas de ``values_list``)"""
+    groups = [ALL_TICKETS_GROUP, ticket_group(ticket_id), user_group(created_by_id)]
+    if assigned_to_id:
+        groups.append(user_group(assigned_to_id))
+    if department:
+        groups.append(department_group(department))
+    return groups
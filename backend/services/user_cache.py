@@ -0,0 +1,89 @@
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import router
+
+from .conditional_service import TicketVersionService
+
+
+class AuthUserCache:
+    """
+    Cache em memória dos usuários autenticados por JWT.
+
+    Guarda os valores das colunas de cada usuário por ``TIMEOUT`` segundos e
+    recria a instância com ``from_db`` a cada requisição (sem consulta e sem
+    compartilhar objetos entre threads). Cada entrada leva o token da versão
+    ``users`` de ``TicketVersionService``: qualquer save/delete de usuário
+    troca o token, então role, departamento ou ``is_active`` alterados valem
+    na requisição seguinte. As entradas são por processo, mas o token fica no
+    cache do Django: com um cache compartilhado (``CACHE_REDIS_URL``) a troca
+    vale para todos os processos; com o LocMem padrão, só para o processo que
+    fez a escrita (nos demais a entrada vive até o ``TIMEOUT``).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def timeout(self):
+        return getattr(settings, 'AUTH_USER_CACHE', {}).get('TIMEOUT', 60)
+
+    @property
+    def max_entries(self):
+        return getattr(settings, 'AUTH_USER_CACHE', {}).get('MAX_ENTRIES', 10000)
+
+    def get(self, user_id):
+        """Retorna uma instância nova do usuário em cache, ou ``None`` (ausente, expirado ou versão antiga)"""
+        if not self.timeout:
+            return None
+        token = self.version()
+        # A claim do token pode vir como str ou int
+        user_id = str(user_id)
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is None or entry[0] != token or entry[1] < time.monotonic():
+                self.misses += 1
+                return None
+            self._entries.move_to_end(user_id)
+            self.hits += 1
+            _token, _expires, db, names, values = entry
+        return get_user_model().from_db(db, names, values)
+
+    @staticmethod
+    def version():
+        """Token atual da versão ``users``"""
+        token, _modified = TicketVersionService.get(TicketVersionService.USERS)
+        return token
+
+    def set(self, user, token):
+        """
+        Guarda ``user`` (recém-carregado do banco) sob ``token``
+
+        ``token`` deve ser lido com ``version()`` antes da consulta: se o
+        usuário mudar entre a leitura e o ``set``, a entrada já nasce velha.
+        """
+        if not self.timeout:
+            return
+        fields = user._meta.concrete_fields
+        names = [field.attname for field in fields]
+        values = [getattr(user, name) for name in names]
+        db = user._state.db or router.db_for_read(type(user))
+        with self._lock:
+            self._entries[str(user.pk)] = (token, time.monotonic() + self.timeout, db, names, values)
+            self._entries.move_to_end(str(user.pk))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+# Instância global (uma por processo)
+auth_user_cache = AuthUserCache()
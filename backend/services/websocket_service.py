@@ -1,26 +1,84 @@
+import asyncio
+import json
+import uuid
+from collections import defaultdict
+from functools import partial
+
 from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
-from api.v1.serializers import TicketSerializer
+from django.db import transaction
+from core.models import Ticket
+from .notification_dispatcher import dispatcher
+from .payload_cache import payload_cache
+from .ticket_groups import ALL_TICKETS_GROUP, BROADCAST_GROUP, groups_for_ticket, groups_for_ticket_values
+
+
+async def group_send_many(channel_layer, groups, message):
+    """Publica a mesma mensagem em vários grupos de uma vez"""
+    await asyncio.gather(*(channel_layer.group_send(group, message) for group in groups))
 
 
 class WebSocketNotificationService:
-    """Serviço para enviar notificações via WebSocket"""
+    """
+    Serviço para enviar notificações via WebSocket
+
+    Eventos de ticket vão apenas para os grupos interessados (suporte,
+    criador, responsável, departamento e assinantes do ticket); o
+    ``event_id`` permite ao consumer descartar cópias recebidas por mais de um grupo.
+    """
+
+    GROUP_NAME = BROADCAST_GROUP
 
     @classmethod
     def send_ticket_notification(cls, notification_type, ticket):
         """
-        Envia notificação de ticket via WebSocket
+        Agenda notificação de ticket via WebSocket
+
+        O envio acontece após o commit da transação, fora da requisição, e
+        atualizações do mesmo ticket próximas no tempo viram um só evento.
 
         Args:
             notification_type (str): Tipo da notificação ('ticket_created', 'ticket_updated', 'ticket_resolved')
             ticket (Ticket): Instância do ticket
         """
-        channel_layer = get_channel_layer()
-        if channel_layer:
-            ticket_data = TicketSerializer(ticket).data
-            async_to_sync(channel_layer.group_send)(
-                'ticket_notifications', {'type': notification_type, 'ticket': ticket_data}
+        ticket_id = ticket.pk
+        # Departamento e responsável de quando o ticket foi carregado (``Ticket.from_db``)
+        previous = getattr(ticket, 'loaded_routing', None)
+        transaction.on_commit(
+            lambda: dispatcher.submit(
+                notification_type,
+                partial(cls._deliver_ticket_notification, notification_type, ticket_id, previous),
+                key=('ticket', ticket_id),
             )
+        )
+
+    @classmethod
+    def _deliver_ticket_notification(cls, notification_type, ticket_id, previous=None):
+        """
+        Serializa o estado atual do ticket e publica nos grupos interessados (roda no dispatcher)
+
+        Args:
+            notification_type (str): Tipo da notificação
+            ticket_id (int): ID do ticket
+            previous (tuple | None): ``(department, assigned_to_id)`` antes da alteração; os grupos
+                que o ticket deixou (troca de departamento ou responsável) também recebem o evento
+        """
+        channel_layer = get_channel_layer()
+        if not channel_layer:
+            return
+        ticket = Ticket.objects.select_related('created_by', 'assigned_to').filter(pk=ticket_id).first()
+        if ticket is None:
+            return
+        # O frame é montado uma vez e enviado como está por todos os sockets
+        message = {
+            'type': notification_type,
+            'event_id': uuid.uuid4().hex,
+            'ticket_id': ticket.pk,
+            'text': payload_cache.render_event(notification_type, ticket),
+        }
+        groups = set(groups_for_ticket(ticket))
+        if previous:
+            groups.update(groups_for_ticket_values(ticket.pk, ticket.created_by_id, previous[1], previous[0]))
+        dispatcher.run_coroutine(group_send_many, channel_layer, sorted(groups), message)
 
     @classmethod
     def send_ticket_created(cls, ticket):
@@ -37,6 +95,58 @@ class WebSocketNotificationService:
         """Envia notificação de ticket resolvido"""
         cls.send_ticket_notification('ticket_resolved', ticket)
 
+    @classmethod
+    def send_tickets_bulk_notification(cls, notification_type, tickets, changes):
+        """
+        Agenda um único evento para uma alteração em lote
+
+        Args:
+            notification_type (str): 'tickets_bulk_updated' ou 'tickets_bulk_resolved'
+            tickets (list[dict]): Linhas com id, created_by_id, assigned_to_id e department (estado anterior)
+            changes (dict): Campos alterados e seus novos valores
+        """
+        ids_by_group = defaultdict(set)
+        for row in tickets:
+            # Grupos do estado anterior e do novo (ex.: troca de departamento)
+            for department in {row['department'], changes.get('department', row['department'])}:
+                for group in groups_for_ticket_values(
+                    row['id'], row['created_by_id'], row['assigned_to_id'], department
+                ):
+                    ids_by_group[group].add(row['id'])
+        # Cada grupo recebe só os seus tickets; grupos com o mesmo conjunto dividem o frame (e o event_id)
+        groups_by_ids = defaultdict(list)
+        for group, ids in ids_by_group.items():
+            groups_by_ids[tuple(sorted(ids))].append(group)
+        deliveries = [
+            (sorted(groups), json.dumps({'type': notification_type, 'ticket_ids': list(ids), 'changes': changes}))
+            for ids, groups in groups_by_ids.items()
+        ]
+        transaction.on_commit(
+            lambda: dispatcher.submit(
+                notification_type, partial(cls._deliver_bulk_notification, notification_type, deliveries)
+            )
+        )
+
+    @classmethod
+    def _deliver_bulk_notification(cls, notification_type, deliveries):
+        """Publica cada ``(grupos, texto)`` de ``deliveries``"""
+        channel_layer = get_channel_layer()
+        if channel_layer:
+            for groups, text in deliveries:
+                message = {'type': notification_type, 'event_id': uuid.uuid4().hex, 'text': text}
+                dispatcher.run_coroutine(group_send_many, channel_layer, groups, message)
+
+    @classmethod
+    def send_tickets_imported(cls, count):
+        """Agenda um único evento de resumo para uma importação em massa (roles de suporte)"""
+        text = json.dumps({'type': 'tickets_imported', 'count': count})
+        transaction.on_commit(
+            lambda: dispatcher.submit(
+                'tickets_imported',
+                partial(cls._deliver_bulk_notification, 'tickets_imported', [([ALL_TICKETS_GROUP], text)]),
+            )
+        )
+
     @classmethod
     def send_custom_notification(cls, message, notification_type='info'):
         """
@@ -46,9 +156,18 @@ class WebSocketNotificationService:
             message (str): Mensagem da notificação
             notification_type (str): Tipo da notificação ('info', 'success', 'warning', 'error')
         """
+        transaction.on_commit(
+            lambda: dispatcher.submit(
+                'custom_notification', partial(cls._deliver_custom_notification, message, notification_type)
+            )
+        )
+
+    @classmethod
+    def _deliver_custom_notification(cls, message, notification_type):
         channel_layer = get_channel_layer()
         if channel_layer:
-            async_to_sync(channel_layer.group_send)(
-                'ticket_notifications',
+            dispatcher.run_coroutine(
+                channel_layer.group_send,
+                cls.GROUP_NAME,
                 {'type': 'custom_notification', 'message': message, 'notification_type': notification_type},
             )
@@ -1,36 +1,65 @@
 import { ref, onMounted, onUnmounted } from 'vue'
+import { useTicketsStore } from '@/stores/tickets'
 
 export function useWebSocket() {
   const socket = ref(null)
   const isConnected = ref(false)
   const notifications = ref([])
+  const ticketsStore = useTicketsStore()
+  let hasConnected = false
+  // The server pings every 25s: silence for longer than this means the connection is dead
+  const SILENCE_TIMEOUT = 60000
+  let lastMessageAt = 0
+  let watchdog = null
+  let reconnectDelay = 1000
 
   const connect = () => {
     // Força o WebSocket a conectar no backend Django (porta 8000)
     const wsProtocol = window.location.protocol === 'https:' ? 'wss:' : 'ws:'
-    const wsUrl = `${wsProtocol}//localhost:8000/ws/tickets/`
+    // O token JWT define os grupos (role/departamento) que o socket recebe
+    const token = localStorage.getItem('token')
+    const query = token ? `?token=${encodeURIComponent(token)}` : ''
+    const wsUrl = `${wsProtocol}//localhost:8000/ws/tickets/${query}`
     
     socket.value = new WebSocket(wsUrl)
 
     socket.value.onopen = () => {
       console.log('WebSocket connection established')
       isConnected.value = true
+      reconnectDelay = 1000
+      lastMessageAt = Date.now()
+      clearInterval(watchdog)
+      watchdog = setInterval(() => {
+        if (Date.now() - lastMessageAt > SILENCE_TIMEOUT) {
+          // Half-open connection (e.g. after the laptop slept): drop it and reconnect
+          socket.value?.close()
+        }
+      }, 10000)
+      // Events sent while disconnected were lost: fetch only what changed meanwhile
+      if (hasConnected) {
+        ticketsStore.syncChanges()
+      }
+      hasConnected = true
     }
 
     socket.value.onmessage = (event) => {
+      lastMessageAt = Date.now()
       const data = JSON.parse(event.data)
       handleMessage(data)
     }
 
-    socket.value.onclose = () => {
+    socket.value.onclose = (event) => {
       console.log('WebSocket connection closed')
       isConnected.value = false
-      // Try to reconnect after 5 seconds
+      clearInterval(watchdog)
+      // Reconnect with exponential backoff and jitter (right away when the server dropped us for falling behind)
+      const delay = event.code === 4008 ? 500 : reconnectDelay * (0.5 + Math.random())
+      reconnectDelay = Math.min(reconnectDelay * 2, 30000)
       setTimeout(() => {
         if (socket.value?.readyState === WebSocket.CLOSED) {
           connect()
         }
-      }, 5000)
+      }, delay)
     }
 
     socket.value.onerror = (error) => {
@@ -40,7 +69,13 @@ export function useWebSocket() {
   }
 
   const handleMessage = (data) => {
-    if (data.type === 'ticket_created') {
+    if (data.type === 'ping') {
+      // Server heartbeat: answering keeps this socket from being reaped
+      socket.value?.send(JSON.stringify({ action: 'pong' }))
+    } else if (data.type === 'resync_required') {
+      // Events were skipped: the reconnect fetches them from the changes feed
+      console.warn('WebSocket resync required:', data.reason)
+    } else if (data.type === 'ticket_created') {
       addNotification({
         type: 'success',
         title: 'Novo Ticket',
@@ -61,6 +96,26 @@ export function useWebSocket() {
         message: `Ticket #${data.ticket.id} foi resolvido`,
         ticket: data.ticket
       })
+    } else if (data.type === 'tickets_bulk_updated') {
+      addNotification({
+        type: 'info',
+        title: 'Tickets Atualizados',
+        message: `${data.ticket_ids.length} tickets foram atualizados`,
+        ticketIds: data.ticket_ids
+      })
+    } else if (data.type === 'tickets_bulk_resolved') {
+      addNotification({
+        type: 'success',
+        title: 'Tickets Resolvidos',
+        message: `${data.ticket_ids.length} tickets foram resolvidos`,
+        ticketIds: data.ticket_ids
+      })
+    } else if (data.type === 'tickets_imported') {
+      addNotification({
+        type: 'success',
+        title: 'Importação Concluída',
+        message: `${data.count} tickets foram importados`
+      })
     } else if (data.type === 'custom_notification') {
       addNotification({
         type: data.notification_type || 'info',
@@ -92,6 +147,7 @@ export function useWebSocket() {
   }
 
   const disconnect = () => {
+    clearInterval(watchdog)
     if (socket.value) {
       socket.value.close()
       socket.value = null
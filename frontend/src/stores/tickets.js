@@ -1,12 +1,22 @@
 import { defineStore } from 'pinia'
 import axios from 'axios'
 
+// List filters that can be checked on a single row; anything else (search, ordering, pages) needs the server
+const LOCAL_FILTERS = ['status', 'priority', 'department']
+
+const newestFirst = (a, b) => new Date(b.created_at) - new Date(a.created_at) || b.id - a.id
+
 export const useTicketsStore = defineStore('tickets', {
   state: () => ({
     tickets: [],
     currentTicket: null,
     loading: false,
     error: null,
+    // Position in the backend changes feed, used to catch up after a WebSocket reconnect
+    changeCursor: null,
+    // Params of the loaded list and whether the server has more rows than it
+    listParams: {},
+    hasMoreTickets: false,
     stats: {
       total: 0,
       open: 0,
@@ -33,8 +43,15 @@ export const useTicketsStore = defineStore('tickets', {
       this.error = null
       
       try {
+        // Take the cursor before loading the list so nothing changed in between is missed
+        if (!this.changeCursor) {
+          const latest = await axios.get('http://localhost:8000/api/v1/tickets/changes/', { params: { since: 'latest' } })
+          this.changeCursor = latest.data.cursor
+        }
         const response = await axios.get('http://localhost:8000/api/v1/tickets/', { params })
         this.tickets = response.data.results || response.data
+        this.listParams = { ...params }
+        this.hasMoreTickets = Boolean(response.data.next)
         return { success: true, data: response.data }
       } catch (error) {
         console.error('Fetch tickets error:', error)
@@ -135,6 +152,60 @@ export const useTicketsStore = defineStore('tickets', {
       }
     },
 
+    async syncChanges() {
+      if (!this.changeCursor) {
+        return { success: false, error: 'Nenhuma lista carregada' }
+      }
+      try {
+        const local = Object.keys(this.listParams).every(key => LOCAL_FILTERS.includes(key))
+        let changed = false
+        let hasMore = true
+        while (hasMore) {
+          const response = await axios.get('http://localhost:8000/api/v1/tickets/changes/', {
+            params: { since: this.changeCursor, page_size: 100 }
+          })
+          for (const change of response.data.results) {
+            changed = true
+            if (local) this.applyChange(change)
+            if (this.currentTicket && this.currentTicket.id === change.id) {
+              this.currentTicket = change.deleted ? null : change
+            }
+          }
+          this.changeCursor = response.data.cursor
+          hasMore = response.data.has_more
+        }
+        if (changed && !local) {
+          // Only the server knows which changed rows match a search or belong to this page
+          return await this.fetchTickets(this.listParams)
+        }
+        return { success: true }
+      } catch (error) {
+        console.error('Sync changes error:', error)
+        return { success: false, error: error.response?.data?.detail || 'Erro ao sincronizar tickets' }
+      }
+    },
+
+    matchesListParams(ticket) {
+      return LOCAL_FILTERS.every(key => !this.listParams[key] || ticket[key] === this.listParams[key])
+    },
+
+    applyChange(change) {
+      const index = this.tickets.findIndex(ticket => ticket.id === change.id)
+      if (change.deleted || !this.matchesListParams(change)) {
+        if (index !== -1) this.tickets.splice(index, 1)
+      } else if (index !== -1) {
+        this.tickets[index] = change
+      } else {
+        // Keep the list order (newest first); rows older than the loaded page belong to a later one
+        const position = this.tickets.findIndex(ticket => newestFirst(change, ticket) < 0)
+        if (position !== -1) {
+          this.tickets.splice(position, 0, change)
+        } else if (!this.hasMoreTickets) {
+          this.tickets.push(change)
+        }
+      }
+    },
+
     async fetchStats() {
       try {
         const response = await axios.get('http://localhost:8000/api/v1/tickets/stats/')